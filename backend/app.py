@@ -2,6 +2,7 @@ import io
 import json
 import os
 import re
+import time
 import uuid
 import hashlib
 from datetime import datetime, timedelta
@@ -25,10 +26,24 @@ import database  # Sistema de banco de dados multi-usuário
 from src.api.alphabot import alphabot_bp  # type: ignore
 from src.api.drivebot import drivebot_bp  # type: ignore
 from src.api.health import health_bp  # type: ignore
+from src.config.settings import PANDAS_COPY_ON_WRITE  # type: ignore
+from src.utils.file_handlers import read_excel_streaming  # type: ignore
+from src.utils.ingest_pipeline import (  # type: ignore
+    consolidate_tables,
+    format_stage_timings,
+    merge_stage_timings,
+    prepare_table,
+    stage_timer,
+)
+from src.utils.filter_compiler import apply_filters  # type: ignore
+from src.utils.virtual_columns import materialize_virtual_columns  # type: ignore
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Pandas em Copy-on-Write no processo web (os workers do IngestPool fazem o mesmo ao iniciar)
+pd.set_option('mode.copy_on_write', PANDAS_COPY_ON_WRITE)
+
 app = Flask(__name__)
 # Configuração específica do CORS para Vercel
 CORS(app, resources={
@@ -133,45 +148,6 @@ GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv('GOOGLE_SERVICE_ACCOUNT_FILE')
 GOOGLE_SERVICE_ACCOUNT_INFO = os.getenv('GOOGLE_SERVICE_ACCOUNT_INFO')
 GOOGLE_CREDENTIALS: Optional[service_account.Credentials] = None
 
-MONTH_ALIASES = {
-    'janeiro': 1,
-    'jan': 1,
-    'fevereiro': 2,
-    'fev': 2,
-    'março': 3,
-    'marco': 3,
-    'mar': 3,
-    'abril': 4,
-    'abr': 4,
-    'maio': 5,
-    'junho': 6,
-    'julho': 7,
-    'agosto': 8,
-    'setembro': 9,
-    'set': 9,
-    'outubro': 10,
-    'out': 10,
-    'novembro': 11,
-    'nov': 11,
-    'dezembro': 12,
-    'dez': 12,
-}
-MONTH_TRANSLATION = {name: datetime(2000, number, 1).strftime('%B') for name, number in MONTH_ALIASES.items()}
-MONTH_NAMES_PT = {
-    1: 'janeiro',
-    2: 'fevereiro',
-    3: 'março',
-    4: 'abril',
-    5: 'maio',
-    6: 'junho',
-    7: 'julho',
-    8: 'agosto',
-    9: 'setembro',
-    10: 'outubro',
-    11: 'novembro',
-    12: 'dezembro',
-}
-
 EXCEL_MIME_TYPES = {
     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
     'application/vnd.ms-excel',
@@ -1348,191 +1324,6 @@ def normalize_decimal_string(value: Any) -> Optional[str]:
         text = text.replace(',', '.')
 
     return text
-def coerce_numeric_series(series: pd.Series) -> pd.Series:
-    if pd.api.types.is_numeric_dtype(series):
-        return pd.to_numeric(series, errors='coerce')
-
-    normalized = series.astype(str).map(normalize_decimal_string)
-    return pd.to_numeric(normalized, errors='coerce')
-
-
-def detect_numeric_columns(df: pd.DataFrame) -> Tuple[List[str], Dict[str, pd.Series]]:
-    numeric_columns: List[str] = []
-    numeric_data: Dict[str, pd.Series] = {}
-
-    for column in df.columns:
-        coerced = coerce_numeric_series(df[column])
-        if coerced.notna().sum() >= max(1, int(len(coerced) * 0.3)):
-            numeric_columns.append(column)
-            numeric_data[column] = coerced
-
-    return numeric_columns, numeric_data
-
-
-def normalize_month_text(value: Any) -> Any:
-    if not isinstance(value, str):
-        return value
-
-    text = value.strip()
-    lower = text.lower()
-    for pt_name, eng_name in MONTH_TRANSLATION.items():
-        if pt_name in lower:
-            lower = lower.replace(pt_name, eng_name.lower())
-    return lower
-
-
-def month_number_to_name(month_num: int) -> str:
-    """
-    v11.0: Converte número do mês (1-12) para nome em português.
-    Usado para criar coluna auxiliar 'Data_Mes_Nome'.
-    
-    v11.0 FIX #6: Retorna em minúsculas para consistência com filtros case-insensitive
-    """
-    month_names = {
-        1: "janeiro", 2: "fevereiro", 3: "março", 4: "abril",
-        5: "maio", 6: "junho", 7: "julho", 8: "agosto",
-        9: "setembro", 10: "outubro", 11: "novembro", 12: "dezembro"
-    }
-    return month_names.get(month_num, "desconhecido")
-
-
-def detect_datetime_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
-    """
-    v11.0 FIX: Tratamento robusto de datas com formato explícito.
-    
-    Correção crítica para eliminar UserWarnings e filtros temporais falhos.
-    """
-    datetime_columns: Dict[str, pd.Series] = {}
-
-    for column in df.columns:
-        series = df[column]
-        parsed = None
-        
-        if pd.api.types.is_datetime64_any_dtype(series):
-            # Já é datetime, apenas garantir
-            parsed = pd.to_datetime(series, errors='coerce')
-        else:
-            # Tentar múltiplos formatos comuns
-            # Formato ISO (YYYY-MM-DD) - mais comum e inequívoco
-            parsed = pd.to_datetime(series, format='%Y-%m-%d', errors='coerce')
-            
-            if parsed.isna().all():
-                # Formato brasileiro (DD/MM/YYYY)
-                parsed = pd.to_datetime(series, format='%d/%m/%Y', errors='coerce', dayfirst=True)
-            
-            if parsed.isna().all():
-                # Formato americano (MM/DD/YYYY)
-                parsed = pd.to_datetime(series, format='%m/%d/%Y', errors='coerce')
-            
-            if parsed.isna().all():
-                # Formato com texto de mês (ex: "Janeiro 2024")
-                normalized = series.astype(str).map(normalize_month_text)
-                parsed = pd.to_datetime(normalized, errors='coerce', dayfirst=True)
-            
-            if parsed.isna().all():
-                # Último recurso: deixar pandas inferir (SEM dayfirst para evitar ambiguidade)
-                parsed = pd.to_datetime(series, errors='coerce', dayfirst=False)
-
-        # Considerar válida se >= 30% dos valores foram convertidos com sucesso
-        if parsed is not None and parsed.notna().sum() >= max(1, int(len(parsed) * 0.3)):
-            parsed.name = column
-            datetime_columns[column] = parsed
-
-    return datetime_columns
-
-
-def detect_text_columns(df: pd.DataFrame, numeric_columns: List[str]) -> List[str]:
-    text_columns: List[str] = []
-    numeric_set = set(numeric_columns)
-
-    for column in df.columns:
-        if column in numeric_set:
-            continue
-        series = df[column]
-        if pd.api.types.is_string_dtype(series) or series.dtype == object:
-            if series.astype(str).str.strip().replace('', np.nan).notna().sum() > 0:
-                text_columns.append(column)
-
-    return text_columns
-
-
-def month_number_to_name(month: int) -> str:
-    return MONTH_NAMES_PT.get(month, str(month))
-
-
-def build_temporal_mask(table: Dict[str, Any], year: Optional[int] = None, month: Optional[int] = None) -> Optional[pd.Series]:
-    datetime_columns: Dict[str, pd.Series] = table.get('datetime_columns', {})
-    if not datetime_columns:
-        return None
-
-    combined_mask: Optional[pd.Series] = None
-    for parsed in datetime_columns.values():
-        mask = parsed.notna()
-        if year is not None:
-            mask &= parsed.dt.year == year
-        if month is not None:
-            mask &= parsed.dt.month == month
-        if combined_mask is None:
-            combined_mask = mask
-        else:
-            combined_mask |= mask
-
-    return combined_mask
-
-
-def prepare_table(table_name: str, df: pd.DataFrame) -> Dict[str, Any]:
-    """
-    v11.0 FIX: Adiciona colunas auxiliares para agrupamento temporal.
-    
-    Correção para permitir agrupamento por "mês", "ano", "trimestre"
-    sem precisar fazer agregações complexas.
-    """
-    processed = df.copy()
-    processed.columns = [str(col).strip() for col in processed.columns]
-    processed = processed.replace('', np.nan)
-
-    numeric_columns, numeric_data = detect_numeric_columns(processed)
-    datetime_columns = detect_datetime_columns(processed)
-    text_columns = detect_text_columns(processed, numeric_columns)
-    
-    # v11.0: Criar colunas auxiliares para CADA coluna de data detectada
-    auxiliary_columns_created = []
-    for col_name, datetime_series in datetime_columns.items():
-        # Adicionar coluna "Mes" (numérico: 1-12)
-        mes_col = f"{col_name}_Mes"
-        processed[mes_col] = datetime_series.dt.month
-        numeric_columns.append(mes_col)
-        auxiliary_columns_created.append(mes_col)
-        
-        # Adicionar coluna "Ano" (numérico: ex: 2024)
-        ano_col = f"{col_name}_Ano"
-        processed[ano_col] = datetime_series.dt.year
-        numeric_columns.append(ano_col)
-        auxiliary_columns_created.append(ano_col)
-        
-        # Adicionar coluna "Trimestre" (numérico: 1-4)
-        trimestre_col = f"{col_name}_Trimestre"
-        processed[trimestre_col] = datetime_series.dt.quarter
-        numeric_columns.append(trimestre_col)
-        auxiliary_columns_created.append(trimestre_col)
-        
-        # Adicionar coluna "Mes_Nome" (texto: "Janeiro", "Fevereiro", etc.)
-        mes_nome_col = f"{col_name}_Mes_Nome"
-        processed[mes_nome_col] = datetime_series.dt.month.map(month_number_to_name)
-        text_columns.append(mes_nome_col)
-        auxiliary_columns_created.append(mes_nome_col)
-
-    return {
-        'name': table_name,
-        'df': processed,
-        'row_count': int(len(processed)),
-        'columns': list(processed.columns),
-        'numeric_columns': numeric_columns,
-        'numeric_data': numeric_data,
-        'datetime_columns': datetime_columns,
-        'text_columns': text_columns,
-        'auxiliary_columns': auxiliary_columns_created,  # Nova metadata
-    }
 
 
 def download_file_bytes(drive_service: Any, file_id: str) -> bytes:
@@ -1547,19 +1338,27 @@ def download_file_bytes(drive_service: Any, file_id: str) -> bytes:
     return fh.getvalue()
 
 
-def load_csv_tables(drive_service: Any, file_meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+def load_csv_tables(
+    drive_service: Any,
+    file_meta: Dict[str, Any],
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Dict[str, Any]]:
     content = download_file_bytes(drive_service, file_meta['id'])
     df = pd.read_csv(io.BytesIO(content))
-    return [prepare_table(file_meta['name'], df)]
+    return [prepare_table(file_meta['name'], df, (known_formats or {}).get(file_meta['name']))]
 
 
-def load_excel_tables(drive_service: Any, file_meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+def load_excel_tables(
+    drive_service: Any,
+    file_meta: Dict[str, Any],
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Dict[str, Any]]:
     content = download_file_bytes(drive_service, file_meta['id'])
-    workbook = pd.read_excel(io.BytesIO(content), sheet_name=None)
+    workbook = read_excel_streaming(content)
     tables: List[Dict[str, Any]] = []
     for sheet_name, df in workbook.items():
         table_name = f"{file_meta['name']} - {sheet_name}"
-        tables.append(prepare_table(table_name, df))
+        tables.append(prepare_table(table_name, df, (known_formats or {}).get(table_name)))
     return tables
 
 
@@ -1580,10 +1379,10 @@ def build_discovery_summary(
         all_columns.update(table['columns'])
         numeric_columns.update(table['numeric_columns'])
         text_columns.update(table['text_columns'])
-        datetime_columns_names.update(table['datetime_columns'].keys())
+        datetime_columns_names.update(table['datetime_columns'])
 
-        for parsed in table['datetime_columns'].values():
-            valid = parsed.dropna()
+        for column in table['datetime_columns']:
+            valid = table['df'][column].dropna()
             if not valid.empty:
                 start_dates.append(valid.min())
                 end_dates.append(valid.max())
@@ -1772,7 +1571,15 @@ Com base no diagnóstico, **posso responder**:
 """
 
 
-def ingest_drive_folder(drive_id: str) -> Dict[str, Any]:
+def ingest_drive_folder(
+    drive_id: str,
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Lê todos os arquivos da pasta. known_formats ({tabela: {coluna: formato}})
+    reaproveita os formatos de data de uma leitura anterior da mesma pasta.
+    """
+    known_formats = known_formats or {}
     drive_service, sheets_service = get_google_services()
 
     try:
@@ -1790,6 +1597,7 @@ def ingest_drive_folder(drive_id: str) -> Dict[str, Any]:
     tables: List[Dict[str, Any]] = []
     files_ok: List[str] = []
     files_failed: List[Dict[str, str]] = []
+    read_started = time.perf_counter()
 
     for file_meta in files:
         mime_type = file_meta.get('mimeType')
@@ -1820,14 +1628,14 @@ def ingest_drive_folder(drive_id: str) -> Dict[str, Any]:
                         continue
                     df = pd.DataFrame(rows, columns=header)
                     table_name = f"{file_meta['name']} - {title}"
-                    tables.append(prepare_table(table_name, df))
+                    tables.append(prepare_table(table_name, df, known_formats.get(table_name)))
 
                 files_ok.append(file_meta['name'])
             elif mime_type == 'text/csv':
-                tables.extend(load_csv_tables(drive_service, file_meta))
+                tables.extend(load_csv_tables(drive_service, file_meta, known_formats))
                 files_ok.append(file_meta['name'])
             elif mime_type in EXCEL_MIME_TYPES:
-                tables.extend(load_excel_tables(drive_service, file_meta))
+                tables.extend(load_excel_tables(drive_service, file_meta, known_formats))
                 files_ok.append(file_meta['name'])
             else:
                 files_failed.append({'name': file_meta['name'], 'reason': f'Formato não suportado ({mime_type})'})
@@ -1841,15 +1649,29 @@ def ingest_drive_folder(drive_id: str) -> Dict[str, Any]:
             'Não foi possível processar nenhum arquivo da pasta. Convert a planilhas Google ou CSV e confira as permissões.'
         )
 
-    summary = build_discovery_summary(tables, files_ok, files_failed)
-    report = build_discovery_report(summary)
+    # Leitura = tempo do laço menos as etapas de prepare_table (infer/coerce/derive)
+    table_timings = merge_stage_timings(*(table['stage_seconds'] for table in tables))
+    read_seconds = time.perf_counter() - read_started
+    stage_timings: Dict[str, float] = {'parse': max(read_seconds - sum(table_timings.values()), 0.0), **table_timings}
+
+    with stage_timer(stage_timings, 'consolidate'):
+        consolidated = consolidate_tables(tables)
+
+    with stage_timer(stage_timings, 'profile'):
+        summary = build_discovery_summary(tables, files_ok, files_failed)
+        report = build_discovery_report(summary)
+
+    stage_timings = merge_stage_timings(stage_timings)
+    print(f"[DriveBot] ⏱️ Etapas da ingestão: {format_stage_timings(stage_timings)}")
 
     return {
         'tables': tables,
+        'consolidated': consolidated,
         'summary': summary,
         'report': report,
         'files_ok': files_ok,
         'files_failed': files_failed,
+        'stage_timings': stage_timings,
     }
 
 
@@ -1864,6 +1686,8 @@ def ensure_conversation(conversation_id: str, bot_id: str) -> Dict[str, Any]:
                 "report": None,
                 "summary": None,
                 "tables": [],
+                "consolidated": None,
+                "version": 0,
                 "files_ok": [],
                 "files_failed": [],
                 "last_refresh": None,
@@ -1873,6 +1697,21 @@ def ensure_conversation(conversation_id: str, bot_id: str) -> Dict[str, Any]:
     return conversation
 
 
+def get_consolidated_table(drive_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retorna a tabela consolidada da pasta ativa.
+
+    A consolidação é feita na ingestão; aqui ela só é refeita quando a versão
+    guardada não corresponde à versão atual das tabelas (ex: estado antigo).
+    """
+    consolidated = drive_state.get("consolidated")
+    version = drive_state.get("version", 0)
+    if consolidated is None or consolidated.get("version") != version:
+        consolidated = consolidate_tables(drive_state.get("tables", []), version)
+        drive_state["consolidated"] = consolidated
+    return consolidated
+
+
 def append_message(conversation: Dict[str, Any], role: str, content: str) -> None:
     conversation["messages"].append({"role": role, "content": content})
 
@@ -1881,22 +1720,27 @@ def list_history(conversation: Dict[str, Any]) -> List[Dict[str, str]]:
     return list(conversation["messages"])
 
 
-def build_discovery_bundle(drive_id: str) -> Dict[str, Any]:
+def build_discovery_bundle(
+    drive_id: str,
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Dict[str, Any]:
     """
     VERSÃO REAL: Conecta ao Google Drive, lê os arquivos e retorna dados reais.
     """
     try:
         # Tentar ler dados reais do Google Drive
-        ingestion_result = ingest_drive_folder(drive_id)
+        ingestion_result = ingest_drive_folder(drive_id, known_formats)
         
         # Retornar os dados reais
         return {
             "report": ingestion_result["report"],
             "profile": None,  # Não usado mais na nova arquitetura
             "tables": ingestion_result["tables"],
+            "consolidated": ingestion_result["consolidated"],
             "summary": ingestion_result["summary"],
             "files_ok": ingestion_result["files_ok"],
             "files_failed": ingestion_result["files_failed"],
+            "stage_timings": ingestion_result["stage_timings"],
         }
     
     except Exception as e:
@@ -2092,6 +1936,10 @@ Não adicione nenhuma outra explicação, markdown, ou texto extra. APENAS o JSO
 - Se a pergunta usa "essa transação", "esse produto", "nele", identifique a entidade no histórico e use como filtro
 - Para filtros de mês, use a coluna temporal disponível (ex: "Data_Mes_Nome" para nomes de mês)
 - Para filtros de texto (incluindo meses), use SEMPRE minúsculas (ex: "janeiro", "eletrônicos", "sul")
+- Para períodos na coluna de data (ex: "Data"), use datas no formato AAAA-MM-DD:
+  * Mês de um ano: "Data": "2024-12"
+  * Intervalo (fim inclusivo; "start" ou "end" podem ser omitidos): "Data": {{"start": "2024-03-01", "end": "2024-05-15"}}
+  * Últimos períodos até a data mais recente dos dados: "Data": {{"last": 30, "unit": "days"}} (unit: days, weeks, months, years)
 
 **Pergunta do Usuário:** "{question}"
 **Colunas Disponíveis:** {available_columns}
@@ -2128,109 +1976,60 @@ Não adicione nenhuma outra explicação, markdown, ou texto extra. APENAS o JSO
         return None
 
 
-def execute_analysis_command(command: Dict[str, Any], tables: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+def execute_analysis_command(command: Dict[str, Any], consolidated: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Executa o comando JSON nos dados REAIS do DataFrame.
+
+    Args:
+        command: Comando gerado por generate_analysis_command
+        consolidated: Tabela consolidada da pasta (ver get_consolidated_table)
     """
-    if not tables:
+    if not consolidated or consolidated.get("df") is None:
         return {"error": "Nenhum dado disponível para análise"}
     
     tool = command.get("tool")
     params = command.get("params", {})
     
-    # Combinar todos os DataFrames em um só (assumindo estrutura similar)
+    # Colunas auxiliares virtuais (ex: Data_Mes_Nome) são calculadas na primeira consulta que as usa
+    if tool == "get_filtered_data" and "columns" not in params:
+        referenced_columns = None
+    else:
+        referenced_columns = list(params.get("filters", {}) or {})
+        referenced_columns += [params.get(key) for key in ("metric_column", "group_by_column", "time_column", "column")]
+        referenced_columns += list(params.get("columns") or [])
+    
+    # Tabelas já consolidadas na ingestão: só as colunas virtuais usadas são calculadas
     try:
-        all_dfs = []
-        for table in tables:
-            df = table.get("df")
-            if df is not None and not df.empty:
-                all_dfs.append(df)
+        materialize_virtual_columns(consolidated, referenced_columns)
+        df = consolidated["df"]
         
-        if not all_dfs:
+        if df.empty:
             return {"error": "Nenhum DataFrame válido encontrado"}
         
-        # Usar o primeiro DataFrame (ou combinar se necessário)
-        df = all_dfs[0] if len(all_dfs) == 1 else pd.concat(all_dfs, ignore_index=True)
-        
     except Exception as e:
         return {"error": f"Erro ao processar DataFrames: {str(e)}"}
     
     # v11.0 FIX: Aplicar filtros com tratamento inteligente de datas
-    filters = params.get("filters", {})
-    filtered_df = df.copy()
-    
-    for column, value in filters.items():
-        if column not in filtered_df.columns:
-            continue
-        
-        # v11.0 FIX #6: Case-insensitive filtering para colunas de texto
-        # Isso resolve o problema de "Abril" vs "abril", "Novembro" vs "novembro"
-        col_dtype = filtered_df[column].dtype
-        is_text_column = pd.api.types.is_string_dtype(col_dtype) or pd.api.types.is_object_dtype(col_dtype)
-        
-        # CASO ESPECIAL: Filtros de texto (incluindo nomes de mês)
-        if is_text_column and not pd.api.types.is_datetime64_any_dtype(filtered_df[column]):
-            try:
-                # Sub-caso 1: Lista de valores (ex: ["Junho", "Julho"])
-                if isinstance(value, list):
-                    # Normalizar ambos para minúsculas
-                    filter_values_lower = [str(v).lower() for v in value]
-                    filtered_df = filtered_df[filtered_df[column].astype(str).str.lower().isin(filter_values_lower)]
-                    continue
-                
-                # Sub-caso 2: Valor único (ex: "Abril")
-                else:
-                    # Normalizar ambos para minúsculas
-                    filter_value_lower = str(value).lower()
-                    filtered_df = filtered_df[filtered_df[column].astype(str).str.lower() == filter_value_lower]
-                    continue
-            except Exception as e:
-                print(f"[DriveBot] Erro no filtro case-insensitive para '{column}': {e}")
-                pass
-            
-        # Tratamento especial para colunas de data
-        if pd.api.types.is_datetime64_any_dtype(filtered_df[column]):
-            try:
-                # CASO 1: Filtro por mês (número 1-12)
-                if isinstance(value, (int, str)) and str(value).isdigit():
-                    num_value = int(value)
-                    
-                    # Mês (1-12)
-                    if 1 <= num_value <= 12:
-                        filtered_df = filtered_df[filtered_df[column].dt.month == num_value]
-                        continue
-                    
-                    # Ano (ex: 2024)
-                    elif num_value > 1900 and num_value < 2100:
-                        filtered_df = filtered_df[filtered_df[column].dt.year == num_value]
-                        continue
-                
-                # CASO 2: Filtro por múltiplos meses (ex: [1, 11] para "janeiro e novembro")
-                elif isinstance(value, list):
-                    month_nums = [int(v) for v in value if isinstance(v, (int, str)) and str(v).isdigit()]
-                    if month_nums:
-                        filtered_df = filtered_df[filtered_df[column].dt.month.isin(month_nums)]
-                        continue
-                
-                # CASO 3: Filtro por trimestre (ex: "Q1", "Q2", etc.)
-                elif isinstance(value, str) and value.upper().startswith('Q'):
-                    quarter_num = int(value[1])  # Extrair número do trimestre
-                    filtered_df = filtered_df[filtered_df[column].dt.quarter == quarter_num]
-                    continue
-                
-                # CASO 4: Tentar converter o valor para datetime e comparar data exata
-                filter_date = pd.to_datetime(value, errors='coerce')
-                if pd.notna(filter_date):
-                    # Comparar apenas a data (ignorar hora)
-                    filtered_df = filtered_df[filtered_df[column].dt.date == filter_date.date()]
-            except Exception as e:
-                # Log de debug (opcional)
-                print(f"[DriveBot] Falha no filtro temporal para coluna '{column}' com valor '{value}': {e}")
-                pass
-        else:
-            # Filtro normal para colunas não-temporais (texto, números)
-            filtered_df = filtered_df[filtered_df[column] == value]
-    
+    # Filtros compilados (índices secundários para texto/IDs), avaliados do mais seletivo
+    # ao menos seletivo, e as linhas são selecionadas uma única vez no final
+    # (ver src/utils/filter_compiler.py)
+    filters = params.get("filters", {}) or {}
+    filtered_df, filter_plan = apply_filters(consolidated, filters)
+    if filter_plan:
+        print(f"[DriveBot] 🧭 Plano de filtros: " + ", ".join(
+            f"{step['column']}({step['kind']}, {step['status']}, {step.get('rows_after')})" for step in filter_plan
+        ))
+    
+    result = run_analysis_tool(tool, params, filtered_df, filters)
+    if filter_plan and result and "error" not in result:
+        result["filter_plan"] = filter_plan
+    return result
+
+
+def run_analysis_tool(tool: str, params: Dict[str, Any], filtered_df: pd.DataFrame, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Executa a ferramenta do comando sobre as linhas que passaram nos filtros.
+    """
     # Executar ferramenta
     try:
         if tool == "calculate_metric":
@@ -2461,6 +2260,9 @@ def format_analysis_result(question: str, raw_result: Dict[str, Any], api_key: s
     if "error" in raw_result and not raw_result.get("multi_command"):
         return f"⚠️ **Erro na análise:** {raw_result['error']}\n\nPor favor, reformule sua pergunta ou verifique se os dados estão disponíveis."
     
+    # O plano de filtros é diagnóstico: não vai para o prompt do apresentador
+    strip_plan = lambda result: {key: value for key, value in result.items() if key != "filter_plan"}
+    
     # v11.0 FIX #7: Tratamento especial para múltiplos comandos
     if raw_result.get("multi_command"):
         # Consolidar todos os resultados em um único contexto para o LLM
@@ -2469,10 +2271,12 @@ def format_analysis_result(question: str, raw_result: Dict[str, Any], api_key: s
             if "error" in result:
                 results_context += f"Análise {idx}: ❌ Erro - {result['error']}\n"
             else:
-                results_context += f"Análise {idx}:\n{json.dumps(result, indent=2, ensure_ascii=False)}\n\n"
+                results_context += f"Análise {idx}:\n{json.dumps(strip_plan(result), indent=2, ensure_ascii=False)}\n\n"
         
         # Substituir raw_result por um consolidado
         raw_result = {"consolidated_results": results_context}
+    else:
+        raw_result = strip_plan(raw_result)
     
     # Construir contexto histórico se disponível
     history_context = ""
@@ -2576,7 +2380,8 @@ def handle_drivebot_followup(message: str, conversation: Dict[str, Any], api_key
     for table in tables:
         df = table.get("df")
         if df is not None and not df.empty:
-            all_columns.update(df.columns.tolist())
+            # 'columns' inclui as auxiliares virtuais (ainda não calculadas no DataFrame)
+            all_columns.update(table.get("columns") or df.columns.tolist())
             
             # v11.0: Coletar informações sobre colunas auxiliares criadas
             if "auxiliary_columns" in table and table["auxiliary_columns"]:
@@ -2620,11 +2425,12 @@ def handle_drivebot_followup(message: str, conversation: Dict[str, Any], api_key
         # Comando único: ex: {"tool": "calculate_metric", ...}
         commands_to_execute = [command]
     
-    # FASE 2: Executar TODOS os comandos nos dados REAIS
+    # FASE 2: Executar TODOS os comandos nos dados REAIS (mesma tabela consolidada)
+    consolidated = get_consolidated_table(drive_state)
     all_results = []
     for idx, cmd in enumerate(commands_to_execute, 1):
         print(f"[DriveBot] Executando comando {idx}/{len(commands_to_execute)}...")
-        raw_result = execute_analysis_command(cmd, tables)
+        raw_result = execute_analysis_command(cmd, consolidated)
         
         if not raw_result:
             print(f"[DriveBot] Falha ao executar comando {idx}")
@@ -2767,14 +2573,28 @@ def get_bot_response(bot_id: str, message: str, conversation_id: Optional[str] =
             drive_id = extract_drive_id(message)
 
             if drive_id:
-                bundle = build_discovery_bundle(drive_id)
+                # Mesma pasta lida de novo: reaproveitar os formatos de data já detectados
+                known_formats = None
+                if drive_state.get("drive_id") == drive_id:
+                    known_formats = {
+                        table["name"]: table.get("datetime_formats", {})
+                        for table in drive_state.get("tables", [])
+                    }
+                bundle = build_discovery_bundle(drive_id, known_formats)
+                # Cada ingestão ganha uma versão; a tabela consolidada é marcada com ela
+                version = drive_state.get("version", 0) + 1
+                consolidated = bundle.get("consolidated") or consolidate_tables(bundle["tables"])
+                consolidated["version"] = version
                 drive_state.update({
                     "drive_id": drive_id,
                     "report": bundle["report"],
                     "tables": bundle["tables"],  # CRÍTICO: Armazenar os DataFrames reais
+                    "consolidated": consolidated,
+                    "version": version,
                     "summary": bundle["summary"],
                     "files_ok": bundle["files_ok"],
                     "files_failed": bundle["files_failed"],
+                    "stage_timings": bundle.get("stage_timings"),
                 })
 
                 header = (
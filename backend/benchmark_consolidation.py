@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark da consolidação das tabelas do DriveBot
+Para uma pasta dividida em N tabelas, mede o tempo por comando concatenando as
+tabelas a cada comando (comportamento anterior) e reaproveitando a tabela
+consolidada na ingestão, e a memória que o estado da pasta mantém
+
+Uso: python benchmark_consolidation.py [linhas] [comandos]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import app  # Configura o pandas como o servidor (PANDAS_COPY_ON_WRITE)
+from src.utils.ingest_pipeline import consolidate_tables, prepare_table
+
+TABLE_COUNTS = (1, 4, 16, 64)
+
+COMMAND = {
+    'tool': 'calculate_metric',
+    'params': {'metric_column': 'Receita_Total', 'operation': 'sum', 'filters': {}},
+}
+
+
+def build_tables(rows: int, count: int) -> list:
+    """Fixture de vendas com 'rows' linhas dividida em 'count' tabelas."""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'Data': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D'),
+        'Região': rng.choice(['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul'], rows),
+        'Produto': rng.choice([f'Produto {i}' for i in range(40)], rows),
+        'Quantidade': rng.integers(1, 20, rows),
+        'Receita_Total': rng.uniform(10, 5000, rows).round(2),
+    })
+    return [
+        prepare_table(f'vendas_{i}.csv', part.reset_index(drop=True))
+        for i, part in enumerate(np.array_split(df, count))
+    ]
+
+
+def resident_mb(tables: list, consolidated: dict, shared: bool = True) -> float:
+    """
+    Memória das colunas mantidas pelo estado da pasta (tabelas + consolidada).
+
+    Com shared=True buffers compartilhados contam uma vez (memória real);
+    com shared=False cada tabela conta como cópia própria (antes das fatias).
+    Uma tabela única é a própria consolidada e conta uma vez nos dois casos.
+    """
+    arrays = []
+    if len(tables) > 1:
+        arrays.extend(consolidated['df'][column].to_numpy() for column in consolidated['df'].columns)
+    for table in tables:
+        arrays.extend(table['df'][column].to_numpy() for column in table['df'].columns)
+
+    total = 0
+    counted: list = []
+    for array in arrays:
+        if shared and any(np.shares_memory(array, other) for other in counted):
+            continue
+        counted.append(array)
+        total += array.nbytes
+    return total / (1024 * 1024)
+
+
+def time_per_command(commands: int, get_table) -> float:
+    """Tempo médio (ms) de execute_analysis_command com a tabela devolvida por get_table."""
+    started = time.perf_counter()
+    for _ in range(commands):
+        app.execute_analysis_command(COMMAND, get_table())
+    return (time.perf_counter() - started) / commands * 1000
+
+
+def main() -> int:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print('=' * 60)
+    print(f'CONSOLIDAÇÃO DAS TABELAS ({rows:,} linhas, média de {commands} comandos)')
+    print('=' * 60)
+    print(f"  {'tabelas':>7}{'concat/comando':>17}{'consolidada':>14}{'mem. cópias':>14}{'mem. fatias':>14}")
+
+    for count in TABLE_COUNTS:
+        tables = build_tables(rows, count)
+        consolidated = consolidate_tables(tables, version=1)
+        copies = resident_mb(tables, consolidated, shared=False)
+        slices = resident_mb(tables, consolidated)
+
+        # Comportamento anterior: pd.concat das tabelas a cada comando
+        frames = [table['df'] for table in tables]
+        per_command = time_per_command(
+            commands, lambda: {**consolidated, 'df': pd.concat(frames, ignore_index=True)}
+        )
+        reused = time_per_command(commands, lambda: consolidated)
+        print(f"  {count:>7}{per_command:>14.2f} ms{reused:>11.2f} ms{copies:>11.1f} MB{slices:>11.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória por consulta do DriveBot
+Mede o pico de RSS de cada comando de análise (execute_analysis_command) com
+o Copy-on-Write do pandas ligado e desligado, cada modo em um processo próprio
+
+Uso: python benchmark_query_memory.py [linhas]
+Requer Linux (o pico é zerado a cada consulta via /proc/self/clear_refs)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+# Comandos medidos (mesmo formato gerado pelo tradutor do DriveBot)
+QUERIES = [
+    ('soma, sem filtros', {
+        'tool': 'calculate_metric',
+        'params': {'metric_column': 'Receita_Total', 'operation': 'sum', 'filters': {}},
+    }),
+    ('soma, região + ano', {
+        'tool': 'calculate_metric',
+        'params': {'metric_column': 'Receita_Total', 'operation': 'sum',
+                   'filters': {'Região': 'Sudeste', 'Data': 2023}},
+    }),
+    ('ranking, meses 1-3', {
+        'tool': 'get_ranking',
+        'params': {'group_by_column': 'Produto', 'metric_column': 'Receita_Total',
+                   'operation': 'sum', 'top_n': 5, 'filters': {'Data': [1, 2, 3]}},
+    }),
+    ('média, produtos + quantidade', {
+        'tool': 'calculate_metric',
+        'params': {'metric_column': 'Receita_Total', 'operation': 'mean',
+                   'filters': {'Produto': ['Produto 1', 'Produto 2', 'Produto 3'], 'Quantidade': 5}},
+    }),
+]
+
+
+def _status_kb(field: str) -> int:
+    """Valor (kB) de um campo de /proc/self/status."""
+    with open('/proc/self/status') as fh:
+        for line in fh:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise RuntimeError(f'{field} indisponível')
+
+
+def _reset_peak() -> None:
+    """Zera o pico de RSS (VmHWM) do processo."""
+    with open('/proc/self/clear_refs', 'w') as fh:
+        fh.write('5')
+
+
+def build_table(rows: int):
+    """Tabela consolidada sintética com o mesmo pipeline da ingestão."""
+    import numpy as np
+    import pandas as pd
+    from src.utils.ingest_pipeline import consolidate_tables, prepare_table
+
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'Data': pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit='D'),
+        'Região': rng.choice(['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul'], rows),
+        'Produto': rng.choice([f'Produto {i}' for i in range(50)], rows),
+        'Quantidade': rng.integers(1, 20, rows),
+        'Receita_Total': rng.uniform(10, 5000, rows).round(2),
+    })
+    return consolidate_tables([prepare_table('vendas.csv', df)], version=1)
+
+
+def run_worker(rows: int) -> None:
+    """Executa as consultas neste processo e imprime o pico de cada uma (JSON)."""
+    import app  # Configura o pandas como o servidor (PANDAS_COPY_ON_WRITE)
+
+    table = build_table(rows)
+    # Primeira execução de cada consulta monta índices e colunas virtuais (custo de ingestão)
+    for _label, command in QUERIES:
+        app.execute_analysis_command(command, table)
+
+    results = {}
+    for label, command in QUERIES:
+        before = _status_kb('VmRSS')
+        _reset_peak()
+        app.execute_analysis_command(command, table)
+        results[label] = (_status_kb('VmHWM') - before) / 1024
+    print(json.dumps(results))
+
+
+def run_mode(rows: int, copy_on_write: bool) -> dict:
+    """Roda o worker em um processo novo com o modo informado."""
+    env = {
+        **os.environ,
+        'PANDAS_COPY_ON_WRITE': 'true' if copy_on_write else 'false',
+        # Arrays grandes sempre em mmap: memória liberada sai do RSS e cada pico é visível
+        'MALLOC_MMAP_THRESHOLD_': '131072',
+    }
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', str(rows)],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    if not os.path.exists('/proc/self/clear_refs'):
+        print('❌ Benchmark requer Linux (/proc/self/clear_refs)')
+        return 1
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+
+    print('=' * 60)
+    print(f'PICO DE RSS POR CONSULTA ({rows:,} linhas)')
+    print('=' * 60)
+    without_cow = run_mode(rows, copy_on_write=False)
+    with_cow = run_mode(rows, copy_on_write=True)
+
+    print(f"  {'consulta':<32}{'CoW off':>12}{'CoW on':>12}")
+    for label, _command in QUERIES:
+        print(f"  {label:<32}{without_cow[label]:>9.1f} MB{with_cow[label]:>9.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--worker':
+        run_worker(int(sys.argv[2]))
+    else:
+        sys.exit(main())
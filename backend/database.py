@@ -109,12 +109,40 @@ else:
                 dataframe_json TEXT NOT NULL,
                 metadata_json TEXT NOT NULL,
                 files_info TEXT NOT NULL,
+                dataframe_blob BLOB,
+                dataframe_format TEXT NOT NULL DEFAULT 'json',
+                dataframe_path TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
         ''')
         
+        # Migração de bancos existentes: colunas do armazenamento binário (Arrow IPC)
+        cursor.execute('PRAGMA table_info(alphabot_sessions)')
+        session_columns = {row['name'] for row in cursor.fetchall()}
+        if 'dataframe_blob' not in session_columns:
+            cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN dataframe_blob BLOB')
+        if 'dataframe_format' not in session_columns:
+            cursor.execute("ALTER TABLE alphabot_sessions ADD COLUMN dataframe_format TEXT NOT NULL DEFAULT 'json'")
+        if 'dataframe_path' not in session_columns:
+            cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN dataframe_path TEXT')
+        if 'content_hash' not in session_columns:
+            cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN content_hash TEXT')
+        
+        # Datasets processados, endereçados pelo hash do conteúdo dos arquivos enviados.
+        # Sessões com dataframe_format = 'dataset' apenas referenciam um registro daqui.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alphabot_datasets (
+                content_hash TEXT PRIMARY KEY,
+                dataframe_blob BLOB,
+                dataframe_format TEXT NOT NULL,
+                dataframe_path TEXT,
+                metadata_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS alphabot_conversations (
                 id TEXT PRIMARY KEY,
@@ -148,6 +176,7 @@ else:
         
         # Índices para tabelas AlphaBot
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_sessions_user_id ON alphabot_sessions(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_sessions_content_hash ON alphabot_sessions(content_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_conversations_session_id ON alphabot_conversations(session_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_conversations_user_id ON alphabot_conversations(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_messages_conversation_id ON alphabot_messages(conversation_id)')
@@ -532,21 +561,47 @@ else:
     # ALPHABOT SESSIONS E CONVERSATIONS
     # ========================================
 
-    def create_alphabot_session(user_id: int, session_id: str, dataframe_json: str, metadata: Dict[str, Any], files_info: List[str]) -> bool:
-        """Cria uma sessão do AlphaBot."""
+    def create_alphabot_session(
+        user_id: int,
+        session_id: str,
+        dataframe_json: Optional[str],
+        metadata: Dict[str, Any],
+        files_info: List[str],
+        dataframe_blob: Optional[bytes] = None,
+        dataframe_path: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> bool:
+        """
+        Cria uma sessão do AlphaBot.
+        
+        Quando dataframe_blob (Arrow IPC) é informado, o DataFrame é salvo em
+        formato binário e dataframe_json fica vazio. Quando dataframe_path é
+        informado, apenas a referência ao arquivo Arrow no volume é salva.
+        Com content_hash e sem DataFrame, a sessão reutiliza o dataset já
+        processado em alphabot_datasets.
+        """
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
             metadata_json = json.dumps(metadata)
             files_info_json = json.dumps(files_info)
+            if dataframe_path:
+                dataframe_format = 'arrow_file'
+            elif dataframe_blob is not None:
+                dataframe_format = 'arrow'
+            elif content_hash and not dataframe_json:
+                dataframe_format = 'dataset'
+            else:
+                dataframe_format = 'json'
+            blob = sqlite3.Binary(dataframe_blob) if dataframe_blob is not None else None
             
             # SQLite usa REPLACE para UPSERT
             cursor.execute(
                 '''INSERT OR REPLACE INTO alphabot_sessions 
-                   (id, user_id, dataframe_json, metadata_json, files_info, created_at, updated_at) 
-                   VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)''',
-                (session_id, user_id, dataframe_json, metadata_json, files_info_json)
+                   (id, user_id, dataframe_json, metadata_json, files_info, dataframe_blob, dataframe_format, dataframe_path, content_hash, created_at, updated_at) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)''',
+                (session_id, user_id, dataframe_json or '', metadata_json, files_info_json, blob, dataframe_format, dataframe_path, content_hash)
             )
             
             conn.commit()
@@ -557,15 +612,25 @@ else:
             return False
 
     def get_alphabot_session(user_id: int, session_id: str) -> Optional[Dict[str, Any]]:
-        """Retorna uma sessão do AlphaBot."""
+        """
+        Retorna uma sessão do AlphaBot.
+        
+        Sessões que referenciam um dataset deduplicado retornam o DataFrame
+        (blob ou arquivo) do registro em alphabot_datasets.
+        """
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
             cursor.execute(
-                '''SELECT id, user_id, dataframe_json, metadata_json, files_info, created_at, updated_at 
-                   FROM alphabot_sessions 
-                   WHERE id = ? AND user_id = ?''',
+                '''SELECT s.id, s.user_id, s.dataframe_json, s.metadata_json, s.files_info, s.content_hash,
+                          s.created_at, s.updated_at,
+                          CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_blob ELSE s.dataframe_blob END AS dataframe_blob,
+                          CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_format ELSE s.dataframe_format END AS dataframe_format,
+                          CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_path ELSE s.dataframe_path END AS dataframe_path
+                   FROM alphabot_sessions s
+                   LEFT JOIN alphabot_datasets d ON d.content_hash = s.content_hash
+                   WHERE s.id = ? AND s.user_id = ?''',
                 (session_id, user_id)
             )
             
@@ -577,6 +642,10 @@ else:
                     'session_id': row['id'],
                     'user_id': row['user_id'],
                     'dataframe_json': row['dataframe_json'],
+                    'dataframe_blob': bytes(row['dataframe_blob']) if row['dataframe_blob'] is not None else None,
+                    'dataframe_format': row['dataframe_format'] or 'json',
+                    'dataframe_path': row['dataframe_path'],
+                    'content_hash': row['content_hash'],
                     'metadata': json.loads(row['metadata_json']) if row['metadata_json'] else {},
                     'files_info': json.loads(row['files_info']) if row['files_info'] else [],
                     'created_at': row['created_at'],
@@ -587,6 +656,120 @@ else:
             print(f"❌ Erro ao buscar sessão AlphaBot: {e}")
             return None
 
+    def get_alphabot_dataset(content_hash: str) -> Optional[Dict[str, Any]]:
+        """Retorna o dataset processado associado a um hash de conteúdo."""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                '''SELECT content_hash, dataframe_blob, dataframe_format, dataframe_path, metadata_json, created_at 
+                   FROM alphabot_datasets 
+                   WHERE content_hash = ?''',
+                (content_hash,)
+            )
+            
+            row = cursor.fetchone()
+            conn.close()
+            
+            if row:
+                return {
+                    'content_hash': row['content_hash'],
+                    'dataframe_blob': bytes(row['dataframe_blob']) if row['dataframe_blob'] is not None else None,
+                    'dataframe_format': row['dataframe_format'],
+                    'dataframe_path': row['dataframe_path'],
+                    'metadata': json.loads(row['metadata_json']) if row['metadata_json'] else {},
+                    'created_at': row['created_at']
+                }
+            return None
+        except Exception as e:
+            print(f"❌ Erro ao buscar dataset AlphaBot: {e}")
+            return None
+
+    def create_alphabot_dataset(
+        content_hash: str,
+        metadata: Dict[str, Any],
+        dataframe_blob: Optional[bytes] = None,
+        dataframe_path: Optional[str] = None
+    ) -> bool:
+        """Registra (ou substitui) o dataset processado de um hash de conteúdo."""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            dataframe_format = 'arrow_file' if dataframe_path else 'arrow'
+            blob = sqlite3.Binary(dataframe_blob) if dataframe_blob is not None else None
+            
+            cursor.execute(
+                '''INSERT OR REPLACE INTO alphabot_datasets 
+                   (content_hash, dataframe_blob, dataframe_format, dataframe_path, metadata_json, created_at) 
+                   VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+                (content_hash, blob, dataframe_format, dataframe_path, json.dumps(metadata))
+            )
+            
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao criar dataset AlphaBot: {e}")
+            return False
+
+    def update_alphabot_session_dataframe(session_id: str, dataframe_blob: bytes) -> bool:
+        """
+        Regrava o DataFrame de uma sessão em formato binário (Arrow IPC).
+        Usado na migração de sessões salvas no JSON legado.
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                '''UPDATE alphabot_sessions 
+                   SET dataframe_blob = ?, dataframe_format = 'arrow', dataframe_json = '', updated_at = CURRENT_TIMESTAMP 
+                   WHERE id = ?''',
+                (sqlite3.Binary(dataframe_blob), session_id)
+            )
+            success = cursor.rowcount > 0
+            conn.commit()
+            conn.close()
+            return success
+        except Exception as e:
+            print(f"❌ Erro ao atualizar DataFrame da sessão AlphaBot: {e}")
+            return False
+
+    def get_legacy_alphabot_session_ids() -> List[str]:
+        """Lista IDs das sessões do AlphaBot ainda salvas no formato JSON legado."""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT id FROM alphabot_sessions WHERE dataframe_format = 'json'")
+            rows = cursor.fetchall()
+            conn.close()
+            
+            return [row['id'] for row in rows]
+        except Exception as e:
+            print(f"❌ Erro ao listar sessões legadas AlphaBot: {e}")
+            return []
+
+    def get_alphabot_session_legacy_json(session_id: str) -> Optional[str]:
+        """Retorna o JSON legado do DataFrame de uma sessão (sem filtro por usuário)."""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                "SELECT dataframe_json FROM alphabot_sessions WHERE id = ? AND dataframe_format = 'json'",
+                (session_id,)
+            )
+            row = cursor.fetchone()
+            conn.close()
+            
+            return row['dataframe_json'] if row else None
+        except Exception as e:
+            print(f"❌ Erro ao buscar JSON legado da sessão AlphaBot: {e}")
+            return None
+
     def get_user_alphabot_sessions(user_id: int) -> List[Dict[str, Any]]:
         """Lista todas as sessões do AlphaBot do usuário."""
         try:
@@ -761,19 +944,41 @@ else:
             return []
 
     def delete_alphabot_session(user_id: int, session_id: str) -> bool:
-        """Delete uma sessão do AlphaBot."""
+        """Delete uma sessão do AlphaBot (e o arquivo Arrow no volume, se houver)."""
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
+            cursor.execute(
+                'SELECT dataframe_path, content_hash FROM alphabot_sessions WHERE id = ? AND user_id = ?',
+                (session_id, user_id)
+            )
+            row = cursor.fetchone()
+            dataframe_path = row['dataframe_path'] if row else None
+            content_hash = row['content_hash'] if row else None
+            
             cursor.execute(
                 'DELETE FROM alphabot_sessions WHERE id = ? AND user_id = ?',
                 (session_id, user_id)
             )
             success = cursor.rowcount > 0
+            
+            # Dataset deduplicado só é removido quando nenhuma sessão o referencia mais
+            if success and content_hash:
+                cursor.execute('SELECT COUNT(*) AS refs FROM alphabot_sessions WHERE content_hash = ?', (content_hash,))
+                if cursor.fetchone()['refs'] == 0:
+                    cursor.execute('SELECT dataframe_path FROM alphabot_datasets WHERE content_hash = ?', (content_hash,))
+                    dataset_row = cursor.fetchone()
+                    cursor.execute('DELETE FROM alphabot_datasets WHERE content_hash = ?', (content_hash,))
+                    if dataset_row and dataset_row['dataframe_path'] and not dataframe_path:
+                        dataframe_path = dataset_row['dataframe_path']
+            
             conn.commit()
             conn.close()
             
+            if success and dataframe_path and os.path.exists(dataframe_path):
+                os.remove(dataframe_path)
+            
             if success:
                 print(f"✅ Sessão AlphaBot removida: {session_id}")
                 return True
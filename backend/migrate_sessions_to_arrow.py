@@ -0,0 +1,79 @@
+"""
+Script de Migração das Sessões AlphaBot: JSON → Arrow IPC
+Autor: ALPHABOT
+
+Converte os DataFrames das sessões salvas no formato legado
+(to_json(orient='split')) para o blob binário Arrow IPC, preservando dtypes.
+Funciona tanto com SQLite quanto com PostgreSQL (via DATABASE_URL).
+
+Sessões legadas também são convertidas automaticamente no primeiro acesso
+pelo /api/alphabot/chat; este script permite migrar tudo de uma vez.
+"""
+
+import os
+import sys
+
+# Adicionar o diretório do backend ao path
+sys.path.append(os.path.dirname(__file__))
+
+
+def migrate_sessions_to_arrow(dry_run: bool = False) -> bool:
+    """
+    Migra todas as sessões AlphaBot em JSON para Arrow IPC.
+
+    Args:
+        dry_run: Apenas lista as sessões que seriam migradas
+
+    Returns:
+        True se todas as sessões foram migradas com sucesso
+    """
+    import database
+    from src.utils.dataframe_storage import convert_json_to_arrow
+
+    print("🔄 Iniciando migração das sessões AlphaBot (JSON → Arrow)...")
+    database.init_database()
+
+    session_ids = database.get_legacy_alphabot_session_ids()
+    if not session_ids:
+        print("✅ Nenhuma sessão no formato JSON legado. Nada para migrar.")
+        return True
+
+    print(f"📋 Sessões legadas encontradas: {len(session_ids)}")
+    if dry_run:
+        for session_id in session_ids:
+            print(f"  • {session_id}")
+        return True
+
+    migrated = 0
+    failed = 0
+    for session_id in session_ids:
+        try:
+            dataframe_json = database.get_alphabot_session_legacy_json(session_id)
+            if not dataframe_json:
+                print(f"  ⚠️ {session_id}: JSON vazio, ignorada")
+                failed += 1
+                continue
+
+            blob = convert_json_to_arrow(dataframe_json)
+            if database.update_alphabot_session_dataframe(session_id, blob):
+                migrated += 1
+                print(f"  ✅ {session_id}: {len(dataframe_json):,} bytes JSON → {len(blob):,} bytes Arrow")
+            else:
+                failed += 1
+                print(f"  ❌ {session_id}: falha ao gravar blob")
+        except Exception as e:
+            failed += 1
+            print(f"  ❌ {session_id}: {e}")
+
+    print(f"📊 Sessões migradas: {migrated}/{len(session_ids)}")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Migrar sessões AlphaBot de JSON para Arrow IPC')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas listar sessões legadas')
+    args = parser.parse_args()
+
+    success = migrate_sessions_to_arrow(dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
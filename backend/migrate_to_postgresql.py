@@ -46,6 +46,7 @@ def migrate_sqlite_to_postgresql():
             create_conversation as create_pg_conversation,
             add_message as add_pg_message,
             create_alphabot_session as create_pg_session,
+            create_alphabot_dataset as create_pg_dataset,
             create_alphabot_conversation as create_pg_alpha_conversation,
             add_alphabot_message as add_pg_alpha_message
         )
@@ -138,6 +139,19 @@ def migrate_sqlite_to_postgresql():
         
         # 5. Migrar sessões AlphaBot (se existirem)
         try:
+            # Datasets deduplicados primeiro: sessões 'dataset' apenas os referenciam
+            try:
+                sqlite_cursor.execute("SELECT * FROM alphabot_datasets")
+                for dataset in sqlite_cursor.fetchall():
+                    create_pg_dataset(
+                        dataset['content_hash'],
+                        json.loads(dataset['metadata_json']) if dataset['metadata_json'] else {},
+                        dataframe_blob=bytes(dataset['dataframe_blob']) if dataset['dataframe_blob'] is not None else None,
+                        dataframe_path=dataset['dataframe_path']
+                    )
+            except sqlite3.OperationalError:
+                pass
+            
             sqlite_cursor.execute("SELECT * FROM alphabot_sessions")
             alpha_sessions = sqlite_cursor.fetchall()
             
@@ -162,12 +176,25 @@ def migrate_sqlite_to_postgresql():
                     except:
                         pass
                     
+                    # Sessões já convertidas para Arrow IPC levam o blob binário junto;
+                    # sessões em arquivo no volume levam apenas a referência
+                    session_keys = session.keys()
+                    dataframe_blob = None
+                    dataframe_path = None
+                    if 'dataframe_format' in session_keys and session['dataframe_format'] == 'arrow':
+                        dataframe_blob = bytes(session['dataframe_blob'])
+                    elif 'dataframe_format' in session_keys and session['dataframe_format'] == 'arrow_file':
+                        dataframe_path = session['dataframe_path']
+                    
                     success = create_pg_session(
                         pg_user_id,
                         session['id'],
-                        session['dataframe_json'],
+                        session['dataframe_json'] or None,
                         metadata,
-                        files_info
+                        files_info,
+                        dataframe_blob=dataframe_blob,
+                        dataframe_path=dataframe_path,
+                        content_hash=session['content_hash'] if 'content_hash' in session_keys else None
                     )
                     
                     if success:
@@ -100,15 +100,38 @@ def init_database():
             CREATE TABLE IF NOT EXISTS alphabot_sessions (
                 id VARCHAR(255) PRIMARY KEY,
                 user_id INTEGER NOT NULL,
-                dataframe_json TEXT NOT NULL,
+                dataframe_json TEXT,
                 metadata_json TEXT NOT NULL,
                 files_info TEXT NOT NULL,
+                dataframe_blob BYTEA,
+                dataframe_format VARCHAR(20) NOT NULL DEFAULT 'json',
+                dataframe_path TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
         ''')
         
+        # Migração de bancos existentes: colunas do armazenamento binário (Arrow IPC)
+        cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN IF NOT EXISTS dataframe_blob BYTEA')
+        cursor.execute("ALTER TABLE alphabot_sessions ADD COLUMN IF NOT EXISTS dataframe_format VARCHAR(20) NOT NULL DEFAULT 'json'")
+        cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN IF NOT EXISTS dataframe_path TEXT')
+        cursor.execute('ALTER TABLE alphabot_sessions ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)')
+        cursor.execute('ALTER TABLE alphabot_sessions ALTER COLUMN dataframe_json DROP NOT NULL')
+        
+        # Datasets processados, endereçados pelo hash do conteúdo dos arquivos enviados.
+        # Sessões com dataframe_format = 'dataset' apenas referenciam um registro daqui.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alphabot_datasets (
+                content_hash VARCHAR(64) PRIMARY KEY,
+                dataframe_blob BYTEA,
+                dataframe_format VARCHAR(20) NOT NULL,
+                dataframe_path TEXT,
+                metadata_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS alphabot_conversations (
                 id VARCHAR(255) PRIMARY KEY,
@@ -140,6 +163,7 @@ def init_database():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_sessions_user_id ON alphabot_sessions(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_sessions_content_hash ON alphabot_sessions(content_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_conversations_session_id ON alphabot_conversations(session_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_conversations_user_id ON alphabot_conversations(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alphabot_messages_conversation_id ON alphabot_messages(conversation_id)')
@@ -481,25 +505,55 @@ def clear_alphabot_data(user_id: int) -> bool:
 # ALPHABOT SESSIONS E CONVERSATIONS
 # ========================================
 
-def create_alphabot_session(user_id: int, session_id: str, dataframe_json: str, metadata: Dict[str, Any], files_info: List[str]) -> bool:
-    """Cria uma sessão do AlphaBot."""
+def create_alphabot_session(
+    user_id: int,
+    session_id: str,
+    dataframe_json: Optional[str],
+    metadata: Dict[str, Any],
+    files_info: List[str],
+    dataframe_blob: Optional[bytes] = None,
+    dataframe_path: Optional[str] = None,
+    content_hash: Optional[str] = None
+) -> bool:
+    """
+    Cria uma sessão do AlphaBot.
+    
+    Quando dataframe_blob (Arrow IPC) é informado, o DataFrame é salvo em
+    formato binário e dataframe_json fica nulo. Quando dataframe_path é
+    informado, apenas a referência ao arquivo Arrow no volume é salva.
+    Com content_hash e sem DataFrame, a sessão reutiliza o dataset já
+    processado em alphabot_datasets.
+    """
     with get_connection() as conn:
         cursor = conn.cursor()
         
         try:
             metadata_json = json.dumps(metadata)
             files_info_json = json.dumps(files_info)
+            if dataframe_path:
+                dataframe_format = 'arrow_file'
+            elif dataframe_blob is not None:
+                dataframe_format = 'arrow'
+            elif content_hash and not dataframe_json:
+                dataframe_format = 'dataset'
+            else:
+                dataframe_format = 'json'
+            blob = psycopg2.Binary(dataframe_blob) if dataframe_blob is not None else None
             
             cursor.execute(
                 '''INSERT INTO alphabot_sessions 
-                   (id, user_id, dataframe_json, metadata_json, files_info, created_at, updated_at) 
-                   VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                   (id, user_id, dataframe_json, metadata_json, files_info, dataframe_blob, dataframe_format, dataframe_path, content_hash, created_at, updated_at) 
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
                    ON CONFLICT (id) DO UPDATE SET
                    dataframe_json = EXCLUDED.dataframe_json,
                    metadata_json = EXCLUDED.metadata_json,
                    files_info = EXCLUDED.files_info,
+                   dataframe_blob = EXCLUDED.dataframe_blob,
+                   dataframe_format = EXCLUDED.dataframe_format,
+                   dataframe_path = EXCLUDED.dataframe_path,
+                   content_hash = EXCLUDED.content_hash,
                    updated_at = CURRENT_TIMESTAMP''',
-                (session_id, user_id, dataframe_json, metadata_json, files_info_json)
+                (session_id, user_id, dataframe_json, metadata_json, files_info_json, blob, dataframe_format, dataframe_path, content_hash)
             )
             
             conn.commit()
@@ -508,14 +562,24 @@ def create_alphabot_session(user_id: int, session_id: str, dataframe_json: str,
             return False
 
 def get_alphabot_session(user_id: int, session_id: str) -> Optional[Dict[str, Any]]:
-    """Retorna uma sessão do AlphaBot."""
+    """
+    Retorna uma sessão do AlphaBot.
+    
+    Sessões que referenciam um dataset deduplicado retornam o DataFrame
+    (blob ou arquivo) do registro em alphabot_datasets.
+    """
     with get_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute(
-            '''SELECT id, user_id, dataframe_json, metadata_json, files_info, created_at, updated_at 
-               FROM alphabot_sessions 
-               WHERE id = %s AND user_id = %s''',
+            '''SELECT s.id, s.user_id, s.dataframe_json, s.metadata_json, s.files_info, s.content_hash,
+                      s.created_at, s.updated_at,
+                      CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_blob ELSE s.dataframe_blob END AS dataframe_blob,
+                      CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_format ELSE s.dataframe_format END AS dataframe_format,
+                      CASE WHEN s.dataframe_format = 'dataset' THEN d.dataframe_path ELSE s.dataframe_path END AS dataframe_path
+               FROM alphabot_sessions s
+               LEFT JOIN alphabot_datasets d ON d.content_hash = s.content_hash
+               WHERE s.id = %s AND s.user_id = %s''',
             (session_id, user_id)
         )
         
@@ -525,6 +589,10 @@ def get_alphabot_session(user_id: int, session_id: str) -> Optional[Dict[str, An
                 'session_id': row['id'],
                 'user_id': row['user_id'],
                 'dataframe_json': row['dataframe_json'],
+                'dataframe_blob': bytes(row['dataframe_blob']) if row['dataframe_blob'] is not None else None,
+                'dataframe_format': row['dataframe_format'] or 'json',
+                'dataframe_path': row['dataframe_path'],
+                'content_hash': row['content_hash'],
                 'metadata': json.loads(row['metadata_json']) if row['metadata_json'] else {},
                 'files_info': json.loads(row['files_info']) if row['files_info'] else [],
                 'created_at': row['created_at'],
@@ -532,6 +600,103 @@ def get_alphabot_session(user_id: int, session_id: str) -> Optional[Dict[str, An
             }
         return None
 
+def get_alphabot_dataset(content_hash: str) -> Optional[Dict[str, Any]]:
+    """Retorna o dataset processado associado a um hash de conteúdo."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            '''SELECT content_hash, dataframe_blob, dataframe_format, dataframe_path, metadata_json, created_at 
+               FROM alphabot_datasets 
+               WHERE content_hash = %s''',
+            (content_hash,)
+        )
+        
+        row = cursor.fetchone()
+        if row:
+            return {
+                'content_hash': row['content_hash'],
+                'dataframe_blob': bytes(row['dataframe_blob']) if row['dataframe_blob'] is not None else None,
+                'dataframe_format': row['dataframe_format'],
+                'dataframe_path': row['dataframe_path'],
+                'metadata': json.loads(row['metadata_json']) if row['metadata_json'] else {},
+                'created_at': row['created_at']
+            }
+        return None
+
+def create_alphabot_dataset(
+    content_hash: str,
+    metadata: Dict[str, Any],
+    dataframe_blob: Optional[bytes] = None,
+    dataframe_path: Optional[str] = None
+) -> bool:
+    """Registra (ou substitui) o dataset processado de um hash de conteúdo."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            dataframe_format = 'arrow_file' if dataframe_path else 'arrow'
+            blob = psycopg2.Binary(dataframe_blob) if dataframe_blob is not None else None
+            
+            cursor.execute(
+                '''INSERT INTO alphabot_datasets 
+                   (content_hash, dataframe_blob, dataframe_format, dataframe_path, metadata_json, created_at) 
+                   VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                   ON CONFLICT (content_hash) DO UPDATE SET
+                   dataframe_blob = EXCLUDED.dataframe_blob,
+                   dataframe_format = EXCLUDED.dataframe_format,
+                   dataframe_path = EXCLUDED.dataframe_path,
+                   metadata_json = EXCLUDED.metadata_json''',
+                (content_hash, blob, dataframe_format, dataframe_path, json.dumps(metadata))
+            )
+            
+            conn.commit()
+            return True
+        except Exception:
+            return False
+
+def update_alphabot_session_dataframe(session_id: str, dataframe_blob: bytes) -> bool:
+    """
+    Regrava o DataFrame de uma sessão em formato binário (Arrow IPC).
+    Usado na migração de sessões salvas no JSON legado.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                '''UPDATE alphabot_sessions 
+                   SET dataframe_blob = %s, dataframe_format = 'arrow', dataframe_json = NULL, updated_at = CURRENT_TIMESTAMP 
+                   WHERE id = %s''',
+                (psycopg2.Binary(dataframe_blob), session_id)
+            )
+            success = cursor.rowcount > 0
+            conn.commit()
+            return success
+        except Exception:
+            return False
+
+def get_legacy_alphabot_session_ids() -> List[str]:
+    """Lista IDs das sessões do AlphaBot ainda salvas no formato JSON legado."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id FROM alphabot_sessions WHERE dataframe_format = 'json'")
+        rows = cursor.fetchall()
+        return [row['id'] for row in rows]
+
+def get_alphabot_session_legacy_json(session_id: str) -> Optional[str]:
+    """Retorna o JSON legado do DataFrame de uma sessão (sem filtro por usuário)."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT dataframe_json FROM alphabot_sessions WHERE id = %s AND dataframe_format = 'json'",
+            (session_id,)
+        )
+        row = cursor.fetchone()
+        return row['dataframe_json'] if row else None
+
 def get_user_alphabot_sessions(user_id: int) -> List[Dict[str, Any]]:
     """Lista todas as sessões do AlphaBot do usuário."""
     with get_connection() as conn:
@@ -678,17 +843,34 @@ def get_user_alphabot_conversations(user_id: int) -> List[Dict[str, Any]]:
         return [dict(row) for row in rows]
 
 def delete_alphabot_session(user_id: int, session_id: str) -> bool:
-    """Delete uma sessão do AlphaBot."""
+    """Delete uma sessão do AlphaBot (e o arquivo Arrow no volume, se houver)."""
     with get_connection() as conn:
         cursor = conn.cursor()
         
         try:
             cursor.execute(
-                'DELETE FROM alphabot_sessions WHERE id = %s AND user_id = %s',
+                'DELETE FROM alphabot_sessions WHERE id = %s AND user_id = %s RETURNING dataframe_path, content_hash',
                 (session_id, user_id)
             )
-            success = cursor.rowcount > 0
+            row = cursor.fetchone()
+            dataframe_path = row['dataframe_path'] if row else None
+            
+            # Dataset deduplicado só é removido quando nenhuma sessão o referencia mais
+            if row and row['content_hash']:
+                cursor.execute(
+                    '''DELETE FROM alphabot_datasets 
+                       WHERE content_hash = %s 
+                       AND NOT EXISTS (SELECT 1 FROM alphabot_sessions WHERE content_hash = %s)
+                       RETURNING dataframe_path''',
+                    (row['content_hash'], row['content_hash'])
+                )
+                dataset_row = cursor.fetchone()
+                if dataset_row and dataset_row['dataframe_path'] and not dataframe_path:
+                    dataframe_path = dataset_row['dataframe_path']
             conn.commit()
-            return success
+            
+            if dataframe_path and os.path.exists(dataframe_path):
+                os.remove(dataframe_path)
+            return row is not None
         except Exception:
             return False
\ No newline at end of file
@@ -4,19 +4,41 @@ Endpoints para upload e análise de planilhas anexadas
 
 Correções críticas:
 - Isolamento de sessão por usuário (user_id + session_id)
-- Processamento unificado de dados (força tipagem Quantidade/Receita/Data)
+- Pipeline único de ingestão (tipagem de Quantidade/Receita/Data uma única vez)
 - Persistência completa de histórico de chat (user/assistant)
 """
 
-import io
+import os
 import uuid
 from typing import Dict, Any
 from flask import Blueprint, request, jsonify
 import pandas as pd
 
-from src.services import get_ai_service, get_data_analyzer
+from src.services import get_ai_service, get_data_analyzer, get_dataframe_cache, get_session_manager
+from src.services.dataframe_cache import dataframe_nbytes
+from src.config.settings import ALPHABOT_SESSION_FILE_MIN_BYTES, ALPHABOT_MAX_UPLOAD_BYTES
 from src.utils import allowed_file, ALLOWED_EXTENSIONS
-from src.utils.data_processor import process_dataframe_unified
+from src.utils.data_processor import compact_dataframe, build_revenue_rollup, build_dataset_profile
+from src.utils.ingest_pipeline import (
+    stage_timer,
+    merge_stage_timings,
+    format_stage_timings,
+    profile_dataset,
+)
+from src.utils.dataframe_storage import (
+    STORAGE_FORMAT_ARROW,
+    STORAGE_FORMAT_ARROW_FILE,
+    STORAGE_FORMAT_JSON,
+    serialize_dataframe,
+    write_session_file,
+    delete_session_file,
+    load_session_dataframe,
+    convert_json_to_arrow,
+    fingerprint_files,
+)
+from src.utils.file_handlers import spool_to_tempfile, UploadTooLargeError
+from src.utils.inference_cache import get_inference_cache
+from src.utils.virtual_columns import virtual_temporal_columns
 import database
 
 
@@ -25,7 +47,10 @@ alphabot_bp = Blueprint('alphabot', __name__, url_prefix='/api/alphabot')
 
 # Armazenamento global para sessões do AlphaBot (ISOLADO POR USUÁRIO)
 # Chave composta: f"{user_id}_{session_id}" quando user_id existir; caso contrário, usa apenas session_id
-ALPHABOT_SESSIONS: Dict[str, Dict[str, Any]] = {}
+# "dataframe" guarda os bytes Arrow IPC (ver src/utils/dataframe_storage.py);
+# datasets grandes ficam em arquivo no volume e apenas "dataframe_path" é mantido.
+# O SessionManager aplica TTL de inatividade e orçamento de memória (spill para disco)
+ALPHABOT_SESSIONS = get_session_manager()
 
 # Armazenamento global para conversações do AlphaBot (histórico de mensagens em memória)
 # Chave: conversation_id -> { "id", "bot_id", "session_id", "user_id", "history": [...] }
@@ -71,6 +96,57 @@ def append_alphabot_message(conversation: Dict[str, Any], role: str, content: st
     })
 
 
+def load_dataframe_from_session_row(session_row: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Reconstrói o DataFrame de uma sessão persistida no banco.
+    
+    Sessões ainda no JSON legado são convertidas para Arrow IPC e regravadas,
+    de modo que os próximos acessos não precisem mais do parse de texto.
+    
+    Args:
+        session_row: Dict retornado por database.get_alphabot_session
+    
+    Returns:
+        DataFrame da sessão
+    """
+    if session_row.get("dataframe_format") == STORAGE_FORMAT_ARROW_FILE and session_row.get("dataframe_path"):
+        return load_session_dataframe(session_row["dataframe_path"], STORAGE_FORMAT_ARROW_FILE)
+    
+    if session_row.get("dataframe_format") == STORAGE_FORMAT_ARROW and session_row.get("dataframe_blob"):
+        return load_session_dataframe(session_row["dataframe_blob"], STORAGE_FORMAT_ARROW)
+    
+    dataframe_json = session_row.get("dataframe_json")
+    try:
+        blob = convert_json_to_arrow(dataframe_json)
+    except Exception as e:
+        print(f"[AlphaBot] ⚠️ Falha ao migrar sessão {session_row.get('session_id')} para Arrow: {e}")
+        return load_session_dataframe(dataframe_json, STORAGE_FORMAT_JSON)
+
+    # O DataFrame devolvido (e cacheado) é o mesmo que os próximos acessos lerão do blob
+    df = load_session_dataframe(blob, STORAGE_FORMAT_ARROW)
+    try:
+        if database.update_alphabot_session_dataframe(session_row["session_id"], blob):
+            print(f"[AlphaBot] ♻️ Sessão {session_row['session_id']} migrada de JSON para Arrow")
+    except Exception as e:
+        print(f"[AlphaBot] ⚠️ Falha ao gravar a sessão {session_row.get('session_id')} migrada para Arrow: {e}")
+    return df
+
+
+def load_dataframe_from_memory_session(session_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Reconstrói o DataFrame de uma sessão mantida em ALPHABOT_SESSIONS.
+    
+    Args:
+        session_data: Entrada de ALPHABOT_SESSIONS
+    
+    Returns:
+        DataFrame da sessão
+    """
+    if session_data.get("dataframe_path"):
+        return load_session_dataframe(session_data["dataframe_path"], STORAGE_FORMAT_ARROW_FILE)
+    return load_session_dataframe(session_data["dataframe"])
+
+
 @alphabot_bp.route('/upload', methods=['POST'])
 def upload():
     """
@@ -82,7 +158,16 @@ def upload():
     Returns:
         JSON com session_id e metadados dos arquivos processados
     """
+    # Arquivos temporários do upload (removidos ao final, com sucesso ou erro)
+    spooled_paths = []
     try:
+        # Recusar corpos acima do limite antes de o multipart ser lido
+        if request.content_length is not None and request.content_length > ALPHABOT_MAX_UPLOAD_BYTES:
+            return jsonify({
+                "status": "error",
+                "message": f"Upload excede o limite de {ALPHABOT_MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+            }), 413
+        
         # Verificar se há arquivos na requisição
         if 'files' not in request.files:
             return jsonify({
@@ -106,9 +191,11 @@ def upload():
                 "message": "Lista de arquivos vazia."
             }), 400
         
-        # Preparar dados para o analyzer
+        # Preparar dados para o analyzer: (caminho do temporário, nome original)
         files_data = []
+        file_hashes = []
         files_failed = []
+        remaining_bytes = ALPHABOT_MAX_UPLOAD_BYTES
         
         for file in files:
             if not file or file.filename == '':
@@ -125,119 +212,223 @@ def upload():
                 continue
             
             try:
-                # Ler bytes do arquivo
-                file_bytes = file.read()
-                files_data.append((file_bytes, filename))
+                # Gravar em disco em blocos (hash calculado durante a cópia)
+                suffix = os.path.splitext(filename)[1].lower()
+                file_path, file_hash, file_size = spool_to_tempfile(file.stream, suffix=suffix, max_bytes=remaining_bytes)
+                spooled_paths.append(file_path)
+                remaining_bytes -= file_size
+                files_data.append((file_path, filename))
+                file_hashes.append(file_hash)
+            except UploadTooLargeError:
+                # Corpo sem Content-Length (chunked) que ultrapassou o limite durante a cópia
+                return jsonify({
+                    "status": "error",
+                    "message": f"Upload excede o limite de {ALPHABOT_MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+                }), 413
             except Exception as e:
                 files_failed.append({
                     "filename": filename,
                     "reason": f"Erro ao ler arquivo: {str(e)}"
                 })
         
-        # Usar DataAnalyzer para processar arquivos
-        analyzer = get_data_analyzer()
-        result = analyzer.load_files_from_bytes(files_data)
+        # 🔑 Impressão digital do conteúdo: o mesmo conjunto de arquivos reaproveita o dataset já processado
+        content_hash = fingerprint_files(file_hashes) if files_data else None
+        dataset = database.get_alphabot_dataset(content_hash) if content_hash else None
+        if dataset and dataset.get('dataframe_path') and not os.path.exists(dataset['dataframe_path']):
+            print(f"[AlphaBot Upload] ⚠️ Arquivo do dataset {content_hash[:12]} não encontrado, reprocessando")
+            dataset = None
         
-        # Adicionar falhas de validação inicial
-        result['files_failed'].extend(files_failed)
-        
-        # Verificar se pelo menos um arquivo foi lido com sucesso
-        if not result['files_ok']:
-            return jsonify({
-                "status": "error",
-                "message": "Nenhum arquivo válido foi processado.",
-                "files_success": result['files_ok'],
-                "files_failed": result['files_failed']
-            }), 400
-        
-        # Consolidar tabelas
-        consolidated_df = analyzer.consolidate_tables()
-
-        # Alinhar com DriveBot: NÃO remover duplicatas automaticamente (apenas reportar)
-        duplicates_count = int(consolidated_df.duplicated().sum())
-        if duplicates_count > 0:
-            print(f"[AlphaBot] ℹ️ {duplicates_count} linhas duplicadas detectadas (não removidas para paridade com DriveBot)")
-        
-        # Gerar ID de sessão único
+        # Gerar ID de sessão único e chave composta (isolamento por usuário)
         session_id = str(uuid.uuid4())
+        session_key = f"{user_id}_{session_id}" if user_id else session_id
         
-        # Construir sumário básico (antes da unificação) para levantar possíveis colunas temporais
-        summary = analyzer.build_summary(result['files_ok'], result['files_failed'])
-
-        # 🔧 Aplicar processamento UNIFICADO (corrige Quantidade/Receita/Data)
-        try:
-            print(f"[AlphaBot Upload] 📊 Iniciando processamento de {len(consolidated_df)} linhas, {len(consolidated_df.columns)} colunas")
-            print(f"[AlphaBot Upload] Colunas originais: {list(consolidated_df.columns)}")
-            print(f"[AlphaBot Upload] Tipos originais: {dict(consolidated_df.dtypes)}")
+        consolidated_df = None
+        dataframe_blob = None
+        dataframe_path = None
+        dataset_stored = False
+        
+        if dataset:
+            # ♻️ Mesmo conteúdo já processado: nada de parse, unificação ou nova gravação
+            print(f"[AlphaBot Upload] ♻️ Conteúdo já processado (hash {content_hash[:12]}), reutilizando dataset")
+            dataset_metadata = dataset['metadata']
+            failed_by_hash = dataset_metadata.get('files_failed_by_hash', {})
+            result = {'files_ok': [], 'files_failed': files_failed}
+            for (_, filename), file_hash in zip(files_data, file_hashes):
+                if file_hash in failed_by_hash:
+                    result['files_failed'].append({'name': filename, 'reason': failed_by_hash[file_hash]})
+                else:
+                    result['files_ok'].append(filename)
+            dataframe_blob = dataset['dataframe_blob']
+            dataframe_path = dataset['dataframe_path']
+        else:
+            # Usar DataAnalyzer para processar arquivos
+            analyzer = get_data_analyzer()
+            result = analyzer.load_files_from_paths(files_data)
             
-            consolidated_df, processing_metadata = process_dataframe_unified(
-                consolidated_df,
-                source_info="AlphaBot_Upload"
-            )
-            print(f"[AlphaBot Upload] ✅ Processamento unificado concluído: {len(consolidated_df)} linhas")
-            print(f"[AlphaBot Upload] Colunas processadas: {list(consolidated_df.columns)}")
-            print(f"[AlphaBot Upload] Tipos processados: {dict(consolidated_df.dtypes)}")
+            # Falhas de leitura indexadas pelo hash, para reaproveitar em uploads idênticos
+            hash_by_name = {filename: file_hash for (_, filename), file_hash in zip(files_data, file_hashes)}
+            failed_by_hash = {hash_by_name[f['name']]: f['reason'] for f in result['files_failed'] if f['name'] in hash_by_name}
             
-            # Exibir sumário financeiro se disponível
-            if processing_metadata.get('financial_summary'):
-                fin_summary = processing_metadata['financial_summary']
-                print(f"[AlphaBot Upload] 💰 Sumário Financeiro:")
-                print(f"  - Quantidade Total: {fin_summary.get('total_quantidade', 'N/A')}")
-                print(f"  - Receita Total: {fin_summary.get('total_receita_formatted', 'N/A')}")
+            # Adicionar falhas de validação inicial
+            result['files_failed'].extend(files_failed)
             
-        except ValueError as val_error:
-            # Erro específico de conversão de valores
-            print(f"[AlphaBot Upload] ❌ ValueError - Erro de validação de dados: {val_error}")
-            import traceback
-            print(f"[AlphaBot Upload] Stack trace completo:")
-            traceback.print_exc()
-            return jsonify({
-                "status": "error",
-                "message": f"Erro ao processar dados: {str(val_error)}. Verifique se os dados numéricos estão formatados corretamente."
-            }), 400
-        except Exception as proc_error:
-            # Outros erros de processamento
-            print(f"[AlphaBot Upload] ❌ Erro no processamento unificado: {proc_error}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                "status": "error",
-                "message": f"Erro interno ao processar dados: {str(proc_error)}"
-            }), 500
+            # Verificar se pelo menos um arquivo foi lido com sucesso
+            if not result['files_ok']:
+                return jsonify({
+                    "status": "error",
+                    "message": "Nenhum arquivo válido foi processado.",
+                    "files_success": result['files_ok'],
+                    "files_failed": result['files_failed']
+                }), 400
+            
+            # As tabelas chegam tipadas (parse → infer → coerce → derive rodaram por tabela);
+            # aqui restam consolidação, compactação e perfil do dataset final
+            stage_timings = dict(result.get('stage_timings', {}))
+            try:
+                with stage_timer(stage_timings, 'consolidate'):
+                    consolidated_df = analyzer.consolidate_tables()
+                    # Alinhar com DriveBot: NÃO remover duplicatas automaticamente (apenas reportar)
+                    duplicates_count = int(consolidated_df.duplicated().sum())
+                if duplicates_count > 0:
+                    print(f"[AlphaBot] ℹ️ {duplicates_count} linhas duplicadas detectadas (não removidas para paridade com DriveBot)")
+                print(f"[AlphaBot Upload] 📊 Dataset consolidado: {len(consolidated_df)} linhas, {len(consolidated_df.columns)} colunas")
+                print(f"[AlphaBot Upload] Tipos: {dict(consolidated_df.dtypes)}")
+            
+                # 🗜️ Compactar memória (categorias + downcast sem perda) antes de armazenar a sessão
+                with stage_timer(stage_timings, 'compact'):
+                    consolidated_df, compaction_report = compact_dataframe(consolidated_df)
+                print(f"[AlphaBot Upload] 🗜️ Memória: {compaction_report['bytes_before']:,} → {compaction_report['bytes_after']:,} bytes")
+            
+                with stage_timer(stage_timings, 'profile'):
+                    dataset_profile = profile_dataset(consolidated_df)
+            
+                # Exibir sumário financeiro se disponível
+                if dataset_profile.get('financial_summary'):
+                    fin_summary = dataset_profile['financial_summary']
+                    print(f"[AlphaBot Upload] 💰 Sumário Financeiro:")
+                    print(f"  - Quantidade Total: {fin_summary.get('total_quantidade', 'N/A')}")
+                    print(f"  - Receita Total: {fin_summary.get('total_receita_formatted', 'N/A')}")
+            
+            except ValueError as val_error:
+                # Erro específico de conversão de valores
+                print(f"[AlphaBot Upload] ❌ ValueError - Erro de validação de dados: {val_error}")
+                import traceback
+                print(f"[AlphaBot Upload] Stack trace completo:")
+                traceback.print_exc()
+                return jsonify({
+                    "status": "error",
+                    "message": f"Erro ao processar dados: {str(val_error)}. Verifique se os dados numéricos estão formatados corretamente."
+                }), 400
+            except Exception as proc_error:
+                # Outros erros de processamento
+                print(f"[AlphaBot Upload] ❌ Erro no processamento dos dados: {proc_error}")
+                import traceback
+                traceback.print_exc()
+                return jsonify({
+                    "status": "error",
+                    "message": f"Erro interno ao processar dados: {str(proc_error)}"
+                }), 500
+            
+            stage_timings = merge_stage_timings(stage_timings)
+            print(f"[AlphaBot Upload] ⏱️ Etapas: {format_stage_timings(stage_timings)}")
         
-        # Construir chave composta (isolamento por usuário)
-        session_key = f"{user_id}_{session_id}" if user_id else session_id
-
-        # Armazenar DataFrame em sessão (formato JSON) isolado por usuário
-        ALPHABOT_SESSIONS[session_key] = {
-            "dataframe": consolidated_df.to_json(orient='split', date_format='iso'),
-            "metadata": {
+            # Período coberto pelas colunas de data
+            date_cols = dataset_profile['date_columns']
+            date_range = None
+            if dataset_profile['date_range']:
+                date_range = {
+                    "min": analyzer.format_date(dataset_profile['date_range']['min']),
+                    "max": analyzer.format_date(dataset_profile['date_range']['max'])
+                }
+        
+            # Auxiliares de data (Data_Mes, Data_Ano...) são anunciadas, mas calculadas só quando usadas
+            columns = list(consolidated_df.columns) + list(virtual_temporal_columns(date_cols))
+            dataset_metadata = {
                 "total_records": len(consolidated_df),
-                "total_columns": len(consolidated_df.columns),
-                "columns": list(consolidated_df.columns),
-                "date_columns": [c for c, info in processing_metadata.get('columns_processed', {}).items() if info.get('type') == 'temporal'],
-                "files_success": result['files_ok'],
-                "files_failed": result['files_failed']
+                "total_columns": len(columns),
+                "columns": columns,
+                "date_columns": date_cols,
+                "date_range": date_range,
+                "datetime_formats": {table['name']: table['datetime_formats'] for table in analyzer.tables},
+                "duplicates_detected": duplicates_count,
+                "memory_compaction": compaction_report,
+                "stage_timings": stage_timings,
+                "files_failed_by_hash": failed_by_hash,
+                "profile": dataset_profile['profile'],
+                "revenue_rollup": dataset_profile['revenue_rollup']
             }
+
+            # Datasets grandes vão para arquivo Arrow no volume (lido via memory map);
+            # os demais são serializados uma única vez em Arrow IPC.
+            # Com usuário, o dataset é registrado pelo hash e pode ser reaproveitado.
+            storage_id = content_hash if user_id is not None else session_id
+            if dataframe_nbytes(consolidated_df) >= ALPHABOT_SESSION_FILE_MIN_BYTES:
+                try:
+                    dataframe_path = write_session_file(consolidated_df, storage_id)
+                    print(f"[AlphaBot Upload] 💾 DataFrame gravado em arquivo Arrow: {dataframe_path}")
+                except OSError as e:
+                    print(f"[AlphaBot Upload] ⚠️ Falha ao gravar arquivo da sessão, usando blob: {e}")
+            if dataframe_path is None:
+                dataframe_blob = serialize_dataframe(consolidated_df)
+            
+            if user_id is not None:
+                dataset_stored = database.create_alphabot_dataset(
+                    content_hash,
+                    dataset_metadata,
+                    dataframe_blob=dataframe_blob,
+                    dataframe_path=dataframe_path
+                )
+
+        session_metadata = {
+            "total_records": dataset_metadata["total_records"],
+            "total_columns": dataset_metadata["total_columns"],
+            "columns": dataset_metadata["columns"],
+            "date_columns": dataset_metadata["date_columns"],
+            "files_success": result['files_ok'],
+            "files_failed": result['files_failed'],
+            "memory_compaction": dataset_metadata.get("memory_compaction"),
+            "content_hash": content_hash,
+            "profile": dataset_metadata.get("profile")
+        }
+        # Datasets anteriores ao rollup não têm a chave: o chat o calcula no primeiro acesso
+        if "revenue_rollup" in dataset_metadata:
+            session_metadata["revenue_rollup"] = dataset_metadata["revenue_rollup"]
+
+        # Armazenar DataFrame em sessão (formato Arrow) isolado por usuário.
+        # "persisted" indica que o arquivo Arrow pertence ao banco (sessão ou dataset)
+        ALPHABOT_SESSIONS[session_key] = {
+            "dataframe": dataframe_blob,
+            "dataframe_path": dataframe_path,
+            "metadata": session_metadata,
+            "persisted": dataset is not None or dataset_stored
         }
 
+        # Aquecer o cache de DataFrames: a primeira pergunta já não precisa desserializar
+        if consolidated_df is not None:
+            get_dataframe_cache().put((user_id, session_id), consolidated_df, session_metadata)
+
         # Persistir sessão no banco se user_id fornecido
         created_conversation_id = None
         if user_id is not None:
             try:
+                # Sessão que referencia o dataset deduplicado não grava o DataFrame de novo
+                references_dataset = dataset is not None or dataset_stored
                 success = database.create_alphabot_session(
                     user_id=int(user_id),
                     session_id=session_id,
-                    dataframe_json=consolidated_df.to_json(orient='split', date_format='iso'),
+                    dataframe_json=None,
                     metadata={
-                        "total_records": len(consolidated_df),
-                        "total_columns": len(consolidated_df.columns),
-                        "columns": list(consolidated_df.columns),
-                        "date_columns": [c for c, info in processing_metadata.get('columns_processed', {}).items() if info.get('type') == 'temporal']
+                        key: session_metadata[key]
+                        for key in ("total_records", "total_columns", "columns", "date_columns", "profile", "revenue_rollup")
+                        if key in session_metadata
                     },
-                    files_info=result['files_ok']
+                    files_info=result['files_ok'],
+                    dataframe_blob=None if references_dataset else dataframe_blob,
+                    dataframe_path=None if references_dataset else dataframe_path,
+                    content_hash=content_hash if references_dataset else None
                 )
                 if success:
+                    ALPHABOT_SESSIONS[session_key]["persisted"] = True
                     print(f"[AlphaBot Upload] ✅ Sessão persistida no banco para user_id={user_id}, session_id={session_id}")
                     
                     # 🔥 USAR conversation_id existente ou criar novo
@@ -276,42 +467,23 @@ def upload():
                 import traceback
                 traceback.print_exc()
         
-        # Calcular período se houver colunas de data (após unificação)
-        date_range = None
-        date_cols = [c for c, info in processing_metadata.get('columns_processed', {}).items() if info.get('type') == 'temporal']
-        if date_cols:
-            try:
-                min_date = None
-                max_date = None
-                for dc in date_cols:
-                    valid = consolidated_df[dc].dropna()
-                    if not valid.empty:
-                        dmin = valid.min()
-                        dmax = valid.max()
-                        min_date = dmin if min_date is None or dmin < min_date else min_date
-                        max_date = dmax if max_date is None or dmax > max_date else max_date
-                if min_date or max_date:
-                    date_range = {
-                        "min": analyzer.format_date(min_date),
-                        "max": analyzer.format_date(max_date)
-                    }
-            except Exception as _:
-                pass
-        
         # Retornar resposta de sucesso
         response_payload = {
             "status": "success",
             "message": f"{len(result['files_ok'])} arquivo(s) processado(s) com sucesso.",
             "session_id": session_id,
             "metadata": {
-                "total_records": len(consolidated_df),
-                "total_columns": len(consolidated_df.columns),
-                "columns": list(consolidated_df.columns),
-                "date_columns": date_cols,
+                "total_records": dataset_metadata["total_records"],
+                "total_columns": dataset_metadata["total_columns"],
+                "columns": dataset_metadata["columns"],
+                "date_columns": dataset_metadata["date_columns"],
                 "files_success": result['files_ok'],
                 "files_failed": result['files_failed'],
-                "date_range": date_range,
-                "duplicates_detected": duplicates_count
+                "date_range": dataset_metadata.get("date_range"),
+                "duplicates_detected": dataset_metadata.get("duplicates_detected", 0),
+                "dataset_reused": dataset is not None,
+                "file_timings": result.get('file_timings', []),
+                "stage_timings": dataset_metadata.get("stage_timings")
             }
         }
         if created_conversation_id:
@@ -323,6 +495,12 @@ def upload():
             "status": "error",
             "message": f"Erro interno ao processar arquivos: {str(e)}"
         }), 500
+    finally:
+        for path in spooled_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
 
 @alphabot_bp.route('/chat', methods=['POST'])
@@ -351,15 +529,24 @@ def chat():
         # Construir chave de sessão isolada
         session_key = f"{user_id}_{session_id}" if user_id else session_id
 
-        # Recuperar dados da sessão: preferir persistência no banco quando user_id disponível
+        # Recuperar dados da sessão: cache de DataFrames decodificados primeiro,
+        # depois persistência no banco quando user_id disponível
+        dataframe_cache = get_dataframe_cache()
+        cache_key = (int(user_id) if user_id else None, session_id)
         df = None
         metadata = None
-        if user_id:
+        cached = dataframe_cache.get(cache_key)
+        if cached is not None:
+            df = cached["df"]
+            metadata = cached["metadata"]
+        elif user_id:
             session_row = database.get_alphabot_session(int(user_id), session_id)
             if session_row:
                 try:
-                    df = pd.read_json(io.StringIO(session_row["dataframe"]), orient='split')
+                    df = load_dataframe_from_session_row(session_row)
                     metadata = session_row["metadata"]
+                    if isinstance(metadata, dict) and 'files_success' not in metadata:
+                        metadata['files_success'] = session_row.get('files_info') or []
                 except Exception:
                     df = None
                     metadata = None
@@ -372,8 +559,20 @@ def chat():
                     "session_id": session_id
                 }), 404
             session_data = ALPHABOT_SESSIONS[session_key]
-            df = pd.read_json(io.StringIO(session_data["dataframe"]), orient='split')
+            df = load_dataframe_from_memory_session(session_data)
             metadata = session_data["metadata"]
+
+        # Perfil do dataset: calculado no upload; sessões antigas ganham o perfil no
+        # primeiro acesso e o reutilizam pelo cache nas próximas perguntas
+        if not isinstance(metadata, dict):
+            metadata = {}
+        profile = metadata.get('profile')
+        if profile is None:
+            profile = build_dataset_profile(df)
+            metadata['profile'] = profile
+
+        if cached is None:
+            dataframe_cache.put(cache_key, df, metadata)
         
         # Preparar contexto dos dados para o LLM (robusto a metadados ausentes)
         total_records = metadata.get('total_records') if isinstance(metadata, dict) else None
@@ -404,13 +603,13 @@ def chat():
         if date_cols:
             data_context += f"- Colunas Temporais: {', '.join(date_cols)}\n"
         
-        # Análise estatística básica para contexto
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        # Análise estatística básica para contexto (do perfil pré-calculado)
+        numeric_cols = profile['numeric_columns']
         if numeric_cols:
             data_context += f"\n- Colunas Numéricas: {', '.join(numeric_cols[:5])}..."
         
-        # Preparar preview dos dados (primeiras 5 linhas)
-        data_preview = df.head(5).to_markdown(index=False)
+        # Preview dos dados (primeiras 5 linhas, do perfil)
+        data_preview = profile['preview_markdown']
         
         # Garantir conversation_id quando user_id foi informado (auto-criar se necessário)
         if user_id and not conversation_id:
@@ -485,58 +684,29 @@ def chat():
                 years_in_msg = re.findall(r"(19\d{2}|20\d{2})", message)
                 requested_year = int(years_in_msg[0]) if years_in_msg else None
 
-                # Detectar possíveis colunas base de data e seus derivados
-                date_cols = metadata.get('date_columns', []) if isinstance(metadata, dict) else []
-                base_date_col = date_cols[0] if date_cols else None
-                ano_col = f"{base_date_col}_Ano" if base_date_col and f"{base_date_col}_Ano" in df.columns else None
-                mes_col = f"{base_date_col}_Mes" if base_date_col and f"{base_date_col}_Mes" in df.columns else None
-                mes_nome_col = f"{base_date_col}_Mes_Nome" if base_date_col and f"{base_date_col}_Mes_Nome" in df.columns else None
-
-                # Identificar coluna de receita
-                receita_candidates = [c for c in df.columns if any(k in c.lower() for k in ['receita', 'faturamento'])]
-                if not receita_candidates:
-                    receita_candidates = [c for c in df.columns if 'valor' in c.lower() or 'total' in c.lower()]
-                receita_col = None
-                for c in receita_candidates:
-                    if pd.api.types.is_numeric_dtype(df[c]):
-                        receita_col = c
-                        break
-                # Fallback para receita derivada criada pelo processor
-                if not receita_col and 'Receita_Total_Derivada' in df.columns and pd.api.types.is_numeric_dtype(df['Receita_Total_Derivada']):
-                    receita_col = 'Receita_Total_Derivada'
-
-                # Se necessário, tentar derivar receita a partir de quantidade x preço
-                if not receita_col:
-                    qtd_col = next((c for c in df.columns if 'quantidade' in c.lower() and pd.api.types.is_numeric_dtype(df[c])), None)
-                    preco_col = next((c for c in df.columns if any(k in c.lower() for k in ['preco', 'preço']) and pd.api.types.is_numeric_dtype(df[c])), None)
-                    if qtd_col and preco_col:
-                        receita_col = '__tmp_receita__'
-                        df[receita_col] = df[qtd_col].fillna(0) * df[preco_col].fillna(0)
+                # Rollup de receita pré-agregado no upload (sessões antigas: calculado no primeiro acesso)
+                if 'revenue_rollup' not in metadata:
+                    metadata['revenue_rollup'] = build_revenue_rollup(df, metadata.get('date_columns', []))
+                rollup = metadata['revenue_rollup']
 
                 # Prosseguir apenas se houver receita numérica e algum indicador temporal
-                if receita_col and (ano_col or base_date_col in df.columns):
-                    # Filtrar ano
-                    if not requested_year and ano_col:
-                        # Escolher maior ano disponível
-                        try:
-                            requested_year = int(df[ano_col].dropna().max()) if not df[ano_col].dropna().empty else None
-                        except Exception:
-                            requested_year = None
-                    if ano_col and requested_year:
-                        df_year = df[df[ano_col] == requested_year]
-                    elif base_date_col in df.columns and pd.api.types.is_datetime64_any_dtype(df[base_date_col]):
-                        df_year = df[df[base_date_col].dt.year == requested_year] if requested_year else df
-                    else:
-                        df_year = df
+                if rollup:
+                    # Sem ano na pergunta: escolher maior ano disponível na coluna _Ano
+                    if not requested_year and rollup['year_column'] and rollup['years']:
+                        requested_year = max(int(y) for y in rollup['years'])
 
-                    total_receita = float(df_year[receita_col].sum()) if not df_year.empty else 0.0
+                    if requested_year and rollup['has_year']:
+                        total_receita = rollup['years'].get(str(requested_year), {}).get('revenue', 0.0)
+                    else:
+                        total_receita = rollup['total_revenue']
 
                     # Mensal
-                    if mes_col and requested_year:
-                        grp = df_year.groupby([mes_col], dropna=True)[receita_col].sum().reset_index()
-                        grp = grp.sort_values(mes_col)
-                        mes_map = df[[mes_col, mes_nome_col]].dropna().drop_duplicates().set_index(mes_col)[mes_nome_col].to_dict() if mes_nome_col in df.columns else {}
-                        monthly = [(int(r[mes_col]), float(r[receita_col]), mes_map.get(int(r[mes_col]))) for _, r in grp.iterrows()]
+                    if rollup['has_month'] and requested_year:
+                        month_names = rollup['month_names']
+                        monthly = [
+                            (month, revenue, month_names.get(str(month)))
+                            for month, revenue, _ in rollup['months'].get(str(requested_year), [])
+                        ]
                     else:
                         monthly = []
 
@@ -603,26 +773,28 @@ def chat():
 
 Total de registros: {len(df)}
 
-Colunas disponíveis: {', '.join(df.columns.tolist())}
+Colunas disponíveis: {', '.join(columns_list or df.columns.tolist())}
 
 **Estatísticas Resumidas:**
 """
             # Adicionar estatísticas de colunas numéricas
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
             if numeric_cols:
                 analysis_context += "\nColunas Numéricas:\n"
                 for col in numeric_cols[:10]:  # Limitar a 10 para não estourar token
-                    analysis_context += f"- {col}: soma={df[col].sum():,.2f}, média={df[col].mean():,.2f}\n"
+                    stats = profile['numeric'][col]
+                    col_sum = stats['sum'] if stats['sum'] is not None else float('nan')
+                    col_mean = stats['mean'] if stats['mean'] is not None else float('nan')
+                    analysis_context += f"- {col}: soma={col_sum:,.2f}, média={col_mean:,.2f}\n"
             
             # Adicionar informações de colunas categóricas
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = profile['categorical_columns']
             if categorical_cols:
                 analysis_context += "\nColunas Categóricas:\n"
                 for col in categorical_cols[:10]:  # Limitar a 10
-                    unique_vals = df[col].nunique()
+                    unique_vals = profile['categorical'][col]['unique']
                     analysis_context += f"- {col}: {unique_vals} valores únicos"
                     if unique_vals <= 20:  # Mostrar valores se forem poucos
-                        vals = df[col].value_counts().head(5).to_dict()
+                        vals = profile['categorical'][col]['top_values']
                         analysis_context += f" (top 5: {vals})"
                     analysis_context += "\n"
             
@@ -729,7 +901,11 @@ def delete_session(session_id: str):
             "session_id": session_id
         }), 404
     
-    del ALPHABOT_SESSIONS[session_id]
+    session_data = ALPHABOT_SESSIONS.pop(session_id)
+    # O arquivo no volume só pode ser apagado se o banco não o referencia
+    if not session_data.get("persisted"):
+        delete_session_file(session_data.get("dataframe_path"))
+    get_dataframe_cache().invalidate_session(session_id.split('_', 1)[-1])
     
     return jsonify({
         "message": "Sessão removida com sucesso",
@@ -737,6 +913,39 @@ def delete_session(session_id: str):
     }), 200
 
 
+@alphabot_bp.route('/sessions/stats', methods=['GET'])
+def session_manager_stats():
+    """
+    Retorna contagens e uso de memória/disco das sessões em memória.
+    
+    Returns:
+        JSON com sessões em memória, em disco, bytes e contadores de expiração/spill
+    """
+    return jsonify(ALPHABOT_SESSIONS.stats()), 200
+
+
+@alphabot_bp.route('/cache/stats', methods=['GET'])
+def dataframe_cache_stats():
+    """
+    Retorna estatísticas do cache de DataFrames decodificados.
+    
+    Returns:
+        JSON com hits, misses, hit_rate, entradas e bytes em uso
+    """
+    return jsonify(get_dataframe_cache().stats()), 200
+
+
+@alphabot_bp.route('/inference-cache/stats', methods=['GET'])
+def inference_cache_stats():
+    """
+    Retorna estatísticas do cache de inferência de tipos (contadores deste processo).
+    
+    Returns:
+        JSON com hits, misses, hit_rate, invalidações e decisões gravadas
+    """
+    return jsonify(get_inference_cache().stats()), 200
+
+
 # ===============================
 # Endpoints de Histórico AlphaBot
 # ===============================
@@ -29,6 +29,57 @@ EXCEL_MIME_TYPES = {
 # Conversation Settings
 MAX_HISTORY_MESSAGES = 12
 
+# Persistent Data Directory (mesmo volume do alphabot.db no Render/Railway)
+if os.getenv('RENDER'):
+    DATA_DIR = '/opt/render/project/data'
+elif os.getenv('RAILWAY_ENVIRONMENT'):
+    DATA_DIR = os.getenv('RAILWAY_VOLUME_MOUNT_PATH', '/data')
+elif os.getenv('VERCEL'):
+    DATA_DIR = '/tmp'
+else:
+    DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# AlphaBot Session Files
+# Datasets grandes são gravados como arquivos Arrow mapeados em memória neste diretório
+ALPHABOT_SESSION_DIR = os.getenv('ALPHABOT_SESSION_DIR', os.path.join(DATA_DIR, 'alphabot_sessions'))
+# Tamanho mínimo (MB, em memória) para o dataset ir para arquivo em vez de blob no banco
+ALPHABOT_SESSION_FILE_MIN_BYTES = int(os.getenv('ALPHABOT_SESSION_FILE_MIN_MB', '8')) * 1024 * 1024
+
+# AlphaBot Upload
+# Tamanho máximo (MB) do corpo de um upload; acima disso a requisição é recusada com 413
+ALPHABOT_MAX_UPLOAD_BYTES = int(os.getenv('ALPHABOT_MAX_UPLOAD_MB', '100')) * 1024 * 1024
+# Tamanho dos blocos copiados para o arquivo temporário e linhas por bloco na leitura do Excel
+UPLOAD_SPOOL_CHUNK_BYTES = 1024 * 1024
+EXCEL_READ_BLOCK_ROWS = 50_000
+# Processos usados para ler arquivos/abas em paralelo no upload (0 ou 1 = leitura serial).
+# Serial por padrão: os.cpu_count() mostra as CPUs do host, não o limite do contêiner
+ALPHABOT_INGEST_WORKERS = int(os.getenv('ALPHABOT_INGEST_WORKERS', '0'))
+
+# Pandas Copy-on-Write
+# Filtros, seleções e colunas derivadas compartilham memória com o DataFrame
+# de origem até serem modificados (aplicado na inicialização do app.py e dos workers do IngestPool)
+PANDAS_COPY_ON_WRITE = os.getenv('PANDAS_COPY_ON_WRITE', 'true').lower() != 'false'
+
+# Type Inference
+# Linhas amostradas para decidir o tipo de cada coluna (colunas menores que o dobro são lidas inteiras)
+TYPE_INFERENCE_SAMPLE_ROWS = 2000
+
+# Inference Cache
+# Decisões de tipo por coluna (data/formato, número, texto) reaproveitadas entre uploads
+# com o mesmo layout; INFERENCE_CACHE_PATH vazio desativa o cache
+INFERENCE_CACHE_PATH = os.getenv('INFERENCE_CACHE_PATH', os.path.join(DATA_DIR, 'inference_cache.db'))
+INFERENCE_CACHE_MAX_ENTRIES = int(os.getenv('INFERENCE_CACHE_MAX_ENTRIES', '5000'))
+
+# AlphaBot Session Lifecycle
+# Sessões em memória sem acesso por este tempo (minutos) são descartadas
+ALPHABOT_SESSION_TTL_SECONDS = int(os.getenv('ALPHABOT_SESSION_TTL_MINUTES', '720')) * 60
+# Orçamento (MB) dos blobs mantidos em memória; excedentes vão para disco (LRU)
+ALPHABOT_SESSIONS_MAX_BYTES = int(os.getenv('ALPHABOT_SESSIONS_MAX_MB', '256')) * 1024 * 1024
+
+# AlphaBot Session Cache
+# Orçamento de memória (MB) do cache LRU de DataFrames decodificados por processo
+ALPHABOT_DF_CACHE_MAX_BYTES = int(os.getenv('ALPHABOT_DF_CACHE_MAX_MB', '512')) * 1024 * 1024
+
 # Month Aliases (PT-BR)
 MONTH_ALIASES = {
     'janeiro': 1, 'jan': 1,
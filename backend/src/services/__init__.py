@@ -6,6 +6,9 @@ Camada de lógica de negócio da aplicação
 from .ai_service import AIService, get_ai_service
 from .drive_service import DriveService, get_drive_service, get_google_services
 from .data_analyzer import DataAnalyzer, get_data_analyzer
+from .dataframe_cache import DataFrameCache, get_dataframe_cache
+from .ingest_pool import IngestPool, get_ingest_pool
+from .session_manager import SessionManager, get_session_manager
 
 __all__ = [
     # AI Service
@@ -20,4 +23,16 @@ __all__ = [
     # Data Analyzer
     'DataAnalyzer',
     'get_data_analyzer',
+    
+    # DataFrame Cache
+    'DataFrameCache',
+    'get_dataframe_cache',
+    
+    # Ingest Pool
+    'IngestPool',
+    'get_ingest_pool',
+    
+    # Session Manager
+    'SessionManager',
+    'get_session_manager',
 ]
@@ -3,12 +3,14 @@ Data Analyzer Service
 Gerencia análise e sumarização de dados
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+import time
 import pandas as pd
 import numpy as np
 
-from ..utils.data_processors import prepare_table
-from ..utils.file_handlers import load_csv_tables, load_excel_tables, load_from_bytes
+from ..utils.ingest_pipeline import prepare_table, merge_stage_timings
+from ..utils.file_handlers import load_csv_tables, load_excel_tables, list_excel_sheets
+from .ingest_pool import get_ingest_pool
 
 
 class DataAnalyzer:
@@ -75,33 +77,135 @@ class DataAnalyzer:
         """
         Carrega arquivos a partir de bytes (para upload direto).
         
+        Arquivos e abas de Excel são lidos em paralelo (ver IngestPool).
+        
         Args:
             files_data: Lista de tuplas (file_bytes, filename)
         
         Returns:
             Dict com resumo do carregamento
         """
+        return self._load_files(files_data)
+    
+    def load_files_from_paths(
+        self,
+        files_data: List[Tuple[str, str]],
+        known_formats: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Carrega arquivos já gravados em disco (upload em arquivo temporário).
+        
+        Arquivos e abas de Excel são lidos em paralelo (ver IngestPool).
+        
+        Args:
+            files_data: Lista de tuplas (file_path, filename)
+            known_formats: Formatos de data de uma ingestão anterior, por nome
+                de tabela (ver datetime_formats); pulam a detecção
+        
+        Returns:
+            Dict com resumo do carregamento
+        """
+        return self._load_files(files_data, known_formats)
+    
+    def _load_files(
+        self,
+        files_data: List[Tuple[Union[bytes, str], str]],
+        known_formats: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Lê os arquivos como tarefas independentes (uma por arquivo ou por aba).
+        
+        As tabelas são anexadas na ordem dos arquivos e das abas, como na
+        leitura serial. Se qualquer aba falhar, o arquivo inteiro entra em
+        files_failed e os demais arquivos seguem normalmente.
+        
+        Args:
+            files_data: Lista de tuplas (bytes ou caminho, filename)
+            known_formats: Formatos de data já detectados, por nome de tabela
+        
+        Returns:
+            Dict com files_ok, files_failed, tables, file_timings e
+            stage_timings (tempo somado por etapa do pipeline de ingestão)
+        """
         files_ok: List[str] = []
         files_failed: List[Dict[str, str]] = []
+        file_timings: List[Dict[str, Any]] = []
         
-        for file_bytes, filename in files_data:
-            try:
-                tables = load_from_bytes(file_bytes, filename)
-                self.tables.extend(tables)
-                files_ok.append(filename)
+        tasks: List[Dict[str, Any]] = []
+        task_ranges: List[Tuple[int, int]] = []
+        for source, filename in files_data:
+            first = len(tasks)
+            tasks.extend(self._build_ingest_tasks(source, filename, known_formats))
+            task_ranges.append((first, len(tasks)))
+        
+        started = time.perf_counter()
+        results = get_ingest_pool().run(tasks)
+        elapsed = time.perf_counter() - started
+        
+        for (source, filename), (first, last) in zip(files_data, task_ranges):
+            file_results = results[first:last]
+            seconds = round(sum(item['seconds'] for item in file_results), 3)
+            errors = [item['error'] for item in file_results if 'error' in item]
             
-            except Exception as error:
-                files_failed.append({
-                    'name': filename,
-                    'reason': str(error)
-                })
+            if errors:
+                files_failed.append({'name': filename, 'reason': errors[0]})
+                file_timings.append({'name': filename, 'seconds': seconds, 'tables': 0, 'status': 'failed'})
+                continue
+            
+            file_tables = [table for item in file_results for table in item['tables']]
+            self.tables.extend(file_tables)
+            files_ok.append(filename)
+            file_timings.append({
+                'name': filename,
+                'seconds': seconds,
+                'tables': len(file_tables),
+                'status': 'ok',
+                'stage_seconds': merge_stage_timings(*(item['stage_seconds'] for item in file_results))
+            })
+        
+        stage_timings = merge_stage_timings(*(t['stage_seconds'] for t in file_timings if 'stage_seconds' in t))
+        print(f"[AlphaBot Ingest] ⏱️ {len(files_data)} arquivo(s), {len(tasks)} tarefa(s) em {elapsed:.2f}s: "
+              + ", ".join(f"{t['name']}={t['seconds']:.2f}s" for t in file_timings))
         
         return {
             'files_ok': files_ok,
             'files_failed': files_failed,
-            'tables': self.tables
+            'tables': self.tables,
+            'file_timings': file_timings,
+            'stage_timings': stage_timings
         }
     
+    @staticmethod
+    def _build_ingest_tasks(
+        source: Union[bytes, str],
+        filename: str,
+        known_formats: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Divide um arquivo em tarefas de leitura: uma por aba no Excel, uma no CSV.
+        
+        Args:
+            source: Bytes do arquivo ou caminho em disco
+            filename: Nome original do arquivo
+            known_formats: Formatos de data já detectados, por nome de tabela
+        
+        Returns:
+            Lista de tarefas para parse_ingest_task
+        """
+        if filename.lower().split('.')[-1] in ('xlsx', 'xls'):
+            try:
+                sheet_names = list_excel_sheets(source)
+            except Exception:
+                # Planilha ilegível: a tarefa única devolve o erro para o arquivo
+                sheet_names = []
+            if len(sheet_names) > 1:
+                return [
+                    {'source': source, 'filename': filename, 'sheet_name': sheet_name, 'known_formats': known_formats}
+                    for sheet_name in sheet_names
+                ]
+        
+        return [{'source': source, 'filename': filename, 'sheet_name': None, 'known_formats': known_formats}]
+    
     def consolidate_tables(self) -> pd.DataFrame:
         """
         Consolida todas as tabelas carregadas em um único DataFrame.
@@ -147,10 +251,10 @@ class DataAnalyzer:
             all_columns.update(table['columns'])
             numeric_columns.update(table['numeric_columns'])
             text_columns.update(table['text_columns'])
-            datetime_columns_names.update(table['datetime_columns'].keys())
+            datetime_columns_names.update(table['datetime_columns'])
 
-            for parsed in table['datetime_columns'].values():
-                valid = parsed.dropna()
+            for column in table['datetime_columns']:
+                valid = table['df'][column].dropna()
                 if not valid.empty:
                     start_dates.append(valid.min())
                     end_dates.append(valid.max())
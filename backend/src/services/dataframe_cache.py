@@ -0,0 +1,191 @@
+"""
+DataFrame Cache Service
+Cache LRU em memória de DataFrames já decodificados das sessões do AlphaBot
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import pandas as pd
+
+from ..config.settings import ALPHABOT_DF_CACHE_MAX_BYTES
+
+
+def dataframe_nbytes(df: pd.DataFrame) -> int:
+    """
+    Calcula o uso de memória real de um DataFrame (inclui strings em colunas object).
+
+    Args:
+        df: DataFrame a ser medido
+
+    Returns:
+        Total de bytes ocupados
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class DataFrameCache:
+    """
+    Cache LRU de DataFrames decodificados, limitado por orçamento de memória.
+
+    As entradas são indexadas por (user_id, session_id). Perguntas seguidas
+    sobre a mesma sessão reutilizam o DataFrame sem desserializar de novo.
+    """
+
+    def __init__(self, max_bytes: int = ALPHABOT_DF_CACHE_MAX_BYTES):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Orçamento total de memória (0 desativa o cache)
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'puts': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'rejected': 0,
+        }
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Busca uma entrada e a marca como usada mais recentemente.
+
+        Args:
+            key: Tupla (user_id, session_id)
+
+        Returns:
+            Dict com 'df' e 'metadata', ou None se não estiver em cache
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key: Hashable, df: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Armazena um DataFrame, substituindo a entrada anterior da mesma chave.
+
+        Entradas menos usadas são removidas até caber no orçamento. DataFrames
+        maiores que o orçamento inteiro não são armazenados.
+
+        Args:
+            key: Tupla (user_id, session_id)
+            df: DataFrame decodificado
+            metadata: Metadados da sessão associados ao DataFrame
+
+        Returns:
+            True se a entrada foi armazenada
+        """
+        nbytes = dataframe_nbytes(df)
+
+        with self._lock:
+            self._remove(key)
+
+            if nbytes > self.max_bytes:
+                self._stats['rejected'] += 1
+                return False
+
+            while self._entries and self._current_bytes + nbytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats['evictions'] += 1
+
+            self._entries[key] = {'df': df, 'metadata': metadata, 'nbytes': nbytes}
+            self._current_bytes += nbytes
+            self._stats['puts'] += 1
+            return True
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Remove uma entrada específica.
+
+        Args:
+            key: Tupla (user_id, session_id)
+
+        Returns:
+            True se havia entrada para a chave
+        """
+        with self._lock:
+            removed = self._remove(key)
+            if removed:
+                self._stats['invalidations'] += 1
+            return removed
+
+    def invalidate_session(self, session_id: str) -> int:
+        """
+        Remove todas as entradas de uma sessão, independentemente do usuário.
+
+        Args:
+            session_id: ID da sessão
+
+        Returns:
+            Número de entradas removidas
+        """
+        with self._lock:
+            keys = [key for key in self._entries if isinstance(key, tuple) and key[-1] == session_id]
+            for key in keys:
+                self._remove(key)
+            self._stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        """Esvazia o cache e retorna o número de entradas removidas."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._current_bytes = 0
+            self._stats['invalidations'] += count
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores e uso de memória do cache.
+
+        Returns:
+            Dict com hits, misses, hit_rate, entradas e bytes em uso
+        """
+        with self._lock:
+            total_requests = self._stats['hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+            return {
+                **self._stats,
+                'hit_rate': round(hit_rate, 2),
+                'entries': len(self._entries),
+                'current_bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> bool:
+        """Remove uma entrada sem adquirir o lock (uso interno)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._current_bytes -= entry['nbytes']
+        return True
+
+
+# Instância compartilhada pelo processo (cada worker possui o seu cache)
+_dataframe_cache: Optional[DataFrameCache] = None
+
+
+def get_dataframe_cache() -> DataFrameCache:
+    """
+    Retorna a instância de DataFrameCache do processo.
+
+    Returns:
+        Instância compartilhada do DataFrameCache
+    """
+    global _dataframe_cache
+    if _dataframe_cache is None:
+        _dataframe_cache = DataFrameCache()
+    return _dataframe_cache
@@ -0,0 +1,167 @@
+"""
+Ingest Pool Service
+Leitura paralela de arquivos e abas de Excel em um pool de processos limitado
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+from ..config.settings import ALPHABOT_INGEST_WORKERS, PANDAS_COPY_ON_WRITE
+from ..utils.file_handlers import parse_ingest_task
+
+
+# Processos filhos partem de um servidor limpo (ou de um interpretador novo, onde não
+# há forkserver), não de um fork do servidor web multithread: um lock preso por outra
+# thread no momento do fork travaria o filho
+INGEST_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _init_worker() -> None:
+    """Configura o pandas dos processos filhos como o do processo web."""
+    pd.set_option('mode.copy_on_write', PANDAS_COPY_ON_WRITE)
+
+
+class IngestPool:
+    """
+    Executa tarefas de leitura (parse_ingest_task) em paralelo.
+
+    O pool de processos é criado na primeira leitura com mais de uma tarefa e
+    reaproveitado pelas requisições seguintes. Os resultados são devolvidos na
+    mesma ordem das tarefas, e a falha de uma tarefa não interrompe as demais.
+    Se o ambiente não suportar processos (ex.: serverless), a leitura é serial.
+    """
+
+    def __init__(self, max_workers: int = ALPHABOT_INGEST_WORKERS):
+        """
+        Inicializa o pool.
+
+        Args:
+            max_workers: Número máximo de processos (0 ou 1 = leitura serial)
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'parallel_batches': 0,
+            'serial_batches': 0,
+            'tasks': 0,
+            'task_errors': 0,
+            'pool_failures': 0,
+        }
+
+    def run(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Executa as tarefas e devolve um resultado por tarefa, na ordem recebida.
+
+        Args:
+            tasks: Tarefas no formato aceito por parse_ingest_task
+
+        Returns:
+            Lista de dicts com 'tables', 'seconds' e 'stage_seconds', ou 'error' e 'seconds'
+        """
+        self._stats['tasks'] += len(tasks)
+
+        executor = self._get_executor() if len(tasks) > 1 else None
+        if executor is None:
+            self._stats['serial_batches'] += 1
+            return [self._run_serial(task) for task in tasks]
+
+        try:
+            futures = [executor.submit(parse_ingest_task, task) for task in tasks]
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._reset_executor(e)
+            self._stats['serial_batches'] += 1
+            return [self._run_serial(task) for task in tasks]
+
+        results: List[Dict[str, Any]] = []
+        pool_broken = False
+        for task, future in zip(tasks, futures):
+            if pool_broken:
+                results.append(self._run_serial(task))
+                continue
+            started = time.perf_counter()
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as e:
+                # Processo morto (ex.: falta de memória): refaz o restante em série
+                pool_broken = True
+                self._reset_executor(e)
+                results.append(self._run_serial(task))
+            except Exception as error:
+                self._stats['task_errors'] += 1
+                results.append({'error': str(error), 'seconds': time.perf_counter() - started})
+
+        self._stats['parallel_batches'] += 1
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do pool.
+
+        Returns:
+            Dict com lotes paralelos/seriais, tarefas e falhas
+        """
+        return {
+            **self._stats,
+            'max_workers': self.max_workers,
+            'active': self._executor is not None,
+        }
+
+    def shutdown(self) -> None:
+        """Encerra os processos do pool, se existirem."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run_serial(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return parse_ingest_task(task)
+        except Exception as error:
+            self._stats['task_errors'] += 1
+            return {'error': str(error), 'seconds': time.perf_counter() - started}
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(INGEST_START_METHOD),
+                        initializer=_init_worker,
+                    )
+                except (OSError, NotImplementedError, ImportError) as e:
+                    print(f"[AlphaBot Ingest] ⚠️ Pool de processos indisponível, leitura serial: {e}")
+                    self.max_workers = 0
+                    return None
+            return self._executor
+
+    def _reset_executor(self, error: Exception) -> None:
+        self._stats['pool_failures'] += 1
+        print(f"[AlphaBot Ingest] ⚠️ Pool de processos falhou, recriando: {error}")
+        self.shutdown()
+
+
+# Instância compartilhada pelo processo (os processos filhos são reaproveitados)
+_ingest_pool: Optional[IngestPool] = None
+
+
+def get_ingest_pool() -> IngestPool:
+    """
+    Retorna a instância de IngestPool do processo.
+
+    Returns:
+        Instância compartilhada do IngestPool
+    """
+    global _ingest_pool
+    if _ingest_pool is None:
+        _ingest_pool = IngestPool()
+    return _ingest_pool
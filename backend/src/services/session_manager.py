@@ -0,0 +1,260 @@
+"""
+Session Manager Service
+Ciclo de vida das sessões do AlphaBot em memória: TTL, orçamento e spill para disco
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from ..config.settings import (
+    ALPHABOT_SESSION_DIR,
+    ALPHABOT_SESSION_TTL_SECONDS,
+    ALPHABOT_SESSIONS_MAX_BYTES,
+)
+from ..utils.dataframe_storage import delete_session_file
+from .dataframe_cache import get_dataframe_cache
+
+
+class SessionManager:
+    """
+    Armazena as sessões do AlphaBot com interface de dicionário.
+
+    Cada entrada é o dict da sessão ({"dataframe": bytes Arrow, "dataframe_path",
+    "metadata", "persisted"}). Regras aplicadas a cada acesso:
+
+    - Sessões ociosas por mais de ttl_seconds são descartadas
+    - Quando os blobs em memória passam de max_bytes, os das sessões usadas
+      há mais tempo são gravados em disco (spill) e liberados da memória
+    - Ao acessar uma sessão em disco, o blob é recarregado de forma transparente
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = ALPHABOT_SESSIONS_MAX_BYTES,
+        ttl_seconds: int = ALPHABOT_SESSION_TTL_SECONDS,
+        spill_dir: str = os.path.join(ALPHABOT_SESSION_DIR, 'spill')
+    ):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            max_bytes: Orçamento de memória para os blobs das sessões
+            ttl_seconds: Tempo máximo de inatividade (0 desativa o TTL)
+            spill_dir: Diretório dos blobs enviados para disco
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._spilled: Dict[str, str] = {}
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            'expired': 0,
+            'spilled': 0,
+            'reloaded': 0,
+            'spill_errors': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Interface de dicionário (compatível com o antigo ALPHABOT_SESSIONS)
+    # ------------------------------------------------------------------
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            self._expire_idle()
+            return key in self._sessions
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_idle()
+            entry = self._sessions[key]
+            self._touch(key)
+            if key in self._spilled:
+                self._reload(key)
+                self._enforce_budget(protect=key)
+            return entry
+
+    def __setitem__(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._discard(key)
+            self._sessions[key] = entry
+            self._memory_bytes += self._entry_bytes(entry)
+            self._touch(key)
+            self._expire_idle()
+            self._enforce_budget(protect=key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._sessions.keys()))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Retorna a sessão ou default se não existir (ou tiver expirado)."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: str, *default: Any) -> Any:
+        """
+        Remove a sessão e a retorna. Se o blob estava em disco, ele é apagado
+        e a entrada retornada fica com "dataframe" vazio.
+
+        Args:
+            key: Chave da sessão
+            default: Valor retornado se a chave não existir
+
+        Returns:
+            Dict da sessão removida
+        """
+        with self._lock:
+            if key not in self._sessions:
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            entry = self._sessions[key]
+            self._discard(key)
+            return entry
+
+    # ------------------------------------------------------------------
+    # Administração
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contagens e uso de memória/disco das sessões.
+
+        Returns:
+            Dict com número de sessões, bytes em memória e em disco e contadores
+        """
+        with self._lock:
+            self._expire_idle()
+            spilled_bytes = 0
+            for path in self._spilled.values():
+                try:
+                    spilled_bytes += os.path.getsize(path)
+                except OSError:
+                    pass
+            file_backed = sum(1 for entry in self._sessions.values() if entry.get('dataframe_path'))
+            return {
+                **self._stats,
+                'sessions': len(self._sessions),
+                'in_memory': len(self._sessions) - len(self._spilled) - file_backed,
+                'on_disk': len(self._spilled),
+                'file_backed': file_backed,
+                'memory_bytes': self._memory_bytes,
+                'spilled_bytes': spilled_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+    def expire_idle(self) -> int:
+        """Descarta sessões ociosas e retorna quantas foram removidas."""
+        with self._lock:
+            return self._expire_idle()
+
+    # ------------------------------------------------------------------
+    # Internos (chamados com o lock adquirido)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _entry_bytes(entry: Dict[str, Any]) -> int:
+        """Bytes do blob mantido em memória pela sessão."""
+        blob = entry.get('dataframe')
+        return len(blob) if blob is not None else 0
+
+    def _touch(self, key: str) -> None:
+        self._sessions.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+
+    def _expire_idle(self) -> int:
+        if self.ttl_seconds <= 0:
+            return 0
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, last in self._last_access.items() if last < cutoff]
+        for key in expired:
+            entry = self._sessions.get(key) or {}
+            self._discard(key)
+            # Arquivo Arrow de sessão não persistida no banco não tem outro dono
+            if not entry.get('persisted'):
+                delete_session_file(entry.get('dataframe_path'))
+            get_dataframe_cache().invalidate_session(key.split('_', 1)[-1])
+            print(f"[AlphaBot Sessions] ⌛ Sessão expirada por inatividade: {key}")
+        self._stats['expired'] += len(expired)
+        return len(expired)
+
+    def _enforce_budget(self, protect: Optional[str] = None) -> None:
+        for key in list(self._sessions.keys()):
+            if self._memory_bytes <= self.max_bytes:
+                break
+            if key == protect or key in self._spilled:
+                continue
+            if self._entry_bytes(self._sessions[key]) > 0:
+                self._spill(key)
+
+    def _spill(self, key: str) -> None:
+        entry = self._sessions[key]
+        blob = entry['dataframe']
+        safe_key = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in key)
+        path = os.path.join(self.spill_dir, f"{safe_key}.arrow")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as fh:
+                fh.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._stats['spill_errors'] += 1
+            print(f"[AlphaBot Sessions] ⚠️ Falha ao enviar sessão {key} para disco: {e}")
+            return
+
+        entry['dataframe'] = None
+        self._spilled[key] = path
+        self._memory_bytes -= len(blob)
+        self._stats['spilled'] += 1
+
+    def _reload(self, key: str) -> None:
+        path = self._spilled.pop(key)
+        with open(path, 'rb') as fh:
+            blob = fh.read()
+        os.remove(path)
+        self._sessions[key]['dataframe'] = blob
+        self._memory_bytes += len(blob)
+        self._stats['reloaded'] += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._sessions.pop(key, None)
+        self._last_access.pop(key, None)
+        spill_path = self._spilled.pop(key, None)
+        if spill_path:
+            delete_session_file(spill_path)
+        elif entry is not None:
+            self._memory_bytes -= self._entry_bytes(entry)
+
+
+# Instância compartilhada pelo processo (cada worker possui as suas sessões)
+_session_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    """
+    Retorna a instância de SessionManager do processo.
+
+    Returns:
+        Instância compartilhada do SessionManager
+    """
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager()
+    return _session_manager
@@ -5,14 +5,85 @@ Funções utilitárias para processamento de dados, arquivos e validações
 
 from .data_processors import (
     normalize_decimal_string,
+    normalize_decimal_array,
+    normalize_decimal_series,
     coerce_numeric_series,
     detect_numeric_columns,
-    normalize_month_text,
     month_number_to_name,
+    sniff_datetime_columns,
     detect_datetime_columns,
     detect_text_columns,
     build_temporal_mask,
+)
+
+from .month_names import (
+    MONTH_NAME_NUMBERS,
+    normalize_month_text,
+)
+
+from .date_formats import (
+    FORMAT_DATETIME,
+    FORMAT_EXCEL_SERIAL,
+    FORMAT_MONTH_TEXT,
+    parse_month_text,
+    parse_excel_serial,
+    parse_dates,
+    parse_date_column,
+    sniff_date_format,
+)
+
+from .type_inference import (
+    sample_column,
+    decide_from_sample,
+)
+
+from .virtual_columns import (
+    TEMPORAL_PARTS,
+    temporal_part,
+    virtual_temporal_columns,
+    resolve_column,
+    materialize_virtual_columns,
+)
+
+from .text_shadows import (
+    normalize_text,
+    build_text_shadow,
+    build_text_shadows,
+    get_text_shadow,
+)
+
+from .secondary_indexes import (
+    build_secondary_index,
+    build_datetime_index,
+    get_secondary_index,
+    index_lookup,
+    index_range,
+)
+
+from .filter_compiler import (
+    column_stats,
+    compile_filter,
+    apply_filters,
+)
+
+from .inference_cache import (
+    InferenceCache,
+    get_inference_cache,
+    column_signature,
+    value_shapes,
+)
+
+from .ingest_pipeline import (
+    stage_timer,
+    merge_stage_timings,
+    format_stage_timings,
+    apply_cached_decision,
+    infer_column_types,
+    coerce_columns,
+    derive_columns,
     prepare_table,
+    consolidate_tables,
+    profile_dataset,
 )
 
 from .file_handlers import (
@@ -22,6 +93,28 @@ from .file_handlers import (
     load_local_csv,
     load_local_excel,
     load_from_bytes,
+    load_from_path,
+    list_excel_sheets,
+    load_workbook_tables,
+    read_excel_streaming,
+    parse_ingest_task,
+    spool_to_tempfile,
+    UploadTooLargeError,
+)
+
+from .dataframe_storage import (
+    STORAGE_FORMAT_ARROW,
+    STORAGE_FORMAT_ARROW_FILE,
+    STORAGE_FORMAT_JSON,
+    serialize_dataframe,
+    deserialize_dataframe,
+    write_session_file,
+    read_session_file,
+    delete_session_file,
+    load_session_dataframe,
+    convert_json_to_arrow,
+    hash_file_bytes,
+    fingerprint_files,
 )
 
 from .validators import (
@@ -38,14 +131,76 @@ from .validators import (
 __all__ = [
     # Data Processors
     'normalize_decimal_string',
+    'normalize_decimal_array',
+    'normalize_decimal_series',
     'coerce_numeric_series',
     'detect_numeric_columns',
-    'normalize_month_text',
     'month_number_to_name',
+    'sniff_datetime_columns',
     'detect_datetime_columns',
     'detect_text_columns',
     'build_temporal_mask',
+    
+    # Month Names
+    'MONTH_NAME_NUMBERS',
+    'normalize_month_text',
+    
+    # Date Formats
+    'FORMAT_DATETIME',
+    'FORMAT_EXCEL_SERIAL',
+    'FORMAT_MONTH_TEXT',
+    'parse_month_text',
+    'parse_excel_serial',
+    'parse_dates',
+    'parse_date_column',
+    'sniff_date_format',
+    
+    # Type Inference
+    'sample_column',
+    'decide_from_sample',
+    
+    # Virtual Columns
+    'TEMPORAL_PARTS',
+    'temporal_part',
+    'virtual_temporal_columns',
+    'resolve_column',
+    'materialize_virtual_columns',
+    
+    # Text Shadows
+    'normalize_text',
+    'build_text_shadow',
+    'build_text_shadows',
+    'get_text_shadow',
+    
+    # Secondary Indexes
+    'build_secondary_index',
+    'build_datetime_index',
+    'get_secondary_index',
+    'index_lookup',
+    'index_range',
+    
+    # Filter Compiler
+    'column_stats',
+    'compile_filter',
+    'apply_filters',
+    
+    # Inference Cache
+    'InferenceCache',
+    'get_inference_cache',
+    'column_signature',
+    'value_shapes',
+    
+    # Ingest Pipeline
+    'stage_timer',
+    'merge_stage_timings',
+    'format_stage_timings',
+    'apply_cached_decision',
+    'infer_column_types',
+    'coerce_columns',
+    'derive_columns',
     'prepare_table',
+    'consolidate_tables',
+    'profile_dataset',
     
     # File Handlers
     'download_file_bytes',
@@ -54,6 +209,27 @@ __all__ = [
     'load_local_csv',
     'load_local_excel',
     'load_from_bytes',
+    'load_from_path',
+    'list_excel_sheets',
+    'load_workbook_tables',
+    'read_excel_streaming',
+    'parse_ingest_task',
+    'spool_to_tempfile',
+    'UploadTooLargeError',
+    
+    # DataFrame Storage
+    'STORAGE_FORMAT_ARROW',
+    'STORAGE_FORMAT_ARROW_FILE',
+    'STORAGE_FORMAT_JSON',
+    'serialize_dataframe',
+    'deserialize_dataframe',
+    'write_session_file',
+    'read_session_file',
+    'delete_session_file',
+    'load_session_dataframe',
+    'convert_json_to_arrow',
+    'hash_file_bytes',
+    'fingerprint_files',
     
     # Validators
     'ALLOWED_EXTENSIONS',
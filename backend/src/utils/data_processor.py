@@ -1,6 +1,7 @@
 """
 🔧 DATA PROCESSOR UNIFICADO - DriveBot + AlphaBot
-Função única para garantir processamento idêntico de dados entre os bots
+Compactação, perfil e rollup do dataset final (a tipagem das colunas fica no
+pipeline de ingestão, ver src/utils/ingest_pipeline.py)
 
 Correção dos problemas:
 1. Coluna 'Quantidade' sendo tratada como temporal (1970) no AlphaBot
@@ -13,318 +14,274 @@ Data: 19/12/2024
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Any
-import unicodedata
 import logging
 
+from .virtual_columns import resolve_column
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_dataframe_unified(df: pd.DataFrame, source_info: str = "unknown") -> Tuple[pd.DataFrame, Dict[str, Any]]:
+# Fração máxima de valores distintos para uma coluna de texto virar 'category'
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
-    🔧 FUNÇÃO UNIFICADA DE PROCESSAMENTO DE DATAFRAME
-    
-    Garante que DriveBot e AlphaBot processem dados de forma idêntica.
-    Corrige especificamente o bug da coluna 'Quantidade' sendo tratada como temporal.
-    
+    🗜️ COMPACTAÇÃO DE MEMÓRIA (executar após a consolidação das tabelas)
+
+    - Texto de baixa cardinalidade (Região, Categoria, *_Mes_Nome...) vira 'category'
+    - Inteiros são reduzidos ao menor tipo que comporta os valores
+
+    Nenhuma conversão perde informação. Floats continuam float64: somas sobre
+    float32 acumulam em float32 e perdem centavos em totais grandes. Colunas
+    datetime, bool e texto de alta cardinalidade (IDs) ficam como estão.
+
     Args:
-        df: DataFrame para processar
-        source_info: Informação sobre origem dos dados (para logging)
-    
+        df: DataFrame já unificado
+
     Returns:
-        Tuple[DataFrame processado, Metadata do processamento]
+        Tuple[DataFrame compactado, relatório com bytes antes/depois e colunas convertidas]
     """
-    logger.info(f"[UNIFIED PROCESSOR] Iniciando processamento para {source_info}")
-    logger.info(f"[UNIFIED PROCESSOR] DataFrame original: {len(df)} linhas, {len(df.columns)} colunas")
-    
-    # Criar cópia para não modificar original
-    processed_df = df.copy()
-    metadata = {
-        "source": source_info,
-        "original_rows": len(df),
-        "original_columns": len(df.columns),
-        "columns_processed": {},
-        "data_quality": {},
-        "financial_summary": {}
-    }
-    
-    # 🔧 CORREÇÃO CRÍTICA 1: Palavras-chave para identificar colunas financeiras
-    financial_keywords = [
-        'quantidade', 'receita', 'receita_total', 'valor', 'preco', 'preço', 'preco_unitario', 'preço_unitário', 'faturamento', 
-        'total', 'vendas', 'custo', 'lucro', 'margem', 'desconto'
-    ]
-    
-    # Palavras-chave para EXCLUIR (colunas textuais que nunca devem ser convertidas)
-    # NOTA: 'quantidade' foi REMOVIDA desta lista - ela é financeira!
-    text_keywords = [
-        'nome', 'produto', 'categoria', 'cliente', 'regiao', 'região',
-        'cidade', 'estado', 'uf', 'loja', 'filial', 'grupo', 'setor', 
-        'descricao', 'descrição', 'id', 'codigo', 'código', 'transacao'
-    ]
-    
-    # Meses em português que indicam coluna textual
-    months_pt = [
-        'janeiro', 'fevereiro', 'março', 'marco', 'abril', 'maio', 'junho',
-        'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro'
-    ]
-    
-    logger.info("[UNIFIED PROCESSOR] 🔧 Aplicando tipagem seletiva para colunas financeiras...")
-    
-    # Helper para normalização
-    def normalize_name(s: str) -> str:
-        s = s.lower()
-        s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-        return s
-
-    # 🚨 CRÍTICO: Também excluir colunas auxiliares geradas anteriormente
-    skip_column_suffixes = ['_mes_nome', '_nome', '_ano', '_mes', '_trimestre']
-
-    # Processar apenas colunas que parecem financeiras
-    for col in processed_df.columns:
-        col_norm = normalize_name(col)
-        
-        # Pular colunas auxiliares geradas (terminam com sufixos conhecidos)
-        if any(col_norm.endswith(suffix) for suffix in skip_column_suffixes):
-            logger.info(f"[UNIFIED PROCESSOR] ⏭️ Pulando coluna auxiliar: '{col}'")
-            continue
-        
-        # VERIFICAR SE A COLUNA CONTÉM MESES (NUNCA CONVERTER)
-        if processed_df[col].dtype == 'object':
-            sample_values = processed_df[col].dropna().astype(str).str.lower().head(10).tolist()
-            contains_months = any(any(month in str(val) for month in months_pt) for val in sample_values)
-            if contains_months:
-                logger.info(f"[UNIFIED PROCESSOR] ⏭️ Pulando coluna de meses: '{col}' (contém: {sample_values[:3]})")
+    bytes_before = int(df.memory_usage(index=True, deep=True).sum())
+    # Cópia rasa: com copy-on-write só as colunas convertidas ocupam memória nova
+    compacted = df.copy(deep=False)
+    converted: Dict[str, Dict[str, str]] = {}
+    row_count = len(compacted)
+
+    for col in compacted.columns:
+        series = compacted[col]
+        original_dtype = str(series.dtype)
+
+        if series.dtype == object:
+            # Só texto homogêneo: categorias com tipos misturados não serializam em Arrow
+            if row_count == 0 or pd.api.types.infer_dtype(series, skipna=True) != 'string':
                 continue
-        
-        # DETECTAR COLUNAS FINANCEIRAS POR PALAVRAS-CHAVE (com prioridade sobre exclusões)
-        is_financial = any(fin_kw in col_norm for fin_kw in financial_keywords)
-        
-        # VERIFICAR SE A COLUNA É TEXTUAL (NUNCA CONVERTER) - MAS APENAS SE NÃO FOR FINANCEIRA
-        if not is_financial:
-            is_text_column = any(text_kw in col_norm for text_kw in text_keywords)
-            if is_text_column:
-                logger.info(f"[UNIFIED PROCESSOR] ⏭️ Pulando coluna textual: '{col}'")
+            if series.nunique(dropna=True) / row_count > CATEGORY_MAX_UNIQUE_RATIO:
                 continue
-        
-        # SE FOR FINANCEIRA E DO TIPO OBJECT, TENTAR CONVERTER
-        if is_financial and processed_df[col].dtype == 'object':
-            logger.info(f"[UNIFIED PROCESSOR] 💰 Processando coluna financeira detectada: '{col}'")
-            
-            try:
-                # Converter para string primeiro para limpar formatação
-                processed_df[col] = processed_df[col].astype(str)
-                
-                # Limpar formatação brasileira/internacional
-                processed_df[col] = processed_df[col].str.replace('R$', '', regex=False)
-                processed_df[col] = processed_df[col].str.replace('$', '', regex=False)
-                processed_df[col] = processed_df[col].str.replace('.', '', regex=False)  # Separador milhares
-                processed_df[col] = processed_df[col].str.replace(',', '.', regex=False)  # Decimal brasileiro
-                processed_df[col] = processed_df[col].str.strip()
-                
-                # Converter para numérico (CRÍTICO: errors='coerce' para limpar dados ruins)
-                # Primeiro, testar a conversão em uma cópia para validar
-                test_conversion = pd.to_numeric(processed_df[col], errors='coerce')
-                
-                # Verificar se a conversão foi bem-sucedida (pelo menos 80% dos valores convertidos)
-                valid_count = test_conversion.notna().sum()
-                total_count = len(processed_df)
-                success_rate = (valid_count / total_count) * 100 if total_count > 0 else 0
-                
-                # Para colunas claramente financeiras (receita/valor/preço/faturamento), forçar conversão mesmo com taxa menor
-                force_financial = any(key in col_norm for key in ['receita', 'valor', 'preco', 'preço', 'faturamento'])
-                threshold_ok = success_rate >= 80 or force_financial and success_rate >= 30
-                if not threshold_ok:
-                    logger.warning(f"[UNIFIED PROCESSOR] ⚠️ '{col}': Conversão com baixa taxa de sucesso ({success_rate:.1f}% válidos). Mantendo como texto.")
-                    # Reverter para tipo original
-                    continue
-                
-                # Aplicar a conversão validada
-                original_dtype = processed_df[col].dtype
-                processed_df[col] = test_conversion
-                
-                # Preencher NaN com 0 para cálculos financeiros
-                nan_count = processed_df[col].isna().sum()
-                processed_df[col] = processed_df[col].fillna(0)
-                
-                metadata["columns_processed"][col] = {
-                    "type": "financial_numeric",
-                    "original_dtype": str(original_dtype),
-                    "final_dtype": str(processed_df[col].dtype),
-                    "nan_values_filled": int(nan_count),
-                    "conversion_success_rate": float(success_rate),
-                    "sample_values": processed_df[col].head(3).tolist()
-                }
-                
-                logger.info(f"[UNIFIED PROCESSOR] ✅ '{col}': Convertida com sucesso ({success_rate:.1f}% válidos, {nan_count} NaN preenchidos)")
-                
-            except Exception as e:
-                logger.error(f"[UNIFIED PROCESSOR] ❌ Erro ao processar '{col}': {e}")
-                # Reverter para tipo original em caso de erro
-                processed_df[col] = df[col].copy()
-    
-    # 🔧 CORREÇÃO CRÍTICA 2: Forçar tipagem explícita de colunas temporais
-    date_columns = ['Data', 'Date', 'data', 'date']
-    
-    logger.info("[UNIFIED PROCESSOR] 🔧 Aplicando tipagem forçada para colunas temporais...")
-    
-    for col in processed_df.columns:
-        col_norm = normalize_name(col)
-        
-        # Evitar processar colunas derivadas como datas novamente
-        if any(col_norm.endswith(suffix) for suffix in ['_ano', '_mes', '_trimestre', '_mes_nome']):
-            continue
-        
-        # Detectar colunas de data
-        is_date = any(date_term in col_norm for date_term in ['data', 'date', 'tempo', 'time'])
-        
-        if is_date:
-            logger.info(f"[UNIFIED PROCESSOR] Processando coluna temporal: '{col}'")
-            
-            original_dtype = processed_df[col].dtype
-            
-            # Múltiplos formatos de data para máxima compatibilidade
-            date_formats = ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d']
-            parsed_successfully = False
-            
-            for date_format in date_formats:
-                try:
-                    processed_df[col] = pd.to_datetime(processed_df[col], format=date_format, errors='coerce')
-                    valid_dates = processed_df[col].notna().sum()
-                    if valid_dates > len(processed_df) * 0.5:  # Pelo menos 50% válidas
-                        parsed_successfully = True
-                        logger.info(f"[UNIFIED PROCESSOR] ✅ '{col}': Formato '{date_format}' funcionou ({valid_dates} válidas)")
-                        break
-                except:
-                    continue
-            
-            # Fallback: pandas automático
-            if not parsed_successfully:
-                processed_df[col] = pd.to_datetime(processed_df[col], errors='coerce')
-                valid_dates = processed_df[col].notna().sum()
-                logger.info(f"[UNIFIED PROCESSOR] ⚠️ '{col}': Usando parser automático ({valid_dates} válidas)")
-            
-            # 🚨 VALIDAÇÃO CRÍTICA: Remover datas epoch (1970) que causam bugs
-            epoch_filter = (processed_df[col] >= '1990-01-01') & (processed_df[col] <= '2030-12-31')
-            invalid_dates = (~epoch_filter & processed_df[col].notna()).sum()
-            if invalid_dates > 0:
-                processed_df.loc[~epoch_filter, col] = pd.NaT
-                logger.warning(f"[UNIFIED PROCESSOR] ⚠️ '{col}': Removidas {invalid_dates} datas inválidas (epoch/futuro)")
-            
-            # 🔧 EXTRAIR COMPONENTES DE DATA (Ano, Mês, Trimestre, Nome do Mês)
-            if processed_df[col].notna().any():
-                try:
-                    # Criar colunas derivadas
-                    processed_df[f'{col}_Ano'] = processed_df[col].dt.year
-                    processed_df[f'{col}_Mes'] = processed_df[col].dt.month
-                    processed_df[f'{col}_Trimestre'] = processed_df[col].dt.to_period('Q').astype(str)
-                    
-                    # Nome do mês em português
-                    try:
-                        import locale
-                        # Tentar configurar locale para português
-                        for loc in ['pt_BR.UTF-8', 'pt_BR', 'Portuguese_Brazil.1252', 'Portuguese']:
-                            try:
-                                locale.setlocale(locale.LC_TIME, loc)
-                                logger.info(f"[UNIFIED PROCESSOR] ✅ Locale configurado: {loc}")
-                                break
-                            except:
-                                continue
-                    except Exception as e:
-                        logger.warning(f"[UNIFIED PROCESSOR] ⚠️ Não foi possível configurar locale pt_BR: {e}")
-                    
-                    # Mapear nomes de meses em português (fallback se locale falhar)
-                    month_names_pt = {
-                        1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
-                        5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
-                        9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
-                    }
-                    processed_df[f'{col}_Mes_Nome'] = processed_df[f'{col}_Mes'].map(month_names_pt)
-                    
-                    logger.info(f"[UNIFIED PROCESSOR] ✅ Componentes de data extraídos: {col}_Ano, {col}_Mes, {col}_Trimestre, {col}_Mes_Nome")
-                    
-                except Exception as e:
-                    logger.warning(f"[UNIFIED PROCESSOR] ⚠️ Erro ao extrair componentes de data de '{col}': {e}")
-            
-            metadata["columns_processed"][col] = {
-                "type": "temporal",
-                "original_dtype": str(original_dtype),
-                "final_dtype": str(processed_df[col].dtype),
-                "valid_dates": int(processed_df[col].notna().sum()),
-                "invalid_dates_removed": int(invalid_dates),
-                "date_range": {
-                    "min": str(processed_df[col].min()) if processed_df[col].notna().any() else None,
-                    "max": str(processed_df[col].max()) if processed_df[col].notna().any() else None
-                }
-            }
-    
-    # 🔧 CORREÇÃO CRÍTICA 3: Calcular métricas financeiras unificadas
-    logger.info("[UNIFIED PROCESSOR] 📊 Calculando métricas financeiras...")
-    
-    # Identificar colunas financeiras processadas
-    quantidade_col = None
-    receita_col = None
-    
-    for col in processed_df.columns:
-        if 'quantidade' in col.lower():
-            quantidade_col = col
-        elif any(term in col.lower() for term in ['receita', 'valor', 'total', 'faturamento']):
-            if receita_col is None:  # Pegar a primeira encontrada
-                receita_col = col
-    
-    # Se não existir 'receita' numérica mas existir quantidade e preço unitário, calcular receita total derivada
-    if receita_col is None or not pd.api.types.is_numeric_dtype(processed_df.get(receita_col, pd.Series(dtype=float))):
-        preco_cols = [c for c in processed_df.columns if any(term in c.lower() for term in ['preco', 'preço'])]
-        preco_col = None
-        for c in preco_cols:
-            if pd.api.types.is_numeric_dtype(processed_df[c]):
-                preco_col = c
-                break
-        if quantidade_col and preco_col:
-            derived_col = 'Receita_Total_Derivada'
-            try:
-                processed_df[derived_col] = processed_df[quantidade_col].fillna(0) * processed_df[preco_col].fillna(0)
-                receita_col = derived_col
-                logger.info(f"[UNIFIED PROCESSOR] ✅ Receita derivada criada a partir de '{quantidade_col}' x '{preco_col}'")
-            except Exception as e:
-                logger.warning(f"[UNIFIED PROCESSOR] ⚠️ Falha ao criar receita derivada: {e}")
-
-    if quantidade_col and receita_col:
-        # Garantir que as colunas são numéricas antes de somar
-        if pd.api.types.is_numeric_dtype(processed_df[quantidade_col]):
-            total_quantidade = processed_df[quantidade_col].sum()
-        else:
-            total_quantidade = 0
-            logger.warning(f"[UNIFIED PROCESSOR] ⚠️ Coluna '{quantidade_col}' não é numérica, usando 0")
-        
-        if pd.api.types.is_numeric_dtype(processed_df[receita_col]):
-            total_receita = processed_df[receita_col].sum()
-        else:
-            total_receita = 0
-            logger.warning(f"[UNIFIED PROCESSOR] ⚠️ Coluna '{receita_col}' não é numérica, usando 0")
-        
-        metadata["financial_summary"] = {
-            "quantidade_column": quantidade_col,
-            "receita_column": receita_col,
-            "total_quantidade": float(total_quantidade),
-            "total_receita": float(total_receita),
-            "total_receita_formatted": f"R$ {total_receita:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+            compacted[col] = series.astype('category')
+
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+            compacted[col] = pd.to_numeric(series, downcast='integer')
+
+        if str(compacted[col].dtype) != original_dtype:
+            converted[col] = {"from": original_dtype, "to": str(compacted[col].dtype)}
+
+    bytes_after = int(compacted.memory_usage(index=True, deep=True).sum())
+    report = {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+        "columns_converted": converted
+    }
+
+    logger.info(
+        f"[UNIFIED PROCESSOR] 🗜️ Compactação: {bytes_before / 1024 / 1024:.2f} MB → "
+        f"{bytes_after / 1024 / 1024:.2f} MB ({len(converted)} colunas convertidas)"
+    )
+
+    return compacted, report
+
+
+# Quantidade de valores mais frequentes guardados por coluna categórica
+PROFILE_TOP_VALUES = 5
+# Linhas guardadas na prévia do dataset
+PROFILE_PREVIEW_ROWS = 5
+
+
+def _profile_number(value: Any) -> Any:
+    """Converte escalares numpy para tipos JSON (NaN vira None)."""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    return float(value)
+
+
+def build_dataset_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    📋 PERFIL DO DATASET (calculado uma vez no upload)
+
+    Reúne tudo o que o contexto do chat usa e que depende apenas dos dados:
+    estatísticas por coluna numérica, cardinalidade e valores mais frequentes
+    das colunas categóricas e a prévia das primeiras linhas. O resultado é
+    serializável em JSON para ser salvo junto com a sessão.
+
+    Args:
+        df: DataFrame final da sessão
+
+    Returns:
+        Dict com 'numeric', 'categorical', listas de colunas e 'preview_markdown'
+    """
+    numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+
+    numeric_profile = {}
+    for col in numeric_columns:
+        series = df[col]
+        numeric_profile[col] = {
+            "sum": _profile_number(series.sum()),
+            "mean": _profile_number(series.mean()),
+            "min": _profile_number(series.min()),
+            "max": _profile_number(series.max()),
+            "count": int(series.count())
         }
-        
-        logger.info(f"[UNIFIED PROCESSOR] 💰 Total Quantidade: {total_quantidade:,.0f}")
-        logger.info(f"[UNIFIED PROCESSOR] 💰 Total Receita: R$ {total_receita:,.2f}")
-    
-    # 🔧 CORREÇÃO CRÍTICA 4: Validação de qualidade de dados
-    metadata["data_quality"] = {
-        "total_rows_final": len(processed_df),
-        "total_columns_final": len(processed_df.columns),
-        "missing_values_by_column": processed_df.isnull().sum().to_dict(),
-        "duplicated_rows": int(processed_df.duplicated().sum())
+
+    categorical_profile = {}
+    for col in categorical_columns:
+        counts = df[col].value_counts()
+        categorical_profile[col] = {
+            "unique": int(df[col].nunique()),
+            "top_values": {str(value): int(count) for value, count in counts.head(PROFILE_TOP_VALUES).items()}
+        }
+
+    try:
+        preview_markdown = df.head(PROFILE_PREVIEW_ROWS).to_markdown(index=False)
+    except ImportError:
+        # to_markdown depende do pacote opcional 'tabulate'
+        preview_markdown = df.head(PROFILE_PREVIEW_ROWS).to_string(index=False)
+
+    return {
+        "row_count": int(len(df)),
+        "numeric_columns": numeric_columns,
+        "categorical_columns": categorical_columns,
+        "numeric": numeric_profile,
+        "categorical": categorical_profile,
+        "preview_markdown": preview_markdown
     }
-    
-    logger.info(f"[UNIFIED PROCESSOR] ✅ Processamento concluído para {source_info}")
-    logger.info(f"[UNIFIED PROCESSOR] Resultado: {len(processed_df)} linhas, {len(processed_df.columns)} colunas")
-    
-    return processed_df, metadata
+
+
+# Dimensões de texto incluídas no rollup de receita (as de menor cardinalidade)
+ROLLUP_MAX_DIMENSIONS = 3
+ROLLUP_MAX_DIMENSION_VALUES = 50
+
+
+def find_revenue_column(df: pd.DataFrame) -> Tuple[Any, Any]:
+    """
+    Identifica a coluna de receita usada nas respostas determinísticas de faturamento.
+
+    Ordem de preferência: colunas numéricas com 'receita'/'faturamento';
+    depois 'valor'/'total'; depois 'Receita_Total_Derivada'; por fim
+    quantidade x preço.
+
+    Args:
+        df: DataFrame da sessão
+
+    Returns:
+        Tuple[nome da coluna ou None, Series de receita ou None]
+    """
+    candidates = [c for c in df.columns if any(k in c.lower() for k in ['receita', 'faturamento'])]
+    if not candidates:
+        candidates = [c for c in df.columns if 'valor' in c.lower() or 'total' in c.lower()]
+    for col in candidates:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            return col, df[col]
+
+    if 'Receita_Total_Derivada' in df.columns and pd.api.types.is_numeric_dtype(df['Receita_Total_Derivada']):
+        return 'Receita_Total_Derivada', df['Receita_Total_Derivada']
+
+    qtd_col = next((c for c in df.columns if 'quantidade' in c.lower() and pd.api.types.is_numeric_dtype(df[c])), None)
+    preco_col = next((c for c in df.columns if any(k in c.lower() for k in ['preco', 'preço']) and pd.api.types.is_numeric_dtype(df[c])), None)
+    if qtd_col and preco_col:
+        return f"{qtd_col} x {preco_col}", df[qtd_col].fillna(0) * df[preco_col].fillna(0)
+
+    return None, None
+
+
+def build_revenue_rollup(df: pd.DataFrame, date_columns: List[str]) -> Any:
+    """
+    📦 ROLLUP DE RECEITA (calculado uma vez no upload)
+
+    Pré-agrega receita e quantidade por ano, ano x mês e ano x trimestre,
+    além da receita por ano para as principais dimensões de texto. As
+    perguntas de faturamento passam a ser respondidas a partir daqui, sem
+    varrer o DataFrame. Chaves de ano/mês são strings (serializável em JSON).
+
+    Args:
+        df: DataFrame final da sessão
+        date_columns: Colunas temporais detectadas (a primeira é a base)
+
+    Returns:
+        Dict do rollup, ou None se não houver receita numérica e indicador temporal
+    """
+    base_date_col = date_columns[0] if date_columns else None
+    # Auxiliares gravadas (sessões antigas) ou calculadas da coluna de data (virtuais)
+    auxiliary = {
+        part: resolve_column(df, f"{base_date_col}{part}") if base_date_col else None
+        for part in ('_Ano', '_Mes', '_Mes_Nome')
+    }
+    ano_col = f"{base_date_col}_Ano" if auxiliary['_Ano'] is not None else None
+    mes_col = f"{base_date_col}_Mes" if auxiliary['_Mes'] is not None else None
+    mes_nome_col = f"{base_date_col}_Mes_Nome" if auxiliary['_Mes_Nome'] is not None else None
+
+    revenue_col, revenue = find_revenue_column(df)
+    if revenue is None or not (ano_col or base_date_col in df.columns):
+        return None
+
+    revenue = revenue.astype('float64')
+    quantity_col = next((c for c in df.columns if 'quantidade' in c.lower() and pd.api.types.is_numeric_dtype(df[c])), None)
+    quantity = df[quantity_col].astype('float64') if quantity_col else pd.Series(0.0, index=df.index)
+
+    year = auxiliary['_Ano']
+
+    rollup = {
+        "revenue_column": revenue_col,
+        "quantity_column": quantity_col,
+        "base_date_column": base_date_col,
+        "year_column": ano_col,
+        "has_year": year is not None,
+        "has_month": mes_col is not None,
+        "total_revenue": float(revenue.sum()),
+        "total_quantity": float(quantity.sum()),
+        "years": {},
+        "months": {},
+        "quarters": {},
+        "month_names": {},
+        "dimensions": {}
+    }
+    if year is None:
+        return rollup
+
+    frame = pd.DataFrame({"year": year, "revenue": revenue, "quantity": quantity})
+    by_year = frame.groupby("year", dropna=True, observed=True).agg(
+        revenue=("revenue", "sum"), quantity=("quantity", "sum"), rows=("revenue", "size")
+    )
+    for y, row in by_year.iterrows():
+        rollup["years"][str(int(y))] = {
+            "revenue": float(row["revenue"]),
+            "quantity": float(row["quantity"]),
+            "rows": int(row["rows"])
+        }
+
+    if mes_col:
+        month = auxiliary['_Mes']
+        frame["month"] = month
+        frame["quarter"] = (month - 1) // 3 + 1
+        by_month = frame.groupby(["year", "month"], dropna=True, observed=True)[["revenue", "quantity"]].sum().sort_index()
+        for (y, m), row in by_month.iterrows():
+            rollup["months"].setdefault(str(int(y)), []).append([int(m), float(row["revenue"]), float(row["quantity"])])
+        by_quarter = frame.groupby(["year", "quarter"], dropna=True, observed=True)["revenue"].sum()
+        for (y, q), value in by_quarter.items():
+            rollup["quarters"].setdefault(str(int(y)), {})[str(int(q))] = float(value)
+        if mes_nome_col:
+            names = pd.DataFrame({"month": month, "name": auxiliary['_Mes_Nome']}).dropna().drop_duplicates(subset=["month"])
+            rollup["month_names"] = {str(int(m)): str(n) for m, n in zip(names["month"], names["name"])}
+
+    # Receita por ano nas dimensões de texto de menor cardinalidade (Região, Categoria...)
+    text_columns = [
+        c for c in df.select_dtypes(include=['object', 'category']).columns
+        if not c.endswith('_Mes_Nome') and 0 < df[c].nunique() <= ROLLUP_MAX_DIMENSION_VALUES
+    ]
+    text_columns = sorted(text_columns, key=lambda c: df[c].nunique())[:ROLLUP_MAX_DIMENSIONS]
+    for dim in text_columns:
+        frame["dim"] = df[dim]
+        by_dim = frame.groupby(["year", "dim"], dropna=True, observed=True)["revenue"].sum()
+        dim_rollup: Dict[str, Dict[str, float]] = {}
+        for (y, value), total in by_dim.items():
+            dim_rollup.setdefault(str(int(y)), {})[str(value)] = float(total)
+        rollup["dimensions"][dim] = dim_rollup
+
+    return rollup
 
 
 def validate_financial_consistency(df1: pd.DataFrame, df2: pd.DataFrame, label1: str = "DataFrame1", label2: str = "DataFrame2") -> Dict[str, Any]:
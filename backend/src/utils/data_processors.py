@@ -6,8 +6,12 @@ Funções para processamento e normalização de dados em DataFrames
 from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from ..config.settings import MONTH_TRANSLATION, MONTH_NAMES_PT
+from ..config.settings import MONTH_NAMES_PT
+from .type_inference import TYPE_MATCH_THRESHOLD, decide_from_sample, sample_column
+from .date_formats import parse_date_column, parse_dates, sniff_date_format
 
 
 def normalize_decimal_string(value: Any) -> Optional[str]:
@@ -38,13 +42,82 @@ def normalize_decimal_string(value: Any) -> Optional[str]:
     return text
 
 
+# Texto que o parser numérico do pandas aceita como número decimal/científico
+# (com espaços em branco ASCII nas pontas, que ele também ignora)
+NUMERIC_TEXT_PATTERN = r'^[ \t\n\v\f\r]*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?[ \t\n\v\f\r]*$'
+# Caracteres removidos por normalize_decimal_string (além de 'R$')
+_DECIMAL_STRIP_PATTERN = '[% \t\n\r\u00a0]'
+
+
+def normalize_decimal_array(series: pd.Series) -> pa.StringArray:
+    """
+    Versão vetorizada de normalize_decimal_string para uma coluna inteira.
+
+    Aplica as mesmas regras (remoção de 'R$', '%', espaços e NBSP; formatos
+    1.234,56 e 1234,56) com kernels do pyarrow, sem chamada Python por célula.
+
+    Args:
+        series: Série com valores quaisquer (convertidos com astype(str))
+
+    Returns:
+        Array de strings do pyarrow, nulo onde o valor é vazio/nulo
+    """
+    text = pa.array(series.astype(str).to_numpy(dtype=object), type=pa.string())
+    text = pc.utf8_trim_whitespace(text)
+    null_mask = pc.or_(
+        pc.equal(text, ''),
+        pc.is_in(pc.utf8_lower(text), value_set=pa.array(['nan', 'none', 'null']))
+    )
+
+    # Remove símbolos comuns
+    text = pc.replace_substring(text, 'R$', '')
+    text = pc.replace_substring_regex(text, _DECIMAL_STRIP_PATTERN, '')
+
+    # Normaliza separadores decimais: 1.234,56 -> 1234.56 e 1234,56 -> 1234.56
+    thousands_dots = pc.and_(
+        pc.equal(pc.count_substring(text, ','), 1),
+        pc.greater_equal(pc.count_substring(text, '.'), 1)
+    )
+    text = pc.if_else(thousands_dots, pc.replace_substring(text, '.', ''), text)
+    text = pc.replace_substring(text, ',', '.')
+    return pc.if_else(null_mask, pa.scalar(None, pa.string()), text)
+
+
+def normalize_decimal_series(series: pd.Series) -> pd.Series:
+    """
+    normalize_decimal_array devolvido como série do pandas.
+
+    Args:
+        series: Série com valores quaisquer
+
+    Returns:
+        Série de strings (string[pyarrow]) com <NA> onde o valor é vazio/nulo
+    """
+    text = normalize_decimal_array(series)
+    return pd.Series(pd.arrays.ArrowStringArray(text), index=series.index, name=series.name)
+
+
 def coerce_numeric_series(series: pd.Series) -> pd.Series:
     """Converte uma série para numérico com tratamento robusto."""
     if pd.api.types.is_numeric_dtype(series):
         return pd.to_numeric(series, errors='coerce')
 
-    normalized = series.astype(str).map(normalize_decimal_string)
-    return pd.to_numeric(normalized, errors='coerce')
+    text = normalize_decimal_array(series)
+    normalized = pd.Series(pd.arrays.ArrowStringArray(text), index=series.index, name=series.name)
+
+    # Só chegam ao pd.to_numeric os valores que ele pode aceitar; o restante já é NaN
+    candidates = pc.fill_null(pc.or_(
+        pc.match_substring_regex(text, NUMERIC_TEXT_PATTERN),
+        pc.match_substring_regex(text, 'inf|nan', ignore_case=True)
+    ), False).to_numpy(zero_copy_only=False)
+
+    if candidates.all():
+        return pd.to_numeric(normalized.astype(object), errors='coerce')
+
+    result = pd.Series(np.nan, index=series.index, name=series.name)
+    if candidates.any():
+        result[candidates] = pd.to_numeric(normalized[candidates].astype(object), errors='coerce').to_numpy(dtype=float)
+    return result
 
 
 def detect_numeric_columns(df: pd.DataFrame) -> Tuple[List[str], Dict[str, pd.Series]]:
@@ -60,28 +133,23 @@ def detect_numeric_columns(df: pd.DataFrame) -> Tuple[List[str], Dict[str, pd.Se
     numeric_data: Dict[str, pd.Series] = {}
 
     for column in df.columns:
-        coerced = coerce_numeric_series(df[column])
+        series = df[column]
+
+        # Colunas de texto são descartadas pela amostra, sem converter a coluna inteira
+        sample = None if pd.api.types.is_numeric_dtype(series) else sample_column(series)
+        if sample is not None:
+            if decide_from_sample(int(coerce_numeric_series(sample).notna().sum()), len(sample)) is False:
+                continue
+
+        coerced = coerce_numeric_series(series)
         # Considerar numérica se >= 30% dos valores forem convertidos
-        if coerced.notna().sum() >= max(1, int(len(coerced) * 0.3)):
+        if coerced.notna().sum() >= max(1, int(len(coerced) * TYPE_MATCH_THRESHOLD)):
             numeric_columns.append(column)
             numeric_data[column] = coerced
 
     return numeric_columns, numeric_data
 
 
-def normalize_month_text(value: Any) -> Any:
-    """Normaliza texto de mês em português para inglês."""
-    if not isinstance(value, str):
-        return value
-
-    text = value.strip()
-    lower = text.lower()
-    for pt_name, eng_name in MONTH_TRANSLATION.items():
-        if pt_name in lower:
-            lower = lower.replace(pt_name, eng_name.lower())
-    return lower
-
-
 def month_number_to_name(month_num: int) -> str:
     """
     Converte número do mês (1-12) para nome em português.
@@ -92,56 +160,75 @@ def month_number_to_name(month_num: int) -> str:
     return MONTH_NAMES_PT.get(month_num, str(month_num))
 
 
-def detect_datetime_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
+def sniff_datetime_columns(
+    df: pd.DataFrame,
+    known_formats: Optional[Dict[str, str]] = None
+) -> Tuple[Dict[str, pd.Series], Dict[str, str]]:
     """
-    Detecta e converte colunas de data/hora com tratamento robusto.
+    Detecta o formato de data de cada coluna e converte a coluna uma única vez.
+    
+    O formato é escolhido em uma amostra (ver sniff_date_format): ISO,
+    brasileiro, americano, com horário, nomes de meses em pt-BR e seriais do
+    Excel. Formatos já conhecidos (de uma ingestão anterior da mesma fonte)
+    são aplicados diretamente; se deixarem de servir, a coluna é analisada de novo.
     
-    Tenta múltiplos formatos:
-    - ISO (YYYY-MM-DD)
-    - Brasileiro (DD/MM/YYYY)
-    - Americano (MM/DD/YYYY)
-    - Texto de mês (ex: "Janeiro 2024")
+    Args:
+        df: DataFrame a ser analisado
+        known_formats: Formatos detectados anteriormente, por coluna
     
     Returns:
-        Dict mapeando nome da coluna para série de datetime convertida
+        Tuple contendo:
+        - Dict mapeando nome da coluna para série de datetime convertida
+        - Dict mapeando nome da coluna para o formato detectado
     """
+    known_formats = known_formats or {}
     datetime_columns: Dict[str, pd.Series] = {}
+    datetime_formats: Dict[str, str] = {}
 
     for column in df.columns:
         series = df[column]
+        min_valid = max(1, int(len(series) * TYPE_MATCH_THRESHOLD))
         parsed = None
-        
-        if pd.api.types.is_datetime64_any_dtype(series):
-            # Já é datetime, apenas garantir
-            parsed = pd.to_datetime(series, errors='coerce')
-        else:
-            # Tentar múltiplos formatos comuns
-            # Formato ISO (YYYY-MM-DD) - mais comum e inequívoco
-            parsed = pd.to_datetime(series, format='%Y-%m-%d', errors='coerce')
-            
-            if parsed.isna().all():
-                # Formato brasileiro (DD/MM/YYYY)
-                parsed = pd.to_datetime(series, format='%d/%m/%Y', errors='coerce', dayfirst=True)
-            
-            if parsed.isna().all():
-                # Formato americano (MM/DD/YYYY)
-                parsed = pd.to_datetime(series, format='%m/%d/%Y', errors='coerce')
-            
-            if parsed.isna().all():
-                # Formato com texto de mês (ex: "Janeiro 2024")
-                normalized = series.astype(str).map(normalize_month_text)
-                parsed = pd.to_datetime(normalized, errors='coerce', dayfirst=True)
-            
-            if parsed.isna().all():
-                # Último recurso: deixar pandas inferir (SEM dayfirst para evitar ambiguidade)
-                parsed = pd.to_datetime(series, errors='coerce', dayfirst=False)
+
+        date_format = known_formats.get(column)
+        if date_format:
+            parsed = parse_dates(series, date_format)
+            if parsed.notna().sum() < min_valid:
+                parsed = None
+
+        if parsed is None:
+            date_format = sniff_date_format(series, column)
+            if date_format is None:
+                continue
+            sample = sample_column(series)
+            if sample is not None:
+                if decide_from_sample(int(parse_dates(sample, date_format).notna().sum()), len(sample)) is False:
+                    continue
+            # Valores que o formato não converteu (ex.: datas em dois formatos) são detectados à parte
+            parsed, _formats_used = parse_date_column(series, column, date_format)
 
         # Considerar válida se >= 30% dos valores foram convertidos com sucesso
-        if parsed is not None and parsed.notna().sum() >= max(1, int(len(parsed) * 0.3)):
+        if parsed.notna().sum() >= min_valid:
             parsed.name = column
             datetime_columns[column] = parsed
+            datetime_formats[column] = date_format
 
-    return datetime_columns
+    return datetime_columns, datetime_formats
+
+
+def detect_datetime_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """
+    Detecta e converte colunas de data/hora com tratamento robusto.
+    
+    Returns:
+        Dict mapeando nome da coluna para série de datetime convertida
+    """
+    return sniff_datetime_columns(df)[0]
+
+
+def _has_text(series: pd.Series) -> bool:
+    """Indica se a série tem algum valor não vazio (após strip)."""
+    return bool(series.astype(str).str.strip().replace('', np.nan).notna().sum() > 0)
 
 
 def detect_text_columns(df: pd.DataFrame, numeric_columns: List[str]) -> List[str]:
@@ -163,7 +250,11 @@ def detect_text_columns(df: pd.DataFrame, numeric_columns: List[str]) -> List[st
             continue
         series = df[column]
         if pd.api.types.is_string_dtype(series) or series.dtype == object:
-            if series.astype(str).str.strip().replace('', np.nan).notna().sum() > 0:
+            # Um valor preenchido na amostra basta; só sem ele a coluna inteira é lida
+            sample = sample_column(series)
+            if sample is not None and _has_text(sample):
+                text_columns.append(column)
+            elif _has_text(series):
                 text_columns.append(column)
 
     return text_columns
@@ -178,19 +269,21 @@ def build_temporal_mask(
     Constrói máscara booleana para filtrar dados por ano/mês.
     
     Args:
-        table: Dict contendo 'datetime_columns' com séries de datetime
+        table: Dict da tabela ('df' e nomes das colunas em 'datetime_columns')
         year: Filtro de ano (opcional)
         month: Filtro de mês (opcional)
     
     Returns:
         Série booleana com a máscara ou None se não houver colunas de data
     """
-    datetime_columns: Dict[str, pd.Series] = table.get('datetime_columns', {})
+    datetime_columns: List[str] = table.get('datetime_columns', [])
     if not datetime_columns:
         return None
 
+    df = table['df']
     combined_mask: Optional[pd.Series] = None
-    for parsed in datetime_columns.values():
+    for column in datetime_columns:
+        parsed = df[column]
         mask = parsed.notna()
         if year is not None:
             mask &= parsed.dt.year == year
@@ -202,68 +295,3 @@ def build_temporal_mask(
             combined_mask |= mask
 
     return combined_mask
-
-
-def prepare_table(table_name: str, df: pd.DataFrame) -> Dict[str, Any]:
-    """
-    Processa um DataFrame completo, detectando tipos e criando colunas auxiliares.
-    
-    Cria colunas auxiliares para análise temporal:
-    - {coluna}_Mes: Número do mês (1-12)
-    - {coluna}_Ano: Ano (ex: 2024)
-    - {coluna}_Trimestre: Trimestre (1-4)
-    - {coluna}_Mes_Nome: Nome do mês em português
-    
-    Args:
-        table_name: Nome identificador da tabela
-        df: DataFrame a ser processado
-    
-    Returns:
-        Dict com metadados da tabela processada
-    """
-    processed = df.copy()
-    processed.columns = [str(col).strip() for col in processed.columns]
-    processed = processed.replace('', np.nan)
-
-    numeric_columns, numeric_data = detect_numeric_columns(processed)
-    datetime_columns = detect_datetime_columns(processed)
-    text_columns = detect_text_columns(processed, numeric_columns)
-    
-    # Criar colunas auxiliares para CADA coluna de data detectada
-    auxiliary_columns_created = []
-    for col_name, datetime_series in datetime_columns.items():
-        # Adicionar coluna "Mes" (numérico: 1-12)
-        mes_col = f"{col_name}_Mes"
-        processed[mes_col] = datetime_series.dt.month
-        numeric_columns.append(mes_col)
-        auxiliary_columns_created.append(mes_col)
-        
-        # Adicionar coluna "Ano" (numérico: ex: 2024)
-        ano_col = f"{col_name}_Ano"
-        processed[ano_col] = datetime_series.dt.year
-        numeric_columns.append(ano_col)
-        auxiliary_columns_created.append(ano_col)
-        
-        # Adicionar coluna "Trimestre" (numérico: 1-4)
-        trimestre_col = f"{col_name}_Trimestre"
-        processed[trimestre_col] = datetime_series.dt.quarter
-        numeric_columns.append(trimestre_col)
-        auxiliary_columns_created.append(trimestre_col)
-        
-        # Adicionar coluna "Mes_Nome" (texto: "janeiro", "fevereiro", etc.)
-        mes_nome_col = f"{col_name}_Mes_Nome"
-        processed[mes_nome_col] = datetime_series.dt.month.map(month_number_to_name)
-        text_columns.append(mes_nome_col)
-        auxiliary_columns_created.append(mes_nome_col)
-
-    return {
-        'name': table_name,
-        'df': processed,
-        'row_count': int(len(processed)),
-        'columns': list(processed.columns),
-        'numeric_columns': numeric_columns,
-        'numeric_data': numeric_data,
-        'datetime_columns': datetime_columns,
-        'text_columns': text_columns,
-        'auxiliary_columns': auxiliary_columns_created,
-    }
@@ -0,0 +1,267 @@
+"""
+DataFrame Storage Module
+Serialização binária colunar (Arrow IPC) dos DataFrames de sessão do AlphaBot
+"""
+
+import hashlib
+import io
+import os
+import uuid
+from typing import Any, Iterable, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+from ..config.settings import ALPHABOT_SESSION_DIR
+
+
+# Formatos de armazenamento suportados para o DataFrame de uma sessão
+STORAGE_FORMAT_ARROW = 'arrow'
+STORAGE_FORMAT_ARROW_FILE = 'arrow_file'  # Arquivo Arrow não comprimido no volume (memory map)
+STORAGE_FORMAT_JSON = 'json'  # Legado: to_json(orient='split')
+
+# Compressão aplicada aos blobs Arrow (zstd é suportado pelo pyarrow padrão)
+ARROW_COMPRESSION = 'zstd'
+
+# Versão do pipeline de processamento do upload. Incrementar quando uma mudança
+# alterar o dataset gerado, para que hashes antigos não sejam reaproveitados.
+DATASET_PIPELINE_VERSION = 5
+
+
+def hash_file_bytes(file_bytes: bytes) -> str:
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo enviado.
+
+    Args:
+        file_bytes: Conteúdo do arquivo
+
+    Returns:
+        Hash hexadecimal
+    """
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def fingerprint_files(file_hashes: Iterable[str]) -> str:
+    """
+    Gera a impressão digital de um conjunto de arquivos a partir dos hashes individuais.
+
+    A ordem dos arquivos não importa: o mesmo conjunto sempre gera o mesmo
+    valor. A versão do pipeline entra no cálculo.
+
+    Args:
+        file_hashes: Hashes SHA-256 de cada arquivo
+
+    Returns:
+        Hash hexadecimal do conjunto
+    """
+    digest = hashlib.sha256(f"pipeline-v{DATASET_PIPELINE_VERSION}".encode())
+    for file_hash in sorted(file_hashes):
+        digest.update(file_hash.encode())
+    return digest.hexdigest()
+
+
+def _stringify_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte colunas object com tipos misturados para texto.
+
+    O Arrow exige um único tipo por coluna; o JSON legado aceitava qualquer
+    combinação. Valores nulos são preservados.
+    """
+    converted = df.copy(deep=False)
+    for column in converted.columns:
+        series = converted[column]
+        if series.dtype != object:
+            continue
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred not in ('string', 'empty'):
+            converted[column] = series.where(series.isna(), series.astype(str))
+    return converted
+
+
+def _to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Converte um DataFrame para tabela Arrow, normalizando nomes e colunas mistas."""
+    if not all(isinstance(col, str) for col in df.columns):
+        df = df.rename(columns=str)
+
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.Table.from_pandas(_stringify_mixed_columns(df))
+
+
+def serialize_dataframe(df: pd.DataFrame, compression: Optional[str] = ARROW_COMPRESSION) -> bytes:
+    """
+    Serializa um DataFrame em bytes no formato Arrow IPC (Feather v2).
+
+    Preserva dtypes (datetime64, category, inteiros, floats), ao contrário
+    do JSON, que devolve datas como texto e categorias como object.
+
+    Args:
+        df: DataFrame a ser serializado
+        compression: Codec de compressão ('zstd', 'lz4' ou None)
+
+    Returns:
+        Bytes do arquivo Arrow IPC
+    """
+    table = _to_arrow_table(df)
+    sink = pa.BufferOutputStream()
+    feather.write_feather(table, sink, compression=compression)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_dataframe(payload: Union[bytes, bytearray, memoryview]) -> pd.DataFrame:
+    """
+    Reconstrói um DataFrame a partir de bytes Arrow IPC.
+
+    A leitura é feita diretamente dos buffers colunares, sem parse de texto.
+
+    Args:
+        payload: Bytes gerados por serialize_dataframe
+
+    Returns:
+        DataFrame com os dtypes originais
+    """
+    table = feather.read_table(pa.BufferReader(payload))
+    return table.to_pandas()
+
+
+def write_session_file(df: pd.DataFrame, dataset_id: str, directory: str = ALPHABOT_SESSION_DIR) -> str:
+    """
+    Grava o DataFrame de uma sessão como arquivo Arrow IPC no volume persistente.
+
+    O arquivo é gravado sem compressão para que possa ser lido via memory map:
+    as colunas numéricas passam a ser servidas pelo page cache do sistema, sem
+    cópia para a heap do Python, e vários workers compartilham as mesmas páginas.
+    A escrita é atômica (arquivo temporário + rename).
+
+    Args:
+        df: DataFrame da sessão
+        dataset_id: Identificador usado no nome do arquivo (ex.: session_id)
+        directory: Diretório de destino
+
+    Returns:
+        Caminho absoluto do arquivo gravado
+    """
+    os.makedirs(directory, exist_ok=True)
+    safe_id = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in str(dataset_id))
+    path = os.path.abspath(os.path.join(directory, f"{safe_id}.arrow"))
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    table = _to_arrow_table(df)
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return path
+
+
+def read_session_file(path: str) -> pd.DataFrame:
+    """
+    Lê o arquivo Arrow de uma sessão via memory map.
+
+    Colunas numéricas sem nulos são expostas como views somente leitura sobre
+    o mapeamento; as demais são materializadas normalmente pelo pandas.
+
+    Args:
+        path: Caminho retornado por write_session_file
+
+    Returns:
+        DataFrame da sessão
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir mais no volume
+    """
+    with pa.memory_map(path, 'r') as source:
+        table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def delete_session_file(path: Optional[str]) -> bool:
+    """
+    Remove o arquivo Arrow de uma sessão, se existir.
+
+    Args:
+        path: Caminho do arquivo (None é ignorado)
+
+    Returns:
+        True se o arquivo foi removido
+    """
+    if not path:
+        return False
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def load_session_dataframe(payload: Any, storage_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Carrega o DataFrame de uma sessão independentemente do formato salvo.
+
+    Aceita tanto o blob Arrow quanto o JSON legado (orient='split'), o que
+    permite ler sessões antigas antes de migrá-las.
+
+    Args:
+        payload: Bytes Arrow, string JSON ou caminho do arquivo Arrow
+        storage_format: Formato declarado ('arrow', 'arrow_file' ou 'json'); inferido se None
+
+    Returns:
+        DataFrame da sessão
+
+    Raises:
+        ValueError: Se o payload estiver vazio ou o formato for desconhecido
+    """
+    if payload is None or len(payload) == 0:
+        raise ValueError("Payload do DataFrame vazio")
+
+    if storage_format is None:
+        storage_format = STORAGE_FORMAT_JSON if isinstance(payload, str) else STORAGE_FORMAT_ARROW
+
+    if storage_format == STORAGE_FORMAT_ARROW:
+        return deserialize_dataframe(payload)
+
+    if storage_format == STORAGE_FORMAT_ARROW_FILE:
+        return read_session_file(payload)
+
+    if storage_format == STORAGE_FORMAT_JSON:
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            payload = bytes(payload).decode('utf-8')
+        return pd.read_json(io.StringIO(payload), orient='split')
+
+    raise ValueError(f"Formato de armazenamento desconhecido: {storage_format}")
+
+
+def convert_json_to_arrow(dataframe_json: str) -> bytes:
+    """
+    Converte um DataFrame salvo no JSON legado para bytes Arrow IPC.
+
+    Usado na migração de sessões antigas. Colunas com datas ISO são
+    reconvertidas para datetime64 antes da serialização.
+
+    Args:
+        dataframe_json: String gerada por to_json(orient='split', date_format='iso')
+
+    Returns:
+        Bytes Arrow IPC
+    """
+    df = load_session_dataframe(dataframe_json, STORAGE_FORMAT_JSON)
+
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object:
+            continue
+        sample = series.dropna().astype(str).head(20)
+        if sample.empty or not sample.str.match(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}').all():
+            continue
+        parsed = pd.to_datetime(series, errors='coerce', utc=True).dt.tz_localize(None)
+        if parsed.notna().sum() == series.notna().sum():
+            df[column] = parsed
+
+    return serialize_dataframe(df)
@@ -0,0 +1,266 @@
+"""
+Date Formats Module
+Detecção do formato de colunas de data em uma amostra e conversão em passagem única
+"""
+
+import re
+import unicodedata
+import warnings
+from typing import List, Optional, Tuple
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from .month_names import MONTH_NAME_NUMBERS, MONTH_NAME_PATTERN, MONTH_NAME_SEARCH
+from .type_inference import sample_column
+
+
+# Formatos especiais (os demais valores são formatos strptime)
+FORMAT_DATETIME = 'datetime64'       # Coluna já tipada como data
+FORMAT_EXCEL_SERIAL = 'excel_serial'  # Número de dias desde 30/12/1899 (Excel)
+FORMAT_MONTH_TEXT = 'month_text'      # Nome do mês por extenso (ex.: "Janeiro 2024")
+
+# Formatos strptime testados na amostra; em empate vence o primeiro (DD/MM antes de MM/DD)
+DATE_FORMAT_CANDIDATES = [
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%Y/%m/%d',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+]
+
+# Faixa aceita para datas seriais do Excel (1954-10-03 a 2119-01-11)
+EXCEL_SERIAL_MIN = 20000
+EXCEL_SERIAL_MAX = 80000
+EXCEL_EPOCH = '1899-12-30'
+
+# Palavras do nome da coluna que indicam data (exigidas para tratar números como seriais).
+# Comparadas com palavras inteiras do nome: "Média", "Diária" e "Metadata" não contam
+DATE_NAME_HINTS = ('data', 'date', 'dt', 'dia', 'vencimento', 'emissao', 'periodo', 'competencia')
+
+_YEAR_PATTERN = r'\b(\d{4})\b'
+_SHORT_YEAR_PATTERN = r'[/\-\s](\d{2})$'
+_LEADING_DAY_PATTERN = r'^(\d{1,2})\b'
+_CAMEL_CASE_PATTERN = re.compile(r'([a-z])([A-Z])')
+_NAME_SEPARATOR_PATTERN = re.compile(r'[^a-z0-9]+')
+
+
+def _strip_accents(text: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+def _name_tokens(column_name: Optional[str]) -> List[str]:
+    """
+    Palavras do nome da coluna, sem acentos e em minúsculas.
+
+    Separa em '_', espaços, pontuação e camelCase: "Dt_Emissão" vira
+    ['dt', 'emissao'] e "DataVenda" vira ['data', 'venda'].
+    """
+    if column_name is None:
+        return []
+    name = _CAMEL_CASE_PATTERN.sub(r'\1 \2', _strip_accents(str(column_name)))
+    return [token for token in _NAME_SEPARATOR_PATTERN.split(name.lower()) if token]
+
+
+def _has_date_name(column_name: Optional[str]) -> bool:
+    """Indica se alguma palavra do nome da coluna sugere uma data."""
+    return any(token in DATE_NAME_HINTS for token in _name_tokens(column_name))
+
+
+def is_excel_serial_column(values: pd.Series, column_name: Optional[str]) -> bool:
+    """
+    Indica se números devem ser lidos como seriais do Excel.
+
+    Exige nome de data (ver DATE_NAME_HINTS) e valores inteiros, todos na
+    faixa EXCEL_SERIAL_MIN..EXCEL_SERIAL_MAX: médias e valores em reais com
+    centavos nunca viram datas.
+
+    Args:
+        values: Valores não nulos (número ou texto numérico)
+        column_name: Nome da coluna
+
+    Returns:
+        True se a coluna deve ser convertida com FORMAT_EXCEL_SERIAL
+    """
+    if values.empty or not _has_date_name(column_name):
+        return False
+    serials = pd.to_numeric(values, errors='coerce')
+    if serials.isna().any() or not (serials % 1 == 0).all():
+        return False
+    return bool(parse_excel_serial(serials).notna().all())
+
+
+def _is_calendar_format(fmt: str) -> bool:
+    """Formatos sem mês (ex.: '%Y') ou sem data (ex.: '%H:%M') não são aceitos."""
+    return ('%m' in fmt or '%b' in fmt or '%B' in fmt) and ('%d' in fmt or '%Y' in fmt)
+
+
+def parse_month_text(series: pd.Series) -> pd.Series:
+    """
+    Converte datas com nome de mês (pt-BR ou inglês) de forma vetorizada.
+
+    Aceita variações como "Janeiro 2024", "jan/2024", "jan/24" e
+    "05 de março de 2024". Sem dia explícito, usa o dia 1.
+
+    Args:
+        series: Série com textos de data
+
+    Returns:
+        Série datetime64 (NaT onde não houver mês e ano)
+    """
+    # As expressões rodam só nos valores distintos (poucos em colunas de mês)
+    codes, uniques = pd.factorize(series.astype(str).str.strip().str.lower())
+    text = pd.Series(uniques, dtype=object)
+    months = text.str.extract(MONTH_NAME_PATTERN, expand=False).map(MONTH_NAME_NUMBERS)
+
+    years = pd.to_numeric(text.str.extract(_YEAR_PATTERN, expand=False), errors='coerce')
+    short_years = pd.to_numeric(text.str.extract(_SHORT_YEAR_PATTERN, expand=False), errors='coerce') + 2000
+    years = years.fillna(short_years)
+
+    days = pd.to_numeric(text.str.extract(_LEADING_DAY_PATTERN, expand=False), errors='coerce').fillna(1)
+
+    parts = pd.DataFrame({'year': years, 'month': months, 'day': days})
+    valid = parts.notna().all(axis=1)
+    distinct = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    if valid.any():
+        distinct[valid] = pd.to_datetime(parts[valid].astype('int64'), errors='coerce')
+    return pd.Series(distinct.to_numpy()[codes], index=series.index, dtype='datetime64[ns]')
+
+
+def parse_excel_serial(series: pd.Series) -> pd.Series:
+    """
+    Converte números seriais do Excel (dias desde 30/12/1899) em datas.
+
+    Args:
+        series: Série numérica (ou texto numérico)
+
+    Returns:
+        Série datetime64 (NaT fora da faixa aceita)
+    """
+    serials = pd.to_numeric(series, errors='coerce')
+    serials = serials.where((serials >= EXCEL_SERIAL_MIN) & (serials <= EXCEL_SERIAL_MAX))
+    return pd.to_datetime(serials, unit='D', origin=EXCEL_EPOCH, errors='coerce')
+
+
+def parse_dates(series: pd.Series, date_format: str) -> pd.Series:
+    """
+    Converte a coluna inteira com um formato já detectado (uma única passagem).
+
+    Args:
+        series: Coluna original
+        date_format: Formato strptime ou um dos formatos especiais (FORMAT_*)
+
+    Returns:
+        Série datetime64 com NaT nos valores que não seguem o formato
+    """
+    if date_format == FORMAT_DATETIME:
+        return pd.to_datetime(series, errors='coerce')
+    if date_format == FORMAT_EXCEL_SERIAL:
+        return parse_excel_serial(series)
+    if date_format == FORMAT_MONTH_TEXT:
+        return parse_month_text(series)
+    return pd.to_datetime(series, format=date_format, errors='coerce')
+
+
+def sniff_date_format(series: pd.Series, column_name: Optional[str] = None) -> Optional[str]:
+    """
+    Detecta o formato de data de uma coluna a partir de uma amostra.
+
+    Testa na amostra os formatos de DATE_FORMAT_CANDIDATES, o formato que o
+    pandas adivinharia pelo primeiro valor, nomes de meses e seriais do Excel,
+    ficando com o que converter mais valores. Colunas numéricas só são datas
+    quando o nome sugere data e os valores são inteiros na faixa de seriais
+    do Excel (ver is_excel_serial_column).
+
+    Args:
+        series: Coluna a ser analisada
+        column_name: Nome da coluna (usado para seriais do Excel)
+
+    Returns:
+        Formato detectado (aceito por parse_dates) ou None se não for data
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return FORMAT_DATETIME
+    if pd.api.types.is_bool_dtype(series):
+        return None
+
+    sample = sample_column(series)
+    values = (series if sample is None else sample).dropna()
+    if values.empty:
+        return None
+
+    if pd.api.types.is_numeric_dtype(values):
+        return FORMAT_EXCEL_SERIAL if is_excel_serial_column(values, column_name) else None
+
+    text = values.astype(str).str.strip()
+    text = text[text != '']
+    if text.empty:
+        return None
+
+    candidates = list(DATE_FORMAT_CANDIDATES)
+    with warnings.catch_warnings():
+        # O aviso de "dayfirst" não se aplica: o formato adivinhado só entra como candidato
+        warnings.simplefilter('ignore', UserWarning)
+        guessed = guess_datetime_format(text.iloc[0], dayfirst=True)
+    if guessed and guessed not in candidates and _is_calendar_format(guessed):
+        candidates.append(guessed)
+
+    best_format: Optional[str] = None
+    best_hits = 0
+    for fmt in candidates:
+        hits = int(pd.to_datetime(text, format=fmt, errors='coerce').notna().sum())
+        if hits > best_hits:
+            best_format, best_hits = fmt, hits
+        if best_hits == len(text):
+            return best_format
+
+    if text.str.lower().str.contains(MONTH_NAME_SEARCH).any():
+        hits = int(parse_month_text(text).notna().sum())
+        if hits > best_hits:
+            best_format, best_hits = FORMAT_MONTH_TEXT, hits
+
+    if best_format is None and is_excel_serial_column(text, column_name):
+        return FORMAT_EXCEL_SERIAL
+
+    return best_format
+
+
+def parse_date_column(
+    series: pd.Series,
+    column_name: Optional[str] = None,
+    date_format: Optional[str] = None
+) -> Tuple[Optional[pd.Series], List[str]]:
+    """
+    Converte uma coluna com o formato informado (ou detectado) e, se sobrarem
+    valores sem conversão, detecta o formato apenas nesse restante.
+
+    Cobre colunas consolidadas de arquivos diferentes (ex.: CSV em DD/MM/AAAA
+    e Excel em ISO): cada valor continua sendo convertido uma única vez.
+
+    Args:
+        series: Coluna original
+        column_name: Nome da coluna (usado para seriais do Excel)
+        date_format: Formato já conhecido (None detecta pela amostra)
+
+    Returns:
+        Tupla (série datetime64 ou None se não for data, formatos usados)
+    """
+    date_format = date_format or sniff_date_format(series, column_name)
+    if date_format is None:
+        return None, []
+
+    parsed = parse_dates(series, date_format)
+    formats_used = [date_format]
+    while len(formats_used) <= len(DATE_FORMAT_CANDIDATES):
+        remaining = series[parsed.isna() & series.notna()]
+        next_format = sniff_date_format(remaining, column_name) if not remaining.empty else None
+        if next_format is None or next_format in formats_used:
+            break
+        parsed = parsed.fillna(parse_dates(remaining, next_format))
+        formats_used.append(next_format)
+    return parsed, formats_used
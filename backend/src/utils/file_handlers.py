@@ -3,12 +3,23 @@ File Handlers Module
 Funções para leitura e processamento de arquivos (CSV, Excel, Google Drive)
 """
 
-from typing import Any, Dict, List
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+import hashlib
 import io
+import os
+import tempfile
+import time
+import numpy as np
 import pandas as pd
 from googleapiclient.http import MediaIoBaseDownload
+from openpyxl import load_workbook
 
-from .data_processors import prepare_table
+from ..config.settings import UPLOAD_SPOOL_CHUNK_BYTES, EXCEL_READ_BLOCK_ROWS
+from .ingest_pipeline import merge_stage_timings, prepare_table
+
+
+class UploadTooLargeError(ValueError):
+    """Upload excedeu o limite de bytes configurado."""
 
 
 def download_file_bytes(drive_service: Any, file_id: str) -> bytes:
@@ -61,14 +72,7 @@ def load_excel_tables(drive_service: Any, file_meta: Dict[str, Any]) -> List[Dic
         Lista de dicts, cada um contendo uma aba processada do Excel
     """
     content = download_file_bytes(drive_service, file_meta['id'])
-    workbook = pd.read_excel(io.BytesIO(content), sheet_name=None)
-    tables: List[Dict[str, Any]] = []
-    
-    for sheet_name, df in workbook.items():
-        table_name = f"{file_meta['name']} - {sheet_name}"
-        tables.append(prepare_table(table_name, df))
-    
-    return tables
+    return load_workbook_tables(content, file_meta['name'])
 
 
 def load_local_csv(file_path: str, table_name: str = None) -> Dict[str, Any]:
@@ -106,17 +110,14 @@ def load_local_excel(file_path: str, sheet_name: str = None) -> List[Dict[str, A
         df = pd.read_excel(file_path, sheet_name=sheet_name)
         return [prepare_table(f"{base_name} - {sheet_name}", df)]
     
-    workbook = pd.read_excel(file_path, sheet_name=None)
-    tables: List[Dict[str, Any]] = []
-    
-    for sheet, df in workbook.items():
-        table_name = f"{base_name} - {sheet}"
-        tables.append(prepare_table(table_name, df))
-    
-    return tables
+    return load_workbook_tables(file_path, base_name)
 
 
-def load_from_bytes(file_bytes: bytes, filename: str) -> List[Dict[str, Any]]:
+def load_from_bytes(
+    file_bytes: bytes,
+    filename: str,
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
     """
     Carrega tabelas a partir de bytes de um arquivo.
     
@@ -125,6 +126,7 @@ def load_from_bytes(file_bytes: bytes, filename: str) -> List[Dict[str, Any]]:
     Args:
         file_bytes: Conteúdo do arquivo em bytes
         filename: Nome do arquivo (usado para detectar extensão)
+        known_formats: Formatos de data já detectados, por nome de tabela
     
     Returns:
         Lista de dicts contendo as tabelas processadas
@@ -136,17 +138,299 @@ def load_from_bytes(file_bytes: bytes, filename: str) -> List[Dict[str, Any]]:
     
     if ext == 'csv':
         df = pd.read_csv(io.BytesIO(file_bytes))
-        return [prepare_table(filename, df)]
+        return [prepare_table(filename, df, (known_formats or {}).get(filename))]
     
     elif ext in ('xlsx', 'xls'):
-        workbook = pd.read_excel(io.BytesIO(file_bytes), sheet_name=None)
-        tables: List[Dict[str, Any]] = []
-        
-        for sheet_name, df in workbook.items():
-            table_name = f"{filename} - {sheet_name}"
-            tables.append(prepare_table(table_name, df))
-        
-        return tables
+        return load_workbook_tables(file_bytes, filename, known_formats=known_formats)
     
     else:
         raise ValueError(f"Formato de arquivo não suportado: .{ext}")
+
+
+def spool_to_tempfile(
+    stream: BinaryIO,
+    suffix: str = '',
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_SPOOL_CHUNK_BYTES
+) -> Tuple[str, str, int]:
+    """
+    Copia um stream para um arquivo temporário em blocos, calculando o hash no caminho.
+
+    Apenas um bloco fica em memória por vez, independentemente do tamanho do arquivo.
+
+    Args:
+        stream: Stream de origem (ex.: FileStorage.stream do Flask)
+        suffix: Sufixo do arquivo temporário (ex.: '.csv')
+        max_bytes: Limite de bytes; excedido, o arquivo é apagado e o erro levantado
+        chunk_size: Tamanho de cada bloco lido
+
+    Returns:
+        Tuple[caminho do arquivo, hash SHA-256 hexadecimal, total de bytes]
+
+    Raises:
+        UploadTooLargeError: Se o stream ultrapassar max_bytes
+    """
+    digest = hashlib.sha256()
+    total = 0
+    fd, path = tempfile.mkstemp(prefix='alphabot_upload_', suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if max_bytes is not None and total > max_bytes:
+                    raise UploadTooLargeError(f"Arquivo excede o limite de {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                fh.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), total
+
+
+def load_from_path(
+    file_path: str,
+    filename: str,
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Carrega tabelas a partir de um arquivo em disco (ex.: upload já gravado em temporário).
+
+    Detecta automaticamente o tipo (CSV ou Excel) pela extensão do filename.
+
+    Args:
+        file_path: Caminho do arquivo em disco
+        filename: Nome original do arquivo (usado para extensão e nome das tabelas)
+        known_formats: Formatos de data já detectados, por nome de tabela
+
+    Returns:
+        Lista de dicts contendo as tabelas processadas
+
+    Raises:
+        ValueError: Se o formato do arquivo não for suportado
+    """
+    ext = filename.lower().split('.')[-1]
+
+    if ext == 'csv':
+        df = pd.read_csv(file_path)
+        return [prepare_table(filename, df, (known_formats or {}).get(filename))]
+
+    elif ext in ('xlsx', 'xls'):
+        return load_workbook_tables(file_path, filename, known_formats=known_formats)
+
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: .{ext}")
+
+
+def list_excel_sheets(source: Union[bytes, str]) -> List[str]:
+    """
+    Lista as abas de uma planilha Excel sem carregar os dados.
+
+    Args:
+        source: Bytes do arquivo ou caminho em disco
+
+    Returns:
+        Nomes das abas, na ordem da planilha
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except Exception:
+        # .xls (formato binário antigo) não é suportado pelo openpyxl
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with pd.ExcelFile(source) as legacy_workbook:
+            return list(legacy_workbook.sheet_names)
+    try:
+        return [worksheet.title for worksheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+
+def parse_ingest_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lê e tipa um arquivo (ou uma aba de Excel) de forma independente.
+
+    Unidade de trabalho da leitura paralela: recebe e devolve apenas objetos
+    serializáveis, para poder rodar em outro processo.
+
+    Args:
+        task: Dict com 'source' (bytes ou caminho), 'filename' e 'sheet_name'
+              (None lê o arquivo inteiro); 'known_formats' opcional com os
+              formatos de data já detectados, por nome de tabela
+
+    Returns:
+        Dict com 'tables' (tabelas processadas), 'seconds' (tempo total) e
+        'stage_seconds' (tempo por etapa do pipeline de ingestão)
+    """
+    started = time.perf_counter()
+    source = task['source']
+    filename = task['filename']
+    sheet_name = task.get('sheet_name')
+    known_formats = task.get('known_formats')
+
+    if sheet_name is None:
+        if isinstance(source, (bytes, bytearray)):
+            tables = load_from_bytes(source, filename, known_formats)
+        else:
+            tables = load_from_path(source, filename, known_formats)
+    else:
+        tables = load_workbook_tables(source, filename, sheet_names=[sheet_name], known_formats=known_formats)
+
+    seconds = time.perf_counter() - started
+    # O que não foi gasto nas etapas de prepare_table é leitura do arquivo
+    stage_seconds = merge_stage_timings(*(table['stage_seconds'] for table in tables))
+    stage_seconds = {'parse': round(max(seconds - sum(stage_seconds.values()), 0.0), 3), **stage_seconds}
+    return {'tables': tables, 'seconds': seconds, 'stage_seconds': stage_seconds}
+
+
+def _excel_column_names(header: Tuple[Any, ...], width: int) -> List[str]:
+    """Monta os nomes das colunas a partir do cabeçalho, no padrão do pandas."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for position in range(width):
+        value = header[position] if position < len(header) else None
+        if value is None or (isinstance(value, str) and not value.strip()):
+            name = f"Unnamed: {position}"
+        elif isinstance(value, float) and value.is_integer():
+            name = str(int(value))
+        else:
+            name = str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _read_worksheet_streaming(worksheet: Any, block_rows: int = EXCEL_READ_BLOCK_ROWS) -> Optional[pd.DataFrame]:
+    """
+    Lê uma aba linha a linha, convertendo blocos de linhas em colunas tipadas.
+
+    Apenas os valores das células de um bloco ficam em memória como objetos
+    Python (nada do modelo de objetos do openpyxl). Linhas totalmente vazias
+    são ignoradas e o cabeçalho é a primeira linha com algum valor.
+
+    Returns:
+        DataFrame da aba, ou None se a aba não tiver cabeçalho e dados
+    """
+    header: Optional[Tuple[Any, ...]] = None
+    block: List[Tuple[Any, ...]] = []
+    frames: List[pd.DataFrame] = []
+
+    for row in worksheet.iter_rows(values_only=True):
+        if all(value is None for value in row):
+            continue
+        if header is None:
+            header = row
+            continue
+        block.append(row)
+        if len(block) >= block_rows:
+            frames.append(pd.DataFrame.from_records(block))
+            block = []
+    if block:
+        frames.append(pd.DataFrame.from_records(block))
+
+    if header is None or not frames:
+        return None
+
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True).infer_objects()
+
+    # Colunas além do cabeçalho só são mantidas se tiverem algum valor
+    header_width = len(header)
+    while header_width and (header[header_width - 1] is None or header[header_width - 1] == ''):
+        header_width -= 1
+    width = df.shape[1]
+    while width > header_width and df[width - 1].isna().all():
+        width -= 1
+    df = df.iloc[:, :width]
+    df.columns = _excel_column_names(header, width)
+
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object:
+            # Células vazias como NaN (e não None), como no pd.read_excel
+            if series.isna().all():
+                df[column] = np.nan
+            elif series.isna().any():
+                df[column] = series.where(series.notna(), np.nan)
+        elif series.dtype.kind == 'f' and not series.isna().any() and (series % 1 == 0).all():
+            # O Excel guarda inteiros como float; o pd.read_excel devolve int64
+            df[column] = series.astype('int64')
+
+    return df
+
+
+def read_excel_streaming(
+    source: Union[bytes, str, BinaryIO],
+    sheet_names: Optional[List[str]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Lê as abas de uma planilha .xlsx em modo streaming (openpyxl read_only).
+
+    Cada aba é lida linha a linha e convertida em colunas tipadas pelo pandas;
+    abas vazias (sem cabeçalho ou sem linhas de dados) e abas de gráfico são
+    ignoradas sem gerar DataFrame. Arquivos .xls, que o openpyxl não lê,
+    caem no pd.read_excel.
+
+    Args:
+        source: Bytes do arquivo, caminho em disco ou stream binário
+        sheet_names: Abas a ler (None lê todas)
+
+    Returns:
+        Dict {nome da aba: DataFrame}, na ordem da planilha
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except Exception:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        legacy = pd.read_excel(source, sheet_name=sheet_names)
+        return {name: df for name, df in legacy.items() if not df.dropna(how='all').empty}
+
+    try:
+        frames: Dict[str, pd.DataFrame] = {}
+        for worksheet in workbook.worksheets:
+            if sheet_names is not None and worksheet.title not in sheet_names:
+                continue
+            df = _read_worksheet_streaming(worksheet)
+            if df is not None:
+                frames[worksheet.title] = df
+        return frames
+    finally:
+        workbook.close()
+
+
+def load_workbook_tables(
+    source: Union[bytes, str, BinaryIO],
+    base_name: str,
+    sheet_names: Optional[List[str]] = None,
+    known_formats: Optional[Dict[str, Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Carrega as abas não vazias de uma planilha como tabelas processadas.
+
+    Args:
+        source: Bytes do arquivo, caminho em disco ou stream binário
+        base_name: Prefixo do nome das tabelas ("<base_name> - <aba>")
+        sheet_names: Abas a ler (None lê todas)
+        known_formats: Formatos de data já detectados, por nome de tabela
+
+    Returns:
+        Lista de dicts contendo as abas processadas
+    """
+    workbook = read_excel_streaming(source, sheet_names=sheet_names)
+    known_formats = known_formats or {}
+    tables = []
+    for sheet_name, df in workbook.items():
+        table_name = f"{base_name} - {sheet_name}"
+        tables.append(prepare_table(table_name, df, known_formats.get(table_name)))
+    return tables
@@ -0,0 +1,370 @@
+"""
+Filter Compiler Module
+Filtros dos comandos de análise compilados em buscas por índice ou predicados, avaliados do mais seletivo ao menos seletivo
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .secondary_indexes import INDEX_KIND_DATETIME, get_secondary_index, index_lookup, index_range
+
+
+# Acima deste número de valores distintos a seletividade supõe distribuição uniforme
+STATS_MAX_DISTINCT = 10_000
+
+# Seletividade suposta para intervalos de datas sem índice
+DATE_WINDOW_DEFAULT_SELECTIVITY = 0.5
+
+# Mês de um ano (ex: "2024-12")
+YEAR_MONTH_PATTERN = re.compile(r'^\d{4}-\d{1,2}$')
+
+# Unidades do filtro relativo {"last": N, "unit": ...}
+RELATIVE_UNITS = {
+    'day': 'days', 'days': 'days', 'dia': 'days', 'dias': 'days',
+    'week': 'weeks', 'weeks': 'weeks', 'semana': 'weeks', 'semanas': 'weeks',
+    'month': 'months', 'months': 'months', 'mes': 'months', 'mês': 'months', 'meses': 'months',
+    'year': 'years', 'years': 'years', 'ano': 'years', 'anos': 'years',
+}
+
+
+def is_text_filter_column(series: pd.Series) -> bool:
+    """Colunas de texto (não datetime) recebem comparação sem diferenciar maiúsculas e acentos."""
+    dtype = series.dtype
+    is_text = pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype)
+    return is_text and not pd.api.types.is_datetime64_any_dtype(dtype)
+
+
+def _frequencies(counts: pd.Series, total: int) -> Optional[Dict[Any, float]]:
+    """Fração de linhas por valor, ou None se houver valores distintos demais."""
+    if total == 0 or len(counts) > STATS_MAX_DISTINCT:
+        return None
+    return {key: float(count) / total for key, count in counts.items()}
+
+
+def column_stats(table: Dict[str, Any], column: str) -> Dict[str, Any]:
+    """
+    Estatísticas de uma coluna usadas para estimar a seletividade dos filtros.
+
+    Calculadas na primeira consulta que filtra a coluna e guardadas em
+    table['column_stats'] (a tabela consolidada é refeita a cada ingestão).
+
+    Colunas com índice secundário não precisam delas (a seletividade é exata).
+
+    - data: frações por mês, ano e trimestre e número de dias distintos
+    - demais: fração de linhas por valor
+
+    Args:
+        table: Dict da tabela (com 'df')
+        column: Nome da coluna
+
+    Returns:
+        Dict com 'rows', 'distinct' e as frações do tipo da coluna
+    """
+    cache = table.setdefault('column_stats', {})
+    if column in cache:
+        return cache[column]
+
+    series = table['df'][column]
+    total = int(len(series))
+    stats: Dict[str, Any] = {'rows': total}
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        stats['distinct'] = int(series.dt.normalize().nunique())
+        for part in ('month', 'year', 'quarter'):
+            counts = getattr(series.dt, part).value_counts()
+            stats[part] = _frequencies(counts, total)
+    else:
+        counts = series.value_counts()
+        stats['distinct'] = int(len(counts))
+        stats['values'] = _frequencies(counts, total)
+
+    cache[column] = stats
+    return stats
+
+
+def _selectivity(stats: Dict[str, Any], key: str, values: List[Any]) -> float:
+    """Fração estimada de linhas que passam em um filtro de igualdade/pertinência."""
+    frequencies = stats.get(key)
+    if frequencies is None:
+        distinct = stats.get('distinct') or 1
+        return min(1.0, len(values) / distinct)
+    return min(1.0, sum(frequencies.get(value, 0.0) for value in dict.fromkeys(values)))
+
+
+def compile_filter(
+    series: pd.Series,
+    value: Any,
+    stats: Dict[str, Any],
+    index: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Traduz um filtro {coluna: valor} em uma busca no índice ou em um predicado.
+
+    Regras (as mesmas do DriveBot desde a v11.0):
+    - texto: igualdade ou lista, sem diferenciar maiúsculas nem acentos
+      (busca no índice da sombra normalizada; nulos nunca casam)
+    - data: número 1-12 = mês, 1900-2100 = ano, lista = meses,
+      'Q1'..'Q4' = trimestre, 'AAAA-MM' = mês do ano, objeto = intervalo
+      (ver _compile_date_window), outro valor = data exata (ignora a hora).
+      Ano, mês do ano, intervalos e data exata são buscas binárias no índice
+      de datas; mês, meses e trimestre varrem a coluna
+    - demais colunas: igualdade (pelo índice nas colunas inteiras)
+
+    Args:
+        series: Coluna filtrada
+        value: Valor do filtro
+        stats: Estatísticas da coluna (ver column_stats; vazio com índice)
+        index: Índice secundário da coluna (ver secondary_indexes), obrigatório para texto
+
+    Returns:
+        Dict com 'kind', 'selectivity' e 'positions' (linhas encontradas no
+        índice, seletividade exata) ou 'predicate' (coluna -> máscara),
+        ou None se o valor não se aplicar à coluna
+    """
+    if is_text_filter_column(series):
+        positions = index_lookup(index, value if isinstance(value, list) else [value])
+        return {
+            'kind': 'text_in' if isinstance(value, list) else 'text_equals',
+            'positions': positions,
+            'index_kind': index['kind'],
+            'selectivity': len(positions) / max(index['rows'], 1),
+        }
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if isinstance(value, dict):
+            return _compile_date_window(series, value, index)
+        if isinstance(value, (int, str)) and str(value).isdigit():
+            number = int(value)
+            if 1 <= number <= 12:
+                return {
+                    'kind': 'month',
+                    'predicate': lambda s: s.dt.month == number,
+                    'selectivity': _selectivity(stats, 'month', [number]),
+                }
+            if 1900 < number < 2100:
+                year_start = pd.Timestamp(year=number, month=1, day=1)
+                return _date_range_step(
+                    'year', index, year_start, year_start + pd.DateOffset(years=1),
+                    lambda s: s.dt.year == number, _selectivity(stats, 'year', [number])
+                )
+        elif isinstance(value, list):
+            months = [int(v) for v in value if isinstance(v, (int, str)) and str(v).isdigit()]
+            if not months:
+                return None
+            return {
+                'kind': 'months',
+                'predicate': lambda s: s.dt.month.isin(months),
+                'selectivity': _selectivity(stats, 'month', months),
+            }
+        elif isinstance(value, str) and value.upper().startswith('Q'):
+            quarter = int(value[1])
+            return {
+                'kind': 'quarter',
+                'predicate': lambda s: s.dt.quarter == quarter,
+                'selectivity': _selectivity(stats, 'quarter', [quarter]),
+            }
+        elif isinstance(value, str) and YEAR_MONTH_PATTERN.match(value.strip()):
+            month_start = pd.Timestamp(f"{value.strip()}-01")
+            month_end = month_start + pd.DateOffset(months=1)
+            return _date_range_step(
+                'year_month', index, month_start, month_end,
+                lambda s: (s >= month_start) & (s < month_end), DATE_WINDOW_DEFAULT_SELECTIVITY
+            )
+
+        filter_date = pd.to_datetime(value, errors='coerce')
+        if pd.isna(filter_date):
+            return None
+        day = filter_date.normalize()
+        return _date_range_step(
+            'date', index, day, day + pd.Timedelta(days=1),
+            lambda s: s.dt.normalize() == day, 1.0 / max(stats.get('distinct') or 1, 1)
+        )
+
+    if index is not None:
+        positions = index_lookup(index, [value])
+        return {
+            'kind': 'equals',
+            'positions': positions,
+            'index_kind': index['kind'],
+            'selectivity': len(positions) / max(index['rows'], 1),
+        }
+
+    return {
+        'kind': 'equals',
+        'predicate': lambda s: s == value,
+        'selectivity': _selectivity(stats, 'values', [value]),
+    }
+
+
+def _date_range_step(
+    kind: str,
+    index: Optional[Dict[str, Any]],
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp],
+    predicate: Callable[[pd.Series], Any],
+    selectivity: float
+) -> Dict[str, Any]:
+    """
+    Filtro de datas em [start, end): busca binária no índice de datas ou,
+    sem índice (ex: colunas com fuso horário), o predicado equivalente.
+    """
+    if index is not None:
+        positions = index_range(index, start, end)
+        return {
+            'kind': kind,
+            'positions': positions,
+            'index_kind': index['kind'],
+            'selectivity': len(positions) / max(index['rows'], 1),
+        }
+    return {'kind': kind, 'predicate': predicate, 'selectivity': selectivity}
+
+
+def _compile_date_window(series: pd.Series, value: Dict[str, Any], index: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Intervalos de datas escritos como objeto:
+
+    - {"start": "2024-03-01", "end": "2024-05-15"}: intervalo com fim
+      inclusivo (datas sem hora incluem o dia inteiro); start ou end podem faltar
+    - {"last": 30, "unit": "days"}: os últimos N dias/semanas/meses/anos até a
+      data mais recente da coluna (os dados são históricos, não "até hoje")
+
+    Returns:
+        Passo compilado (ver _date_range_step), ou None se o objeto não
+        descrever um intervalo válido
+    """
+    if 'last' in value:
+        unit = RELATIVE_UNITS.get(str(value.get('unit', 'days')).strip().lower())
+        amount = int(value['last'])
+        if unit is None or amount <= 0:
+            return None
+        if index is not None:
+            latest = pd.Timestamp(int(index['sorted'][-1])) if len(index['sorted']) else pd.NaT
+        else:
+            latest = series.max()
+        if pd.isna(latest):
+            return None
+        end = latest.normalize() + pd.Timedelta(days=1)
+        if unit in ('days', 'weeks'):
+            start = end - pd.Timedelta(**{unit: amount})
+        else:
+            start = end - pd.DateOffset(**{unit: amount})
+        kind = 'relative'
+    else:
+        start = pd.to_datetime(value.get('start'), errors='coerce') if value.get('start') is not None else None
+        end = pd.to_datetime(value.get('end'), errors='coerce') if value.get('end') is not None else None
+        if start is not None and pd.isna(start):
+            return None
+        if end is not None:
+            if pd.isna(end):
+                return None
+            # Fim inclusivo: uma data sem hora inclui o dia inteiro
+            end = end + (pd.Timedelta(days=1) if end == end.normalize() else pd.Timedelta(1, unit='ns'))
+        if start is None and end is None:
+            return None
+        kind = 'date_range'
+
+    def predicate(s: pd.Series) -> pd.Series:
+        mask = s.notna()
+        if start is not None:
+            mask &= s >= start
+        if end is not None:
+            mask &= s < end
+        return mask
+
+    return _date_range_step(kind, index, start, end, predicate, DATE_WINDOW_DEFAULT_SELECTIVITY)
+
+
+def _evaluate(predicate: Callable[[Any], Any], source: Any) -> np.ndarray:
+    """Aplica o predicado e devolve um array booleano (nulos = False)."""
+    result = predicate(source)
+    if isinstance(result, pd.Series):
+        return result.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(result, dtype=bool)
+
+
+def apply_filters(table: Dict[str, Any], filters: Dict[str, Any]) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Aplica os filtros de um comando à tabela com uma única seleção de linhas.
+
+    Os filtros são compilados, ordenados pela seletividade (o mais restritivo
+    primeiro) e reduzem um conjunto de posições de linhas. Filtros com índice
+    secundário leem só as linhas encontradas e são intersectados com o
+    conjunto; os demais avaliam o predicado apenas nas linhas que restam. Se
+    nenhuma linha restar, os filtros seguintes não são avaliados.
+
+    Args:
+        table: Dict da tabela (com 'df')
+        filters: Filtros do comando {coluna: valor}
+
+    Returns:
+        Tupla (DataFrame filtrado, plano). O plano tem um item por filtro com
+        column, kind, access ('index' ou 'scan'), estimated_selectivity,
+        rows_after e status ('applied', 'skipped' ou 'ignored')
+    """
+    df = table['df']
+    total = len(df)
+    steps: List[Dict[str, Any]] = []
+    plan: List[Dict[str, Any]] = []
+
+    for column, value in (filters or {}).items():
+        if column not in df.columns:
+            plan.append({'column': column, 'kind': None, 'status': 'ignored', 'reason': 'coluna inexistente'})
+            continue
+        try:
+            series = df[column]
+            index = get_secondary_index(table, column, text=is_text_filter_column(series))
+            # Índices de valores dão a seletividade exata; datas ainda usam as
+            # estatísticas nos filtros por mês/trimestre (varredura)
+            needs_stats = index is None or index['kind'] == INDEX_KIND_DATETIME
+            stats = column_stats(table, column) if needs_stats else {}
+            step = compile_filter(series, value, stats, index)
+        except Exception as e:
+            print(f"[DriveBot] Falha ao compilar filtro para coluna '{column}' com valor '{value}': {e}")
+            step = None
+        if step is None:
+            plan.append({'column': column, 'kind': None, 'status': 'ignored', 'reason': 'valor não aplicável'})
+            continue
+        step['column'] = column
+        steps.append(step)
+
+    # Mais seletivo primeiro; empates mantêm a ordem do comando
+    steps.sort(key=lambda step: step['selectivity'])
+
+    # None = todas as linhas; senão, posições (crescentes) das linhas que passaram
+    rows: Optional[np.ndarray] = None
+    for step in steps:
+        entry = {
+            'column': step['column'],
+            'kind': step['kind'],
+            'access': 'index' if 'positions' in step else 'scan',
+            'estimated_selectivity': round(step['selectivity'], 4),
+        }
+        if 'index_kind' in step:
+            entry['index_kind'] = step['index_kind']
+        plan.append(entry)
+
+        if rows is not None and len(rows) == 0:
+            entry.update({'status': 'skipped', 'rows_after': 0})
+            continue
+
+        if 'positions' in step:
+            positions = step['positions']
+            rows = positions if rows is None else np.intersect1d(rows, positions, assume_unique=True)
+        else:
+            series = df[step['column']]
+            try:
+                if rows is None:
+                    rows = np.flatnonzero(_evaluate(step['predicate'], series))
+                else:
+                    rows = rows[_evaluate(step['predicate'], series.take(rows))]
+            except Exception as e:
+                print(f"[DriveBot] Falha no filtro para coluna '{step['column']}': {e}")
+                entry.update({'status': 'ignored', 'rows_after': total if rows is None else int(len(rows))})
+                continue
+        entry.update({'status': 'applied', 'rows_after': int(len(rows))})
+
+    if rows is None or len(rows) == total:
+        return df, plan
+    return df.take(rows), plan
@@ -0,0 +1,277 @@
+"""
+Inference Cache Module
+Cache persistente (SQLite) das decisões de tipo por coluna, reaproveitado entre uploads
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+import pandas as pd
+
+from ..config.settings import INFERENCE_CACHE_MAX_ENTRIES, INFERENCE_CACHE_PATH
+from .type_inference import sample_column
+
+
+# Tipos de decisão armazenados
+DECISION_DATETIME = 'datetime'  # Acompanha 'format' (aceito por parse_dates)
+DECISION_NUMERIC = 'numeric'
+DECISION_TEXT = 'text'
+
+# Formatos distintos considerados na assinatura (colunas de texto livre têm muitos)
+SIGNATURE_MAX_SHAPES = 32
+
+_DIGITS_PATTERN = r'\d+'
+_LETTERS_PATTERN = r'[^\W\d_]+'
+
+
+def value_shapes(series: pd.Series) -> list:
+    """
+    Formato dos valores de uma amostra: dígitos viram '9' e letras viram 'a'.
+
+    "1.234,56" e "98.765,43" têm o formato "9.9,9"; "05/01/2024" vira
+    "9/9/9". Arquivos mensais com o mesmo layout geram os mesmos formatos.
+
+    Args:
+        series: Valores da coluna (amostra)
+
+    Returns:
+        Lista ordenada dos formatos distintos (no máximo SIGNATURE_MAX_SHAPES)
+    """
+    text = series.dropna().astype(str).str.strip()
+    text = text[text != '']
+    shapes = (
+        text.str.replace(_DIGITS_PATTERN, '9', regex=True)
+        .str.replace(_LETTERS_PATTERN, 'a', regex=True)
+        .unique()
+    )
+    return sorted(shapes)[:SIGNATURE_MAX_SHAPES]
+
+
+def column_signature(series: pd.Series, column_name: Any, sample: Optional[pd.Series] = None) -> str:
+    """
+    Assinatura de uma coluna: nome, tipo lido e formatos dos valores amostrados.
+
+    Args:
+        series: Coluna original (antes da conversão)
+        column_name: Nome da coluna
+        sample: Amostra já extraída com sample_column (None extrai de novo)
+
+    Returns:
+        Hash hexadecimal da assinatura
+    """
+    if sample is None:
+        sample = sample_column(series)
+    shapes = value_shapes(series if sample is None else sample)
+    digest = hashlib.sha1()
+    digest.update(str(column_name).strip().lower().encode())
+    digest.update(b'\x1f' + series.dtype.kind.encode())
+    for shape in shapes:
+        digest.update(b'\x1f' + shape.encode())
+    return digest.hexdigest()
+
+
+class InferenceCache:
+    """
+    Decisões de tipo (data com formato, número, texto) indexadas pela
+    assinatura da coluna e gravadas em SQLite.
+
+    O arquivo é compartilhado pelo processo web e pelos workers do
+    ingest_pool (cada processo abre as próprias conexões). Falhas do banco
+    nunca interrompem a ingestão: a coluna apenas é detectada de novo.
+    """
+
+    def __init__(self, path: Optional[str] = INFERENCE_CACHE_PATH, max_entries: int = INFERENCE_CACHE_MAX_ENTRIES):
+        """
+        Inicializa o cache.
+
+        Args:
+            path: Arquivo SQLite (vazio/None desativa o cache)
+            max_entries: Máximo de assinaturas guardadas (as usadas há mais tempo saem primeiro)
+        """
+        self.path = path or None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'invalidations': 0,
+            'errors': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS column_decisions (
+                    signature TEXT PRIMARY KEY,
+                    column_name TEXT,
+                    decision TEXT NOT NULL,
+                    hits INTEGER DEFAULT 0,
+                    last_used_at TEXT
+                )
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def lookup(self, signatures: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca as decisões de várias colunas em uma única consulta.
+
+        Args:
+            signatures: Assinaturas (ver column_signature)
+
+        Returns:
+            Dict {assinatura: decisão} apenas com as encontradas
+        """
+        signatures = list(dict.fromkeys(signatures))
+        if not self.enabled or not signatures:
+            return {}
+
+        placeholders = ','.join('?' * len(signatures))
+        now = datetime.now().isoformat()
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    rows = conn.execute(
+                        f"SELECT signature, decision FROM column_decisions WHERE signature IN ({placeholders})",
+                        signatures
+                    ).fetchall()
+                    if rows:
+                        conn.executemany(
+                            "UPDATE column_decisions SET hits = hits + 1, last_used_at = ? WHERE signature = ?",
+                            [(now, signature) for signature, _ in rows]
+                        )
+                        conn.commit()
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            self._stats['errors'] += 1
+            print(f"⚠️ Cache de inferência indisponível: {e}")
+            return {}
+
+        found = {signature: json.loads(decision) for signature, decision in rows}
+        self._stats['hits'] += len(found)
+        self._stats['misses'] += len(signatures) - len(found)
+        return found
+
+    def store(self, decisions: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Grava (ou substitui) decisões e remove as excedentes a max_entries.
+
+        Args:
+            decisions: Dict {assinatura: {'kind': ..., 'column': ..., ...}}
+        """
+        if not self.enabled or not decisions:
+            return
+
+        now = datetime.now().isoformat()
+        rows = [
+            (signature, str(decision.get('column', '')), json.dumps(decision, ensure_ascii=False), now)
+            for signature, decision in decisions.items()
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO column_decisions (signature, column_name, decision, hits, last_used_at) "
+                        "VALUES (?, ?, ?, 0, ?)",
+                        rows
+                    )
+                    conn.execute(
+                        "DELETE FROM column_decisions WHERE signature NOT IN ("
+                        "SELECT signature FROM column_decisions ORDER BY last_used_at DESC, hits DESC LIMIT ?)",
+                        (self.max_entries,)
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            self._stats['errors'] += 1
+            print(f"⚠️ Falha ao gravar cache de inferência: {e}")
+            return
+
+        self._stats['stores'] += len(rows)
+
+    def invalidate(self, signature: str) -> None:
+        """
+        Remove uma decisão que não passou na validação da amostra.
+
+        Args:
+            signature: Assinatura da coluna
+        """
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    conn.execute("DELETE FROM column_decisions WHERE signature = ?", (signature,))
+                    conn.commit()
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            self._stats['errors'] += 1
+            print(f"⚠️ Falha ao invalidar cache de inferência: {e}")
+            return
+
+        self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores deste processo e o total de decisões gravadas.
+
+        Returns:
+            Dict com hits, misses, hit_rate, stores, invalidations e entries
+        """
+        entries = 0
+        if self.enabled:
+            try:
+                with self._lock:
+                    conn = self._connect()
+                    try:
+                        entries = conn.execute("SELECT COUNT(*) FROM column_decisions").fetchone()[0]
+                    finally:
+                        conn.close()
+            except sqlite3.Error:
+                entries = 0
+
+        total_requests = self._stats['hits'] + self._stats['misses']
+        hit_rate = (self._stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+        return {
+            **self._stats,
+            'hit_rate': round(hit_rate, 2),
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'enabled': self.enabled,
+        }
+
+
+# Instância compartilhada pelo processo (cada worker abre o mesmo arquivo)
+_inference_cache: Optional[InferenceCache] = None
+
+
+def get_inference_cache() -> InferenceCache:
+    """
+    Retorna a instância de InferenceCache do processo.
+
+    Returns:
+        Instância compartilhada do InferenceCache
+    """
+    global _inference_cache
+    if _inference_cache is None:
+        _inference_cache = InferenceCache()
+    return _inference_cache
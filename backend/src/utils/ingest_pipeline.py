@@ -0,0 +1,617 @@
+"""
+Ingest Pipeline Module
+Pipeline único de ingestão usado por AlphaBot e DriveBot, em etapas explícitas:
+
+- parse: leitura do arquivo (ver file_handlers.parse_ingest_task)
+- infer: detecção do tipo de cada coluna
+- coerce: colunas gravadas já convertidas no DataFrame
+- derive: colunas auxiliares de data (virtuais) e receita derivada
+- consolidate: tabelas de uma fonte juntas em uma tabela consultável (ver consolidate_tables)
+- profile: métricas do dataset final
+
+O tempo de cada etapa é somado em um dict {etapa: segundos} (ver stage_timer).
+"""
+
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from .data_processors import (
+    coerce_numeric_series,
+    detect_numeric_columns,
+    detect_text_columns,
+    sniff_datetime_columns,
+)
+from .data_processor import build_dataset_profile, build_revenue_rollup, find_revenue_column
+from .date_formats import FORMAT_EXCEL_SERIAL, is_excel_serial_column, parse_date_column, parse_dates
+from .filter_compiler import is_text_filter_column
+from .inference_cache import (
+    DECISION_DATETIME,
+    DECISION_NUMERIC,
+    DECISION_TEXT,
+    column_signature,
+    get_inference_cache,
+)
+from .secondary_indexes import build_datetime_index, is_datetime_indexable
+from .text_shadows import build_text_shadows
+from .type_inference import TYPE_MATCH_THRESHOLD, decide_from_sample, sample_column
+from .virtual_columns import virtual_temporal_columns
+
+
+# Colunas financeiras (convertidas para número e com vazios preenchidos com 0)
+FINANCIAL_KEYWORDS = [
+    'quantidade', 'receita', 'valor', 'preco', 'faturamento',
+    'total', 'vendas', 'custo', 'lucro', 'margem', 'desconto'
+]
+# Financeiras convertidas mesmo com menor taxa de sucesso
+FORCED_FINANCIAL_KEYWORDS = ['receita', 'valor', 'preco', 'faturamento']
+# Identificadores e textos que nunca viram número (exceto se também forem financeiros)
+IDENTIFIER_KEYWORDS = [
+    'nome', 'produto', 'categoria', 'cliente', 'regiao', 'cidade', 'estado',
+    'uf', 'loja', 'filial', 'grupo', 'setor', 'descricao', 'id', 'codigo', 'transacao'
+]
+
+# Fração mínima de valores convertidos para a coluna ser gravada já tipada no DataFrame
+NUMERIC_COERCE_MIN_RATIO = 0.8
+FORCED_FINANCIAL_COERCE_MIN_RATIO = 0.3
+DATETIME_COERCE_MIN_RATIO = 0.5
+# Datas fora desta faixa (ex: epoch 1970 vindo de células vazias/zeradas, anos digitados errado) viram NaT
+DATE_VALID_MIN = pd.Timestamp('1990-01-01')
+DATE_VALID_END = pd.Timestamp('2031-01-01')  # Exclusivo: até 31/12/2030, inclusive
+
+
+def _normalize_name(name: Any) -> str:
+    """Nome da coluna em minúsculas e sem acentos (para comparar com as palavras-chave)."""
+    text = str(name).lower()
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+def _clear_out_of_range_dates(parsed: pd.Series) -> Tuple[pd.Series, int]:
+    """
+    Troca por NaT as datas fora de DATE_VALID_MIN..DATE_VALID_END.
+
+    Returns:
+        Tupla (série ajustada, número de datas removidas)
+    """
+    low, high = DATE_VALID_MIN, DATE_VALID_END
+    tz = getattr(parsed.dt, 'tz', None)
+    if tz is not None:
+        low, high = low.tz_localize(tz), high.tz_localize(tz)
+    out_of_range = parsed.notna() & ((parsed < low) | (parsed >= high))
+    cleared = int(out_of_range.sum())
+    if cleared:
+        parsed = parsed.mask(out_of_range)
+    return parsed, cleared
+
+
+def _is_financial_name(column: Any) -> bool:
+    """Indica se o nome da coluna contém alguma palavra de FINANCIAL_KEYWORDS."""
+    name = _normalize_name(column)
+    return any(keyword in name for keyword in FINANCIAL_KEYWORDS)
+
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """
+    Soma em timings[stage] o tempo gasto dentro do bloco.
+
+    Args:
+        timings: Dict de tempos por etapa (segundos)
+        stage: Nome da etapa
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started)
+
+
+def merge_stage_timings(*timings: Dict[str, float]) -> Dict[str, float]:
+    """
+    Soma tempos por etapa de várias tabelas/arquivos.
+
+    Returns:
+        Dict {etapa: segundos}, na ordem em que as etapas aparecem, arredondado
+    """
+    merged: Dict[str, float] = {}
+    for item in timings:
+        for stage, seconds in item.items():
+            merged[stage] = merged.get(stage, 0.0) + seconds
+    return {stage: round(seconds, 3) for stage, seconds in merged.items()}
+
+
+def format_stage_timings(timings: Dict[str, float]) -> str:
+    """Texto de log no formato 'parse=0.12s, infer=0.30s, ...'."""
+    return ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items())
+
+
+def apply_cached_decision(
+    series: pd.Series,
+    column: Any,
+    decision: Dict[str, Any],
+    sample: Optional[pd.Series] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Valida uma decisão do cache de inferência na amostra e converte a coluna.
+
+    A amostra precisa confirmar a decisão (datas: todos os valores no formato
+    gravado; números e texto: decide_from_sample sem ambiguidade) e a coluna
+    inteira ainda precisa atingir o mesmo limiar da detecção.
+
+    Args:
+        series: Coluna original
+        column: Nome da coluna
+        decision: Decisão gravada ({'kind': ..., 'format': ...})
+        sample: Amostra já extraída com sample_column (None extrai de novo)
+
+    Returns:
+        Dict com 'kind', 'values' (série convertida) e 'format', ou None se
+        a decisão não vale para esta coluna (deve ser invalidada)
+    """
+    kind = decision.get('kind')
+    if sample is None:
+        sample = sample_column(series)
+    checked = (series if sample is None else sample).dropna()
+    min_valid = max(1, int(len(series) * TYPE_MATCH_THRESHOLD))
+
+    if kind == DECISION_DATETIME:
+        date_format = decision.get('format')
+        if not date_format:
+            return None
+        if date_format == FORMAT_EXCEL_SERIAL and (
+            _is_financial_name(column) or not is_excel_serial_column(checked, column)
+        ):
+            return None
+        # O formato precisa converter toda a amostra: datas ambíguas (DD/MM x MM/DD)
+        # passariam num limiar parcial e seriam lidas no formato errado
+        if parse_dates(checked, date_format).notna().sum() < len(checked):
+            return None
+        parsed, _formats_used = parse_date_column(series, column, date_format)
+        if parsed is None or parsed.notna().sum() < min_valid:
+            return None
+        parsed.name = column
+        return {'kind': kind, 'values': parsed, 'format': date_format}
+
+    if kind == DECISION_NUMERIC:
+        if sample is not None and not pd.api.types.is_numeric_dtype(series):
+            if decide_from_sample(int(coerce_numeric_series(sample).notna().sum()), len(sample)) is not True:
+                return None
+        coerced = coerce_numeric_series(series)
+        if coerced.notna().sum() < min_valid:
+            return None
+        return {'kind': kind, 'values': coerced, 'format': None}
+
+    if kind == DECISION_TEXT:
+        # Texto não pode ter passado a ser numérico (a amostra decide sem ambiguidade)
+        if decide_from_sample(int(coerce_numeric_series(checked).notna().sum()), len(checked)) is not False:
+            return None
+        if not detect_text_columns(series.to_frame(), []):
+            return None
+        return {'kind': kind, 'values': None, 'format': None}
+
+    return None
+
+
+def infer_column_types(
+    df: pd.DataFrame,
+    known_formats: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Etapa infer: decide o tipo de cada coluna (uma única detecção por coluna).
+
+    Colunas de data têm prioridade: seriais do Excel em colunas de data não
+    entram também como numéricas (exceto em colunas financeiras, que nunca
+    são lidas como seriais). Colunas cuja assinatura (nome + formatos
+    dos valores amostrados) já está no cache de inferência pulam a detecção
+    e vão direto para a conversão; decisões que a amostra não confirma são
+    invalidadas e a coluna é detectada de novo.
+
+    Args:
+        df: DataFrame lido (colunas ainda no tipo original)
+        known_formats: Formatos de data de uma ingestão anterior da mesma fonte
+
+    Returns:
+        Dict com numeric_columns, numeric_data, datetime_columns,
+        datetime_formats, text_columns e cached_columns
+    """
+    cache = get_inference_cache()
+    signatures: Dict[Any, str] = {}
+    cached: Dict[Any, Dict[str, Any]] = {}
+    if cache.enabled:
+        samples = {column: sample_column(df[column]) for column in df.columns}
+        signatures = {column: column_signature(df[column], column, samples[column]) for column in df.columns}
+        decisions = cache.lookup(signatures.values())
+        for column, signature in signatures.items():
+            decision = decisions.get(signature)
+            if decision is None:
+                continue
+            applied = apply_cached_decision(df[column], column, decision, samples[column])
+            if applied is None:
+                cache.invalidate(signature)
+            else:
+                cached[column] = applied
+
+    pending = df[[column for column in df.columns if column not in cached]]
+    numeric_columns, numeric_data = detect_numeric_columns(pending)
+    datetime_columns, datetime_formats = sniff_datetime_columns(pending, known_formats)
+
+    # Seriais do Excel nunca vencem colunas financeiras (ex.: "Receita_Dia" entre 20000 e 80000)
+    for column in [c for c, fmt in datetime_formats.items() if fmt == FORMAT_EXCEL_SERIAL and _is_financial_name(c)]:
+        del datetime_columns[column]
+        del datetime_formats[column]
+
+    numeric_columns = [column for column in numeric_columns if column not in datetime_columns]
+    text_columns = [
+        column for column in detect_text_columns(pending, numeric_columns)
+        if column not in datetime_columns
+    ]
+
+    if signatures:
+        new_decisions: Dict[str, Dict[str, Any]] = {}
+        for column in pending.columns:
+            if column in datetime_columns:
+                decision = {'kind': DECISION_DATETIME, 'format': datetime_formats[column]}
+            elif column in numeric_columns:
+                decision = {'kind': DECISION_NUMERIC}
+            elif column in text_columns:
+                decision = {'kind': DECISION_TEXT}
+            else:
+                continue
+            new_decisions[signatures[column]] = {**decision, 'column': str(column)}
+        cache.store(new_decisions)
+
+    # Junta colunas do cache e detectadas, na ordem original do DataFrame
+    for column, applied in cached.items():
+        if applied['kind'] == DECISION_DATETIME:
+            datetime_columns[column] = applied['values']
+            datetime_formats[column] = applied['format']
+        elif applied['kind'] == DECISION_NUMERIC:
+            numeric_data[column] = applied['values']
+    kinds = {column: applied['kind'] for column, applied in cached.items()}
+    numeric_set = set(numeric_columns)
+    text_set = set(text_columns)
+    columns = list(df.columns)
+
+    numeric_columns = [c for c in columns if c in numeric_set or kinds.get(c) == DECISION_NUMERIC]
+    text_columns = [c for c in columns if c in text_set or kinds.get(c) == DECISION_TEXT]
+    datetime_columns = {c: datetime_columns[c] for c in columns if c in datetime_columns}
+    datetime_formats = {c: datetime_formats[c] for c in datetime_columns}
+
+    return {
+        'numeric_columns': numeric_columns,
+        'numeric_data': {column: numeric_data[column] for column in numeric_columns},
+        'datetime_columns': datetime_columns,
+        'datetime_formats': datetime_formats,
+        'text_columns': text_columns,
+        'cached_columns': list(cached),
+    }
+
+
+def coerce_columns(df: pd.DataFrame, column_types: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Etapa coerce: grava no DataFrame as colunas convertidas na etapa infer.
+
+    - Datas com ao menos DATETIME_COERCE_MIN_RATIO de valores válidos viram datetime64;
+      abaixo disso a coluna continua texto e sai de datetime_columns. Datas fora de
+      1990-2030 (ex: epoch 1970) viram NaT
+    - Numéricas viram número com NUMERIC_COERCE_MIN_RATIO de valores válidos
+      (FORCED_FINANCIAL_COERCE_MIN_RATIO para receita/valor/preço/faturamento);
+      identificadores (ID, código, produto...) ficam como texto
+    - Financeiras têm os vazios preenchidos com 0
+
+    Depois desta etapa o DataFrame é a única cópia dos dados: as colunas
+    de datetime_columns são as do próprio DataFrame.
+
+    Args:
+        df: DataFrame a ser alterado (no lugar)
+        column_types: Resultado de infer_column_types (atualizado no lugar)
+
+    Returns:
+        Dict por coluna convertida com tipo, dtypes e taxa de conversão
+    """
+    columns_processed: Dict[str, Dict[str, Any]] = {}
+    total = len(df)
+    if total == 0:
+        return columns_processed
+
+    for column, parsed in list(column_types['datetime_columns'].items()):
+        valid = int(parsed.notna().sum())
+        if valid / total < DATETIME_COERCE_MIN_RATIO:
+            del column_types['datetime_columns'][column]
+            column_types['datetime_formats'].pop(column, None)
+            column_types['text_columns'].append(column)
+            continue
+        parsed, out_of_range = _clear_out_of_range_dates(parsed)
+        if out_of_range:
+            print(f"[Ingest] ⚠️ '{column}': {out_of_range} datas fora de 1990-2030 removidas (epoch/futuro)")
+        original_dtype = df[column].dtype
+        df[column] = parsed
+        column_types['datetime_columns'][column] = df[column]
+        columns_processed[column] = {
+            'type': 'temporal',
+            'date_format': column_types['datetime_formats'].get(column),
+            'original_dtype': str(original_dtype),
+            'final_dtype': str(parsed.dtype),
+            'valid_dates': valid - out_of_range,
+            'out_of_range_dates': out_of_range,
+        }
+
+    for column in column_types['numeric_columns']:
+        name = _normalize_name(column)
+        is_financial = _is_financial_name(column)
+        if not is_financial and any(keyword in name for keyword in IDENTIFIER_KEYWORDS):
+            continue
+
+        original_dtype = df[column].dtype
+        if pd.api.types.is_numeric_dtype(original_dtype):
+            # Já lida como número (ex.: Excel): nada a converter
+            continue
+
+        values = column_types['numeric_data'][column]
+        success_rate = values.notna().sum() / total
+        forced = any(keyword in name for keyword in FORCED_FINANCIAL_KEYWORDS)
+        min_ratio = FORCED_FINANCIAL_COERCE_MIN_RATIO if forced else NUMERIC_COERCE_MIN_RATIO
+        if success_rate < min_ratio:
+            continue
+
+        nan_filled = 0
+        if is_financial:
+            nan_filled = int(values.isna().sum())
+            values = values.fillna(0)
+        df[column] = values
+        columns_processed[column] = {
+            'type': 'financial_numeric' if is_financial else 'numeric',
+            'original_dtype': str(original_dtype),
+            'final_dtype': str(values.dtype),
+            'nan_values_filled': nan_filled,
+            'conversion_success_rate': round(float(success_rate) * 100, 1),
+        }
+
+    return columns_processed
+
+
+def derive_columns(df: pd.DataFrame, column_types: Dict[str, Any]) -> List[str]:
+    """
+    Etapa derive: declara as colunas auxiliares de cada coluna de data.
+
+    - {coluna}_Mes: Número do mês (1-12)
+    - {coluna}_Ano: Ano (ex: 2024)
+    - {coluna}_Trimestre: Trimestre (1-4)
+    - {coluna}_Mes_Nome: Nome do mês em português
+
+    As auxiliares de data são virtuais: entram nas listas de colunas (e no
+    prompt) como antes, mas só são calculadas quando uma consulta as usa
+    (ver virtual_columns.materialize_virtual_columns). A declaração fica em
+    column_types['virtual_columns'].
+
+    Sem coluna de receita numérica, cria Receita_Total_Derivada (quantidade x preço).
+
+    Args:
+        df: DataFrame a ser alterado (no lugar)
+        column_types: Resultado de infer_column_types (listas atualizadas no lugar)
+
+    Returns:
+        Lista das colunas auxiliares (virtuais e criadas)
+    """
+    numeric_columns = column_types['numeric_columns']
+    text_columns = column_types['text_columns']
+
+    virtual_columns = virtual_temporal_columns(column_types['datetime_columns'])
+    column_types['virtual_columns'] = virtual_columns
+    auxiliary_columns: List[str] = list(virtual_columns)
+    for name, spec in virtual_columns.items():
+        if spec['part'] == '_Mes_Nome':
+            text_columns.append(name)
+        else:
+            numeric_columns.append(name)
+
+    revenue_col, revenue = find_revenue_column(df)
+    if revenue_col is not None and revenue_col not in df.columns:
+        # Receita derivada de quantidade x preço (ver find_revenue_column)
+        df['Receita_Total_Derivada'] = revenue
+        numeric_columns.append('Receita_Total_Derivada')
+        auxiliary_columns.append('Receita_Total_Derivada')
+
+    return auxiliary_columns
+
+
+def prepare_table(
+    table_name: str,
+    df: pd.DataFrame,
+    known_formats: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Executa as etapas infer → coerce → derive em uma tabela lida.
+
+    Cada coluna é tipada uma única vez: as colunas numéricas e de data são
+    gravadas já convertidas no DataFrame da tabela, que pode ser consolidado
+    sem nova detecção. Os tempos de cada etapa ficam em 'stage_seconds'.
+
+    Args:
+        table_name: Nome identificador da tabela
+        df: DataFrame a ser processado
+        known_formats: Formatos de data de uma ingestão anterior da mesma fonte
+            (pulam a detecção; ver 'datetime_formats' no retorno)
+
+    Returns:
+        Dict com metadados da tabela processada ('df' é a única cópia dos
+        dados; 'datetime_columns' e 'numeric_columns' são nomes de colunas)
+    """
+    timings: Dict[str, float] = {}
+
+    with stage_timer(timings, 'infer'):
+        # Com copy-on-write, rename/replace não duplicam as colunas inalteradas
+        processed = df.rename(columns=lambda col: str(col).strip())
+        processed = processed.replace('', np.nan)
+        column_types = infer_column_types(processed, known_formats)
+
+    with stage_timer(timings, 'coerce'):
+        columns_processed = coerce_columns(processed, column_types)
+
+    with stage_timer(timings, 'derive'):
+        auxiliary_columns = derive_columns(processed, column_types)
+
+    # Séries convertidas só existem no DataFrame; a tabela guarda apenas os nomes
+    return {
+        'name': table_name,
+        'df': processed,
+        'row_count': int(len(processed)),
+        'columns': list(processed.columns) + list(column_types['virtual_columns']),
+        'numeric_columns': column_types['numeric_columns'],
+        'datetime_columns': list(column_types['datetime_columns']),
+        'datetime_formats': column_types['datetime_formats'],
+        'text_columns': column_types['text_columns'],
+        'auxiliary_columns': auxiliary_columns,
+        'virtual_columns': column_types['virtual_columns'],
+        'columns_processed': columns_processed,
+        'cached_columns': column_types['cached_columns'],
+        'stage_seconds': timings,
+    }
+
+
+def _share_consolidated_rows(tables: List[Dict[str, Any]], df: pd.DataFrame) -> None:
+    """
+    Troca o DataFrame de cada tabela pelas suas linhas do DataFrame consolidado.
+
+    Sem isso a fonte ficaria duas vezes em memória (tabelas + concatenação).
+    As tabelas mantêm colunas, tipos e índice próprios; com Copy-on-Write as
+    fatias compartilham a memória do consolidado até serem alteradas.
+
+    Args:
+        tables: Tabelas concatenadas, na ordem do pd.concat
+        df: Resultado do pd.concat
+    """
+    start = 0
+    for table in tables:
+        original = table['df']
+        rows = slice(start, start + len(original))
+        start += len(original)
+        if list(original.columns) == list(df.columns):
+            shared = df.iloc[rows]
+        else:
+            shared = df.iloc[rows][list(original.columns)]
+        # Colunas ausentes em outras tabelas podem ter mudado de tipo no concat
+        changed = {column: dtype for column, dtype in original.dtypes.items() if shared[column].dtype != dtype}
+        if changed:
+            shared = shared.astype(changed)
+        shared.index = original.index
+        table['df'] = shared
+
+
+def consolidate_tables(tables: List[Dict[str, Any]], version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Junta as tabelas de uma ingestão em uma única tabela consultável.
+
+    Executada uma vez por ingestão (ou atualização) da fonte: as consultas
+    leem o DataFrame consolidado em vez de concatenar as tabelas a cada
+    comando. Uma única tabela é reaproveitada sem cópia; com várias, o
+    'df' de cada tabela passa a ser a sua fatia do consolidado (ver
+    _share_consolidated_rows). As colunas de texto
+    ganham aqui a sombra normalizada usada pelos filtros (ver text_shadows) e
+    as colunas de data a permutação ordenada dos intervalos (ver
+    secondary_indexes.build_datetime_index).
+
+    Args:
+        tables: Tabelas retornadas por prepare_table
+        version: Versão da ingestão que originou as tabelas
+
+    Returns:
+        Dict no formato de tabela ('df', 'columns', 'virtual_columns',
+        'text_shadows', 'indexes', ...) com 'version' e 'table_count'; 'df'
+        é None se não houver dados
+    """
+    sources = [table for table in tables if table.get('df') is not None and not table['df'].empty]
+    frames = [table['df'] for table in sources]
+    if not frames:
+        df = None
+    elif len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True)
+        _share_consolidated_rows(sources, df)
+
+    columns: List[str] = []
+    virtual_columns: Dict[str, Dict[str, str]] = {}
+    datetime_columns: List[str] = []
+    for table in tables:
+        columns.extend(table.get('columns') or [])
+        virtual_columns.update(table.get('virtual_columns') or {})
+        datetime_columns.extend(table.get('datetime_columns') or [])
+
+    text_shadows = {}
+    indexes = {}
+    if df is not None:
+        text_shadows = build_text_shadows(df, [column for column in df.columns if is_text_filter_column(df[column])])
+        indexes = {
+            column: build_datetime_index(df[column])
+            for column in df.columns if is_datetime_indexable(df[column])
+        }
+
+    return {
+        'name': 'consolidado',
+        'df': df,
+        'row_count': 0 if df is None else int(len(df)),
+        'columns': list(dict.fromkeys(columns)),
+        'datetime_columns': list(dict.fromkeys(datetime_columns)),
+        'virtual_columns': virtual_columns,
+        'text_shadows': text_shadows,
+        'indexes': indexes,
+        'table_count': len(frames),
+        'version': version,
+    }
+
+
+def profile_dataset(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Etapa profile: métricas do dataset final, calculadas uma única vez.
+
+    Args:
+        df: DataFrame consolidado e tipado
+
+    Returns:
+        Dict com date_columns, date_range, financial_summary, data_quality,
+        profile (ver build_dataset_profile) e revenue_rollup
+    """
+    date_columns = [
+        column for column in df.columns
+        if pd.api.types.is_datetime64_any_dtype(df[column]) and df[column].notna().any()
+    ]
+
+    date_range = None
+    if date_columns:
+        date_range = {
+            'min': min(df[column].min() for column in date_columns),
+            'max': max(df[column].max() for column in date_columns),
+        }
+
+    financial_summary: Dict[str, Any] = {}
+    revenue_col, revenue = find_revenue_column(df)
+    quantity_col = next(
+        (c for c in df.columns if 'quantidade' in c.lower() and pd.api.types.is_numeric_dtype(df[c])),
+        None
+    )
+    if revenue_col and quantity_col:
+        total_receita = float(revenue.sum())
+        financial_summary = {
+            'quantidade_column': quantity_col,
+            'receita_column': revenue_col,
+            'total_quantidade': float(df[quantity_col].sum()),
+            'total_receita': total_receita,
+            'total_receita_formatted': f"R$ {total_receita:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        }
+
+    return {
+        'date_columns': date_columns,
+        'date_range': date_range,
+        'financial_summary': financial_summary,
+        'data_quality': {
+            'total_rows_final': int(len(df)),
+            'total_columns_final': int(len(df.columns)),
+            'missing_values_by_column': {str(k): int(v) for k, v in df.isna().sum().items()},
+        },
+        'profile': build_dataset_profile(df),
+        'revenue_rollup': build_revenue_rollup(df, date_columns),
+    }
@@ -0,0 +1,47 @@
+"""
+Month Names Module
+Tradução e reconhecimento de nomes de meses (pt-BR e inglês) com expressões compiladas uma única vez
+"""
+
+import re
+from typing import Any, Dict
+
+from ..config.settings import MONTH_ALIASES, MONTH_TRANSLATION
+
+
+# Número do mês por nome (pt-BR e inglês, incluindo abreviações)
+MONTH_NAME_NUMBERS: Dict[str, int] = {
+    **MONTH_ALIASES,
+    'january': 1, 'february': 2, 'feb': 2, 'march': 3, 'april': 4, 'apr': 4,
+    'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7, 'august': 8, 'aug': 8,
+    'september': 9, 'sep': 9, 'sept': 9, 'october': 10, 'oct': 10,
+    'november': 11, 'december': 12, 'dec': 12,
+}
+
+
+def _alternatives(names) -> str:
+    """Alternância regex com os nomes do mais longo ao mais curto ('janeiro' antes de 'jan')."""
+    return '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+
+_MONTH_NAME_ALTERNATIVES = _alternatives(MONTH_NAME_NUMBERS)
+# Nome de mês como palavra inteira (grupo 1 = nome); aplicado a texto já em minúsculas
+MONTH_NAME_PATTERN = re.compile(r'\b(' + _MONTH_NAME_ALTERNATIVES + r')\b')
+# Mesma expressão sem grupo de captura, para str.contains
+MONTH_NAME_SEARCH = re.compile(r'\b(?:' + _MONTH_NAME_ALTERNATIVES + r')\b')
+
+# Tradução pt-BR -> inglês em uma única passagem (sem traduzir de novo o que já foi traduzido)
+_MONTH_TRANSLATION_LOWER = {pt_name: eng_name.lower() for pt_name, eng_name in MONTH_TRANSLATION.items()}
+_MONTH_TRANSLATION_PATTERN = re.compile(_alternatives(_MONTH_TRANSLATION_LOWER))
+
+
+def _translate_match(match: 're.Match[str]') -> str:
+    return _MONTH_TRANSLATION_LOWER[match.group(0)]
+
+
+def normalize_month_text(value: Any) -> Any:
+    """Normaliza texto de mês em português para inglês (minúsculas)."""
+    if not isinstance(value, str):
+        return value
+    return _MONTH_TRANSLATION_PATTERN.sub(_translate_match, value.strip().lower())
+
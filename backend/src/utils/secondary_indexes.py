@@ -0,0 +1,183 @@
+"""
+Secondary Indexes Module
+Índices secundários por tabela: valor -> posições das linhas (texto e inteiros, criados na primeira
+consulta que filtra a coluna) e permutação ordenada das datas (criada na ingestão, para intervalos
+por busca binária). Descartados junto com a tabela consolidada a cada ingestão
+"""
+
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from .text_shadows import get_text_shadow, normalize_text
+
+
+# Colunas com ao menos esta fração de valores distintos são tratadas como chave (ex: IDs)
+KEY_MIN_DISTINCT_RATIO = 0.9
+
+INDEX_KIND_CATEGORY = 'category'
+INDEX_KIND_KEY = 'key'
+INDEX_KIND_DATETIME = 'datetime'
+
+
+def build_secondary_index(codes: np.ndarray, categories: pd.Index, normalized: bool) -> Dict[str, Any]:
+    """
+    Índice invertido sobre os códigos de uma coluna.
+
+    As posições das linhas são ordenadas por código (ordenação estável, então
+    as posições de cada valor ficam em ordem crescente); 'offsets' marca onde
+    começa cada código. A busca de um valor é um get_indexer em 'categories'
+    (tabela hash) seguido de um fatiamento: custo proporcional às linhas encontradas.
+
+    Args:
+        codes: Código do valor de cada linha (-1 = nulo)
+        categories: Valores distintos na ordem dos códigos
+        normalized: Se as chaves são textos normalizados (ver normalize_text)
+
+    Returns:
+        Dict com 'kind' (category ou key), 'categories', 'order', 'offsets',
+        'normalized' e 'rows'
+    """
+    rows = int(len(codes))
+    # Nulos (-1) vão para a primeira faixa e nunca são consultados
+    shifted = codes.astype(np.int64) + 1
+    counts = np.bincount(shifted, minlength=len(categories) + 1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    order = np.argsort(shifted, kind='stable')
+    if rows < np.iinfo(np.int32).max:
+        order = order.astype(np.int32)
+
+    non_null = rows - int(counts[0])
+    is_key = non_null > 0 and len(categories) >= non_null * KEY_MIN_DISTINCT_RATIO
+    return {
+        'kind': INDEX_KIND_KEY if is_key else INDEX_KIND_CATEGORY,
+        'categories': categories,
+        'order': order,
+        'offsets': offsets,
+        'normalized': normalized,
+        'rows': rows,
+    }
+
+
+def build_datetime_index(series: pd.Series) -> Dict[str, Any]:
+    """
+    Permutação que ordena uma coluna de datas.
+
+    Um intervalo [início, fim) vira duas buscas binárias em 'sorted' e uma
+    fatia de 'order': custo proporcional às linhas do intervalo, não à coluna.
+
+    Args:
+        series: Coluna datetime64 sem fuso horário
+
+    Returns:
+        Dict com 'kind' (datetime), 'sorted' (datas não nulas em ordem, como
+        inteiros em ns), 'order' (posição de cada uma) e 'rows'
+    """
+    values = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    # NaT é o menor int64: fica no começo da ordenação e é descartado
+    order = np.argsort(values, kind='stable')
+    nulls = int(np.count_nonzero(series.isna().to_numpy()))
+    order = order[nulls:]
+    if len(values) < np.iinfo(np.int32).max:
+        order = order.astype(np.int32)
+    return {
+        'kind': INDEX_KIND_DATETIME,
+        'sorted': values[order],
+        'order': order,
+        'rows': int(len(values)),
+    }
+
+
+def is_datetime_indexable(series: pd.Series) -> bool:
+    """Datas sem fuso horário recebem a permutação ordenada."""
+    return pd.api.types.is_datetime64_dtype(series.dtype)
+
+
+def is_indexable_column(series: pd.Series, text: bool) -> bool:
+    """Colunas de texto, inteiras (IDs numéricos) e de data recebem índice; decimais são varridos."""
+    return text or pd.api.types.is_integer_dtype(series.dtype) or is_datetime_indexable(series)
+
+
+def get_secondary_index(table: Dict[str, Any], column: str, text: bool) -> Optional[Dict[str, Any]]:
+    """
+    Retorna o índice da coluna, criando-o na primeira consulta que a filtra.
+
+    Colunas de texto reaproveitam os códigos da sombra normalizada; colunas
+    inteiras são fatoradas aqui; colunas de data já chegam indexadas da
+    ingestão (ver consolidate_tables). Os índices ficam em table['indexes']
+    e são refeitos se o número de linhas da tabela mudar.
+
+    Args:
+        table: Dict da tabela (com 'df')
+        column: Nome da coluna
+        text: Se a coluna é filtrada como texto (ver is_text_filter_column)
+
+    Returns:
+        Índice (ver build_secondary_index), ou None se a coluna não for indexável
+    """
+    series = table['df'][column]
+    if not is_indexable_column(series, text):
+        return None
+
+    indexes = table.setdefault('indexes', {})
+    index = indexes.get(column)
+    if index is not None and index['rows'] == len(series):
+        return index
+
+    if is_datetime_indexable(series):
+        index = build_datetime_index(series)
+    elif text:
+        shadow = get_text_shadow(table, column)
+        index = build_secondary_index(shadow['codes'], shadow['categories'], normalized=True)
+    else:
+        codes, uniques = pd.factorize(series)
+        index = build_secondary_index(codes, pd.Index(uniques), normalized=False)
+    indexes[column] = index
+    return index
+
+
+def index_lookup(index: Dict[str, Any], values: List[Any]) -> np.ndarray:
+    """
+    Posições (em ordem crescente) das linhas com algum dos valores.
+
+    Args:
+        index: Índice da coluna
+        values: Valores procurados (textos são normalizados aqui)
+
+    Returns:
+        Array de posições; vazio se nenhum valor existir na coluna
+    """
+    keys = [normalize_text(value) for value in values] if index['normalized'] else list(values)
+    try:
+        codes = index['categories'].get_indexer(keys)
+    except (TypeError, ValueError):
+        return np.empty(0, dtype=index['order'].dtype)
+
+    codes = np.unique(codes[codes >= 0])
+    offsets = index['offsets']
+    parts = [index['order'][offsets[code + 1]:offsets[code + 2]] for code in codes]
+    if not parts:
+        return np.empty(0, dtype=index['order'].dtype)
+    if len(parts) == 1:
+        return parts[0]
+    return np.sort(np.concatenate(parts))
+
+
+def index_range(index: Dict[str, Any], start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> np.ndarray:
+    """
+    Posições (em ordem crescente) das linhas com data em [start, end).
+
+    Args:
+        index: Índice de datas (ver build_datetime_index)
+        start: Início inclusivo (None = sem limite)
+        end: Fim exclusivo (None = sem limite)
+
+    Returns:
+        Array de posições
+    """
+    sorted_values = index['sorted']
+    low = 0 if start is None else int(np.searchsorted(sorted_values, start.value, side='left'))
+    high = len(sorted_values) if end is None else int(np.searchsorted(sorted_values, end.value, side='left'))
+    if high <= low:
+        return np.empty(0, dtype=index['order'].dtype)
+    return np.sort(index['order'][low:high])
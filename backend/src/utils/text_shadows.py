@@ -0,0 +1,112 @@
+"""
+Text Shadows Module
+Representação normalizada (minúsculas, sem acentos) das colunas de texto como códigos categóricos,
+usada pelos filtros sem processar strings a cada consulta
+"""
+
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+
+# Colunas com mais valores distintos que esta fração das linhas (ex: IDs) só ganham
+# sombra quando são filtradas pela primeira vez
+SHADOW_EAGER_MAX_DISTINCT_RATIO = 0.5
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Forma usada na comparação de textos: casefold, sem acentos e sem espaços nas pontas.
+
+    "  Região " e "regiao" viram "regiao"; "Eletrônicos" e "ELETRONICOS" viram "eletronicos".
+    """
+    text = unicodedata.normalize('NFD', str(value).strip().casefold())
+    return ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+
+
+def _smallest_code_dtype(size: int) -> type:
+    """Menor inteiro com sinal que comporta os códigos (e o -1 dos nulos)."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def build_text_shadow(series: pd.Series, max_distinct: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Sombra normalizada de uma coluna de texto.
+
+    Cada linha recebe o código do seu valor normalizado; valores que só
+    diferem em maiúsculas/acentos compartilham o código. A normalização é
+    aplicada uma vez por valor distinto, não por linha.
+
+    Args:
+        series: Coluna de texto
+        max_distinct: Limite de valores distintos; acima dele a coluna não é
+            normalizada e nada é construído (None = sem limite)
+
+    Returns:
+        Dict com 'codes' (array com um código por linha, -1 = nulo),
+        'categories' (pd.Index com os valores normalizados) e 'rows', ou
+        None se a coluna passar de max_distinct
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        raw_codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        raw_codes, uniques = pd.factorize(series)
+    if max_distinct is not None and len(uniques) > max_distinct:
+        return None
+
+    normalized_codes, categories = pd.factorize(np.array([normalize_text(value) for value in uniques], dtype=object))
+    # Posição extra para o código -1 (nulos), que continua -1
+    lookup = np.append(normalized_codes, -1).astype(_smallest_code_dtype(len(categories)))
+    return {
+        'codes': lookup[raw_codes],
+        'categories': pd.Index(categories),
+        'rows': int(len(series)),
+    }
+
+
+def build_text_shadows(df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Etapa da ingestão: sombras das colunas de texto com poucos valores distintos.
+
+    Colunas acima de SHADOW_EAGER_MAX_DISTINCT_RATIO (ex: IDs) são descartadas
+    logo após a fatoração, sem normalizar seus valores.
+
+    Args:
+        df: DataFrame consolidado
+        columns: Colunas de texto candidatas
+
+    Returns:
+        Dict {coluna: sombra} (ver build_text_shadow)
+    """
+    max_distinct = max(len(df) * SHADOW_EAGER_MAX_DISTINCT_RATIO, 1)
+    shadows: Dict[str, Dict[str, Any]] = {}
+    for column in columns:
+        shadow = build_text_shadow(df[column], max_distinct)
+        if shadow is not None:
+            shadows[column] = shadow
+    return shadows
+
+
+def get_text_shadow(table: Dict[str, Any], column: str) -> Dict[str, Any]:
+    """
+    Retorna a sombra da coluna, criando-a na primeira consulta quando necessário
+    (colunas de alta cardinalidade e colunas virtuais materializadas depois).
+
+    Args:
+        table: Dict da tabela (com 'df')
+        column: Coluna de texto
+
+    Returns:
+        Sombra da coluna (ver build_text_shadow)
+    """
+    shadows = table.setdefault('text_shadows', {})
+    shadow = shadows.get(column)
+    if shadow is None or shadow['rows'] != len(table['df']):
+        shadow = build_text_shadow(table['df'][column])
+        shadows[column] = shadow
+    return shadow
@@ -0,0 +1,72 @@
+"""
+Type Inference Module
+Amostragem estratificada para decidir o tipo das colunas sem converter a coluna inteira
+"""
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from ..config.settings import TYPE_INFERENCE_SAMPLE_ROWS
+
+
+# Fração mínima de valores convertidos para uma coluna receber o tipo
+TYPE_MATCH_THRESHOLD = 0.3
+
+# Distância mínima entre a fração da amostra e o limiar para a decisão ser
+# tomada só pela amostra (~5 desvios-padrão com 2000 linhas); dentro dessa
+# faixa a coluna inteira é convertida e o limiar é aplicado de forma exata
+TYPE_INFERENCE_MARGIN = 0.05
+
+
+def sample_column(series: pd.Series, sample_rows: int = TYPE_INFERENCE_SAMPLE_ROWS) -> Optional[pd.Series]:
+    """
+    Extrai uma amostra estratificada de uma coluna, preservando a ordem das linhas.
+
+    A coluna é dividida em sample_rows faixas contíguas e uma linha é sorteada
+    (semente fixa) em cada faixa, o que cobre início, meio e fim do arquivo.
+    O primeiro valor não nulo sempre entra na amostra, para que a inferência
+    de formato do pd.to_datetime (baseada nele) seja a mesma da coluna inteira.
+
+    Args:
+        series: Coluna a ser amostrada
+        sample_rows: Tamanho da amostra
+
+    Returns:
+        Série amostrada, ou None se a coluna for pequena demais para amostrar
+    """
+    total = len(series)
+    if total <= sample_rows * 2:
+        return None
+
+    bounds = np.linspace(0, total, sample_rows + 1).astype(np.int64)
+    rng = np.random.default_rng(0)
+    positions = bounds[:-1] + (rng.random(sample_rows) * (bounds[1:] - bounds[:-1])).astype(np.int64)
+
+    not_null = series.notna().to_numpy()
+    if not_null.any():
+        positions = np.union1d(positions, [int(not_null.argmax())])
+
+    return series.iloc[positions]
+
+
+def decide_from_sample(matches: int, sample_size: int) -> Optional[bool]:
+    """
+    Decide o tipo a partir da fração de valores convertidos na amostra.
+
+    Args:
+        matches: Valores da amostra convertidos com sucesso
+        sample_size: Tamanho da amostra
+
+    Returns:
+        True/False quando a fração está longe do limiar, ou None se for
+        ambígua e a coluna inteira precisar ser verificada
+    """
+    if sample_size == 0:
+        return None
+    ratio = matches / sample_size
+    if ratio >= TYPE_MATCH_THRESHOLD + TYPE_INFERENCE_MARGIN:
+        return True
+    if ratio <= TYPE_MATCH_THRESHOLD - TYPE_INFERENCE_MARGIN:
+        return False
+    return None
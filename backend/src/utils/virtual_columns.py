@@ -0,0 +1,140 @@
+"""
+Virtual Columns Module
+Colunas auxiliares de data ({coluna}_Mes, _Ano, _Trimestre, _Mes_Nome) calculadas só quando referenciadas
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+from .data_processors import month_number_to_name
+
+
+# Sufixos das colunas auxiliares, na ordem em que são anunciadas
+TEMPORAL_PARTS = ('_Mes', '_Ano', '_Trimestre', '_Mes_Nome')
+
+# '_Mes_Nome' precisa ser testado antes de '_Mes'
+_PARTS_BY_LENGTH = sorted(TEMPORAL_PARTS, key=len, reverse=True)
+
+
+def temporal_part(dates: pd.Series, part: str) -> pd.Series:
+    """
+    Calcula uma coluna auxiliar a partir de uma série de datas.
+
+    - _Mes: Número do mês (1-12)
+    - _Ano: Ano (ex: 2024)
+    - _Trimestre: Trimestre (1-4)
+    - _Mes_Nome: Nome do mês em português (minúsculas)
+
+    Args:
+        dates: Série datetime64
+        part: Um dos sufixos de TEMPORAL_PARTS
+
+    Returns:
+        Série com o mesmo índice das datas
+    """
+    if part == '_Mes':
+        return dates.dt.month
+    if part == '_Ano':
+        return dates.dt.year
+    if part == '_Trimestre':
+        return dates.dt.quarter
+    if part == '_Mes_Nome':
+        return dates.dt.month.map(month_number_to_name)
+    raise ValueError(f"Parte temporal desconhecida: {part}")
+
+
+def virtual_temporal_columns(date_columns: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Declara as colunas auxiliares de cada coluna de data, sem calculá-las.
+
+    Args:
+        date_columns: Nomes das colunas de data
+
+    Returns:
+        Dict {nome auxiliar: {'source': coluna de data, 'part': sufixo}}
+    """
+    return {
+        f"{column}{part}": {'source': column, 'part': part}
+        for column in date_columns
+        for part in TEMPORAL_PARTS
+    }
+
+
+def split_virtual_name(name: Any) -> Optional[Tuple[str, str]]:
+    """
+    Separa 'Data_Mes_Nome' em ('Data', '_Mes_Nome').
+
+    Returns:
+        Tupla (coluna de data, sufixo) ou None se o nome não tiver sufixo temporal
+    """
+    if not isinstance(name, str):
+        return None
+    for part in _PARTS_BY_LENGTH:
+        if name.endswith(part) and len(name) > len(part):
+            return name[:-len(part)], part
+    return None
+
+
+def resolve_column(df: pd.DataFrame, name: Any) -> Optional[pd.Series]:
+    """
+    Retorna uma coluna real ou calcula a auxiliar virtual correspondente.
+
+    Sessões antigas já trazem as auxiliares gravadas no DataFrame; nas novas,
+    a coluna é calculada a partir da coluna de data de origem.
+
+    Args:
+        df: DataFrame da tabela
+        name: Nome da coluna
+
+    Returns:
+        Série da coluna, ou None se não existir nem puder ser calculada
+    """
+    if name in df.columns:
+        return df[name]
+
+    split = split_virtual_name(name)
+    if split is None:
+        return None
+    source, part = split
+
+    if source not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[source]):
+        return None
+    return temporal_part(df[source], part).rename(name)
+
+
+def materialize_virtual_columns(table: Dict[str, Any], names: Optional[Iterable[Any]] = None) -> List[str]:
+    """
+    Calcula e guarda no DataFrame da tabela as colunas virtuais referenciadas.
+
+    Cada coluna é calculada uma única vez: depois de materializada, passa a
+    fazer parte de table['df'] e as consultas seguintes a usam diretamente.
+
+    Args:
+        table: Dict da tabela (com 'df' e 'virtual_columns')
+        names: Colunas referenciadas pela consulta (None = todas as virtuais)
+
+    Returns:
+        Lista das colunas calculadas nesta chamada
+    """
+    virtual = table.get('virtual_columns') or {}
+    df = table.get('df')
+    if not virtual or df is None:
+        return []
+
+    wanted = [
+        name for name in (virtual if names is None else names)
+        if isinstance(name, str) and name in virtual and name not in df.columns
+    ]
+    if not wanted:
+        return []
+
+    computed: Dict[str, pd.Series] = {}
+    for name in dict.fromkeys(wanted):
+        series = resolve_column(df, name)
+        if series is not None:
+            computed[name] = series
+
+    if computed:
+        # Novo DataFrame (cópia rasa com copy-on-write) em vez de alterar o compartilhado
+        table['df'] = df.assign(**computed)
+    return list(computed)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Validação diferencial do parser de números brasileiros
+Compara a versão vetorizada (normalize_decimal_series / coerce_numeric_series)
+com a versão por célula (normalize_decimal_string) em valores gerados aleatoriamente
+
+Uso: python validate_decimal_parsing.py [casos] [semente]
+"""
+
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.utils.data_processors import (
+    coerce_numeric_series,
+    normalize_decimal_series,
+    normalize_decimal_string,
+)
+
+# Pedaços que aparecem em planilhas reais, combinados aleatoriamente
+TOKENS = [
+    '0', '1', '7', '12', '345', '1.234', '1.234.567', ',', '.', ',5', '.5', '-', '+',
+    'R$', 'R$ ', '%', ' ', '\t', '\n', '\r', ' ', 'e3', 'E-2', 'abc', 'nan', 'NaN',
+    'None', 'null', 'inf', '-inf', 'Infinity', '1e', '--', '1,2,3', '½', '٣',
+]
+
+# Valores fixos que já causaram divergência ou são casos de borda conhecidos
+FIXED_CASES = [
+    'R$ 1.234,56', '1.234,56', '1234,56', '1.234', '1,234.56', '12%', ' 42 ', '  7,5',
+    '', ' ', 'nan', 'NULL', 'None', '1e5', '-0,0', '+.5', 'R$-1.000,00', '1.2.3,4', 'inf', 'NaN',
+]
+
+
+def random_value(rng: random.Random):
+    """Valor aleatório: texto montado com TOKENS ou, às vezes, um não-texto."""
+    roll = rng.random()
+    if roll < 0.05:
+        return None
+    if roll < 0.10:
+        return rng.choice([np.nan, rng.randint(-10**6, 10**6), rng.uniform(-1e6, 1e6)])
+    return ''.join(rng.choice(TOKENS) for _ in range(rng.randint(1, 5)))
+
+
+def same_number(a: float, b: float) -> bool:
+    """Igualdade de floats tratando NaN == NaN."""
+    return (np.isnan(a) and np.isnan(b)) or a == b
+
+
+def main() -> int:
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    rng = random.Random(seed)
+
+    values = FIXED_CASES + [random_value(rng) for _ in range(cases)]
+    series = pd.Series(values, dtype=object)
+
+    print('=' * 60)
+    print(f'VALIDAÇÃO DIFERENCIAL - PARSER DECIMAL ({len(values):,} valores, semente {seed})')
+    print('=' * 60)
+
+    # Mesma entrada da versão por célula: astype(str) antes de normalizar
+    expected_text = series.astype(str).map(normalize_decimal_string)
+    actual_text = normalize_decimal_series(series).astype(object).where(lambda s: s.notna(), None)
+
+    expected_numbers = pd.to_numeric(expected_text, errors='coerce').to_numpy(dtype=float)
+    actual_numbers = coerce_numeric_series(series).to_numpy(dtype=float)
+
+    text_mismatches = [
+        (values[i], expected_text[i], actual_text[i])
+        for i in range(len(values)) if expected_text[i] != actual_text[i]
+    ]
+    number_mismatches = [
+        (values[i], expected_numbers[i], actual_numbers[i])
+        for i in range(len(values)) if not same_number(expected_numbers[i], actual_numbers[i])
+    ]
+
+    for label, mismatches in (('normalize_decimal_series', text_mismatches),
+                              ('coerce_numeric_series', number_mismatches)):
+        symbol = '✅' if not mismatches else '❌'
+        print(f'  [{symbol}] {label}: {len(mismatches)} divergências')
+        for value, expected, actual in mismatches[:10]:
+            print(f'        {value!r}: esperado {expected!r}, obtido {actual!r}')
+
+    print()
+    if text_mismatches or number_mismatches:
+        print('❌ A versão vetorizada diverge de normalize_decimal_string')
+        return 1
+    print('🎉 Versão vetorizada idêntica à versão por célula')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())